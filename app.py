@@ -1,11 +1,30 @@
 import streamlit as st
 import pandas as pd
+import json
 import warnings
+import functools
+import tracemalloc
 import matplotlib.pyplot as plt
+from matplotlib.cbook import boxplot_stats
 import math
 import seaborn as sns
 import numpy as np
-from scipy import stats
+from ingest import summarize_frame
+from data_cache import fingerprint
+from column_store import LazyFrame, open_store, projection_bytes
+from column_stats import column_stats
+from figure_cache import FigureCache, encode
+from chart_data import CHURN_EDGES, OUTLIER_LABELS, churn_density, histogram, value_summary
+from sampling import stratified_sample
+from churn_cube import CUBE_DIMENSIONS, CUBE_MEASURES, ChurnCube
+from correlation import CORRELATION_COLUMNS, Correlations
+from resampling import resample
+from filter_index import FilterIndex
+from profiling import PhaseRecorder
+import vega_charts
+from stats_store import fit_incremental, summarize_incremental
+from pipeline import (AGE_MIN, DATA_PATH, IQR_MULTIPLIER, QUANTILE_EPS, QUANTILE_MODE, STANDARDIZED_COLUMNS,
+                      SUPPORT_CALLS_CAP, SUPPORT_CALLS_MAX, clean_chunks, standardize)
 
 warnings.filterwarnings('ignore')
 
@@ -459,19 +478,218 @@ st.markdown(f"""
 st.markdown('<p class="main-header">Customer Churn Analysis</p>', unsafe_allow_html=True)
 st.markdown('<p class="sub-header">Data Preprocessing & Exploratory Data Analysis</p>', unsafe_allow_html=True)
 
-# Load data
-@st.cache_data
-def load_data():
+STREAMING_SECTIONS = ["Overview", "Initial Exploration", "EDA - Churn Analysis"]
+
+# Each call of a decorated data loader is a "load" phase of the run, cache hits included, so the
+# diagnostics panel shows which loader a slow section waited on
+def timed(loader):
+    @functools.wraps(loader)
+    def run(*args, **kwargs):
+        with phases.span(loader.__name__, "load"):
+            return loader(*args, **kwargs)
+    return run
+
+# Column files memory-mapped once per dataset version and shared by every session;
+# opening reads only the header and a column's pages are loaded when a section touches it
+@timed
+@st.cache_resource
+def get_column_store(path=DATA_PATH, version=None):
+    return open_store(path)
+
+# Every column handle given out during this run, for the bytes-loaded report in the sidebar
+datasets = []
+
+def track(store, rows=None):
+    lazy = LazyFrame(store, rows)
+    datasets.append(lazy)
+    return lazy
+
+# Lazy handle on the raw data: sections index it by the columns they need and only those are read;
+# under sidebar filters it covers the raw rows of the matching cleaned customers
+def open_dataset(path=DATA_PATH, filters=()):
+    rows = None
+    if filters:
+        rows = get_clean_store(path, clean_version(path)).index()[select_rows(path, clean_version(path), filters)]
+    return track(get_column_store(path, fingerprint(path)), rows)
+
+# Load data as a frame over the mapped columns (not st.cache_data, which would pickle it into memory)
+def load_data(path=DATA_PATH, filters=()):
     try:
-        df = pd.read_csv("customer_data.csv")
-        return df
+        return open_dataset(path, filters).frame()
     except Exception as e:
         return pd.DataFrame()
 
-data = load_data()
-if data.empty:
-    st.error("Could not load customer data. Please check the data source.")
-    st.stop()
+CLEANING_KEY = f"{AGE_MIN}|{IQR_MULTIPLIER}|{SUPPORT_CALLS_MAX}|{SUPPORT_CALLS_CAP}|{QUANTILE_MODE}|{QUANTILE_EPS}"
+FIGURE_CACHE_BYTES = 64 * 1024 ** 2
+SCATTER_DENSITY_THRESHOLD = 50_000
+SCATTER_DENSITY_BINS = 60
+PAIRPLOT_SAMPLE_SIZE = 5000
+PAIRPLOT_SEED = 0
+GENDER_LABELS = {0: "Male", 1: "Female"}
+PRODUCT_LABELS = {0: "Basic", 1: "Premium"}
+RESAMPLE_COUNTS = [500, 1000, 2000, 5000, 10000]
+RESAMPLING_SEED = 0
+
+def clean_version(path=DATA_PATH):
+    return fingerprint(path, key=CLEANING_KEY)
+
+# Cleaned data as its own column store, with the fitted parameters in its header. The fit is a
+# persisted store that only reads rows appended since the last build; the cleaned columns are then
+# rewritten chunk by chunk from the mapped raw columns, since a moved fill value or Income cap
+# changes earlier rows too (and with them the churn cube and correlations derived from this store)
+@timed
+@st.cache_resource
+def get_clean_store(path=DATA_PATH, version=None):
+    def build():
+        raw = get_column_store(path, fingerprint(path))
+        params = fit_incremental(path, AGE_MIN, IQR_MULTIPLIER, SUPPORT_CALLS_MAX, SUPPORT_CALLS_CAP,
+                                 QUANTILE_MODE, QUANTILE_EPS)
+        return lambda: clean_chunks(raw.chunks(), params), params
+    return open_store(path, name="clean.columns", build=build, key=CLEANING_KEY)
+
+def load_clean_data(path=DATA_PATH, filters=()):
+    version = clean_version(path)
+    rows = select_rows(path, version, filters) if filters else None
+    store = get_clean_store(path, version)
+    return track(store, rows), store.meta
+
+@timed
+@st.cache_data
+def load_clean_stats(path=DATA_PATH, version=None, filters=()):
+    data_sc, _ = load_clean_data(path, filters)
+    return column_stats(data_sc[data_sc.numeric_columns])
+
+# Histogram counts of the cleaned numeric columns, binned once per dataset version and filter;
+# standardizing is linear, so the standardized histograms are these with their edges rescaled
+@timed
+@st.cache_data
+def load_clean_histograms(path=DATA_PATH, version=None, filters=()):
+    data_sc, _ = load_clean_data(path, filters)
+    return {col: histogram(data_sc[col]) for col in STANDARDIZED_COLUMNS}
+
+# Bitmap indexes over the categorical columns and sorted/range indexes over the numeric ones
+@timed
+@st.cache_resource
+def get_filter_index(path=DATA_PATH, version=None):
+    return FilterIndex.build(LazyFrame(get_clean_store(path, version)))
+
+# Cleaned-row positions matching a filter combination; recent combinations stay cached
+@timed
+@st.cache_resource(max_entries=16)
+def select_rows(path=DATA_PATH, version=None, filters=()):
+    rows = get_filter_index(path, version).select(filters)
+    rows.flags.writeable = False
+    return rows
+
+# Group-by counts and moment sums of the cleaned data, built once per dataset version and row filter
+@timed
+@st.cache_data
+def load_churn_cube(path=DATA_PATH, version=None, filters=()):
+    data_sc, _ = load_clean_data(path, filters)
+    return ChurnCube.from_frame(data_sc[CUBE_DIMENSIONS + CUBE_MEASURES])
+
+# The churn cube and the `where` answering sidebar filters: Gender and ProductType are cube dimensions,
+# so the unfiltered cube answers them; only a Tenure range, which the cube resolves to whole bins,
+# needs a cube of the matching rows
+def query_churn_cube(filters=()):
+    where = {col: list(condition) for col, condition in filters if col in CUBE_DIMENSIONS}
+    rows = tuple((col, condition) for col, condition in filters if col not in CUBE_DIMENSIONS)
+    return load_churn_cube(DATA_PATH, clean_version(), rows), where
+
+# Churn rate (%) of each value of Gender or ProductType: from the churn cube, or in streaming mode
+# (which has no cleaned store) from the summary's group counters
+def churn_rates(col):
+    if streaming:
+        return (summary.churn_by[col]['sum'] / summary.churn_by[col]['count'] * 100).reindex([0, 1])
+    churn_cube, where = query_churn_cube(filters)
+    return (churn_cube.churn_rate(col, where) * 100).reindex([0, 1])
+
+# Correlations, counts and p-values of the cleaned data from one co-moment pass, shared by every
+# view that reports a correlation
+@timed
+@st.cache_data
+def load_correlations(path=DATA_PATH, version=None, filters=(), method="pearson"):
+    data_sc, _ = load_clean_data(path, filters)
+    return Correlations.from_frame(data_sc, CORRELATION_COLUMNS, method)
+
+# Bootstrap intervals and permutation p-values, resampled on worker processes within a time budget
+@timed
+@st.cache_data
+def load_significance(path=DATA_PATH, version=None, filters=(), n_resamples=2000, time_budget=10.0):
+    data_sc, _ = load_clean_data(path, filters)
+    return resample(data_sc, n_resamples=n_resamples, time_budget=time_budget, seed=RESAMPLING_SEED)
+
+# Summary statistics of the raw file, loaded only by the sections that show them. Streaming mode reads
+# the file in chunks and keeps a persisted store so rows appended to it are the only ones read on the
+# next run; otherwise the mapped columns are summarized one at a time, counted as loaded by the section
+@timed
+@st.cache_data
+def load_summary(path=DATA_PATH, streaming=False, version=None, filters=()):
+    try:
+        if streaming:
+            return summarize_incremental(path, age_min=AGE_MIN)
+        data = open_dataset(path, filters)
+        return None if len(data) == 0 else summarize_frame(data, age_min=AGE_MIN)
+    except Exception as e:
+        return None
+
+# Rendered chart images shared across sessions, keyed by section, chart, dataset and theme
+@st.cache_resource
+def get_figure_cache():
+    return FigureCache(FIGURE_CACHE_BYTES)
+
+# A chart's data preparation is the section code since the previous chart; drawing includes the
+# layout pass and encoding is the PNG export, both skipped when the image is cached. With interactive
+# charts on, a chart given a Vega-Lite version sends that spec and its aggregated data instead; the
+# spec's JSON is cached like an image, since building and validating the Altair chart is the slow part
+def show_figure(name, draw, chart=None):
+    key = (section, name, dataset_key, "dark" if st.session_state.dark_mode else "light")
+    figure_cache = get_figure_cache()
+    phases.lap(name, "prep")
+    if interactive_charts and chart is not None:
+        key += ("vega-lite",)
+        spec = figure_cache.get(key)
+        if spec is None:
+            with phases.span(name, "draw"):
+                spec = vega_charts.themed(chart(), text_color).to_json(indent=None)
+            figure_cache.put(key, spec)
+        st.vega_lite_chart(json.loads(spec), theme=None)
+        return
+    image = figure_cache.get(key)
+    if image is None:
+        with phases.span(name, "draw"):
+            fig = draw()
+        with phases.span(name, "encode"):
+            image = encode(fig)
+        figure_cache.put(key, image)
+    st.image(image, use_container_width=True)
+
+# Pre-binned counts drawn as one bar per bin, so a histogram costs the same to draw at any row count
+def plot_histogram(ax, counts, edges):
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color=COLORS['dusty_rose'],
+           edgecolor=COLORS['burgundy'], alpha=0.75, linewidth=1.5)
+
+# Vega-Lite versions of the charts several sections share, from the same aggregates as the static ones
+def histogram_grid(histograms, stats, features, title):
+    return vega_charts.grid([
+        vega_charts.histogram(*histograms[feature], f'{feature} Distribution', feature, COLORS['dusty_rose'], COLORS['burgundy'],
+                              markers=[(f"Mean: {stats.loc['mean', feature]:.2f}", stats.loc['mean', feature], COLORS['burgundy']),
+                                       (f"Median: {stats.loc['50%', feature]:.2f}", stats.loc['50%', feature], COLORS['chocolate'])])
+        for feature in features
+    ], title)
+
+CATEGORY_PANELS = [
+    ('Gender', 'Gender Distribution', ['Male', 'Female'], ['dusty_rose', 'taupe']),
+    ('ProductType', 'Product Type Distribution', ['Basic', 'Premium'], ['chocolate', 'burgundy']),
+    ('ChurnStatus', 'Churn Status Distribution', ['Stayed', 'Churned'], ['taupe', 'burgundy']),
+]
+
+def category_grid(value_counts, title):
+    return vega_charts.grid([
+        vega_charts.bars(labels, value_counts[col].reindex([0, 1], fill_value=0).to_numpy(), [COLORS[c] for c in colors],
+                         panel_title, 'Count', COLORS['burgundy'])
+        for col, panel_title, labels, colors in CATEGORY_PANELS
+    ], title)
 
 st.sidebar.button(
     "Dark Mode" if not st.session_state.dark_mode else "Light Mode",
@@ -479,6 +697,36 @@ st.sidebar.button(
     use_container_width=True
 )
 
+streaming = st.sidebar.toggle(
+    "Streaming ingestion",
+    value=False,
+    help="Summarize the CSV in chunks without building the on-disk column store. Only summary sections are available."
+)
+
+interactive_charts = st.sidebar.toggle(
+    "Interactive charts",
+    value=False,
+    help="Draw histograms, bar charts, box plots and the heatmap in the browser with zoom and hover. "
+         "Only their binned or summarized data is sent; the other charts stay images."
+)
+
+diagnostics = st.sidebar.toggle(
+    "Diagnostics",
+    value=False,
+    help="Time every data load and chart phase of the section and trace its peak memory. "
+         "Memory tracing slows every session while it is on."
+)
+# tracemalloc is process-wide; a session only stops the tracing it started
+if diagnostics and not tracemalloc.is_tracing():
+    tracemalloc.start()
+    st.session_state.tracing = True
+elif not diagnostics and st.session_state.pop("tracing", False):
+    tracemalloc.stop()
+
+# Load, chart and section phases of this run, kept in the session state where benchmark.py reads them
+phases = PhaseRecorder(memory=diagnostics)
+st.session_state.phases = phases.records
+
 st.sidebar.markdown("---")
 
 st.sidebar.markdown('<p class="nav-header">Navigation</p>', unsafe_allow_html=True)
@@ -496,21 +744,68 @@ section = st.sidebar.radio("", [
     "EDA - Churn Analysis",
     "EDA - Box Plots",
     "Correlation",
+    "Statistical Significance Analysis",
     "Conclusion"
 ], label_visibility="collapsed")
 
-if section == "Overview":
+# Streaming mode has only the summary; otherwise the column store's header is all that is read here
+summary = None
+try:
+    if streaming:
+        summary = load_summary(DATA_PATH, streaming, fingerprint(DATA_PATH), ())
+        n_rows = 0 if summary is None else summary.n_rows
+    else:
+        n_rows = len(get_column_store(DATA_PATH, fingerprint(DATA_PATH)))
+except Exception as e:
+    n_rows = 0
+if n_rows == 0:
+    st.error("Could not load customer data. Please check the data source.")
+    st.stop()
+
+# Sidebar filters select cleaned customers through the filter index and re-drive every section
+filters = ()
+if not streaming:
+    filter_index = get_filter_index(DATA_PATH, clean_version())
+    tenure_bounds = tuple(int(b) for b in (np.floor(filter_index.bounds("Tenure")[0]), np.ceil(filter_index.bounds("Tenure")[1])))
+    with st.sidebar.expander("Filters"):
+        genders = st.multiselect("Gender", filter_index.values("Gender"), default=filter_index.values("Gender"),
+                                 format_func=lambda v: GENDER_LABELS.get(v, v))
+        products = st.multiselect("Product type", filter_index.values("ProductType"), default=filter_index.values("ProductType"),
+                                  format_func=lambda v: PRODUCT_LABELS.get(v, v))
+        tenure = st.slider("Tenure (years)", *tenure_bounds, value=tenure_bounds)
+        # Only conditions that exclude something take part, so "everything selected" is the unfiltered data
+        filters = tuple((col, condition) for col, condition, everything in [
+            ("Gender", tuple(sorted(genders)), tuple(filter_index.values("Gender"))),
+            ("ProductType", tuple(sorted(products)), tuple(filter_index.values("ProductType"))),
+            ("Tenure", tuple(tenure), tenure_bounds),
+        ] if condition != everything)
+        if filters:
+            matched = len(select_rows(DATA_PATH, clean_version(), filters))
+            st.caption(f"{matched:,} of {filter_index.n_rows:,} cleaned customers match")
+    if filters and matched < 2:
+        st.warning("Fewer than two customers match the sidebar filters. Widen them to see the analysis.")
+        st.stop()
+
+data = None if streaming else open_dataset(DATA_PATH, filters)
+dataset_key = fingerprint(DATA_PATH, key=f"{streaming}|{CLEANING_KEY}|{filters}")
+
+phases.open(section, "section")
+if streaming and section not in STREAMING_SECTIONS:
+    st.warning(f"**{section}** reads rows from the column store, which streaming ingestion skips. Turn it off to view this section.")
+
+elif section == "Overview":
+    summary = load_summary(DATA_PATH, streaming, fingerprint(DATA_PATH), filters)
     st.markdown("## Project Overview")
     
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.markdown(f'<div class="metric-card"><h3>{len(data):,}</h3><p>Total Records</p></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><h3>{summary.n_rows:,}</h3><p>Total Records</p></div>', unsafe_allow_html=True)
     with col2:
         st.markdown('<div class="metric-card"><h3>8</h3><p>Features</p></div>', unsafe_allow_html=True)
     with col3:
-        st.markdown(f'<div class="metric-card"><h3>{data["ChurnStatus"].mean()*100:.1f}%</h3><p>Churn Rate</p></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><h3>{summary.churn_rate*100:.1f}%</h3><p>Churn Rate</p></div>', unsafe_allow_html=True)
     with col4:
-        st.markdown(f'<div class="metric-card"><h3>{data.isnull().sum().sum()}</h3><p>Missing Values</p></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><h3>{summary.missing.sum()}</h3><p>Missing Values</p></div>', unsafe_allow_html=True)
     
     st.markdown("---")
     
@@ -540,19 +835,19 @@ if section == "Overview":
         st.markdown(f'''
         <div class="insight-box">
         <strong>Data Quality Metrics</strong><br><br>
-        • Completeness: {((1 - data.isnull().sum().sum() / (len(data) * len(data.columns))) * 100):.1f}%<br>
-        • Unique Customers: {data['CustomerID'].nunique():,}<br>
-        • Avg Age: {data['Age'].mean():.1f} years<br>
-        • Avg Tenure: {data['Tenure'].mean():.1f} years
+        • Completeness: {((1 - summary.missing.sum() / (summary.n_rows * len(summary.columns))) * 100):.1f}%<br>
+        • Unique Customers: {'' if summary.exact else '~'}{summary.unique_customers:,}<br>
+        • Avg Age: {summary.describe.loc['mean', 'Age']:.1f} years<br>
+        • Avg Tenure: {summary.describe.loc['mean', 'Tenure']:.1f} years
         </div>
         ''', unsafe_allow_html=True)
         
         st.markdown(f'''
         <div class="warning-box">
         <strong>Churn Breakdown</strong><br><br>
-        • Churned: {(data['ChurnStatus'].sum()):,} customers<br>
-        • Stayed: {(len(data) - data['ChurnStatus'].sum()):,} customers<br>
-        • Risk Level: {'High' if data['ChurnStatus'].mean() > 0.3 else 'Moderate' if data['ChurnStatus'].mean() > 0.15 else 'Low'}
+        • Churned: {summary.churned:,} customers<br>
+        • Stayed: {(summary.n_rows - summary.churned):,} customers<br>
+        • Risk Level: {'High' if summary.churn_rate > 0.3 else 'Moderate' if summary.churn_rate > 0.15 else 'Low'}
         </div>
         ''', unsafe_allow_html=True)
     
@@ -580,6 +875,7 @@ if section == "Overview":
         """)
     
 elif section == "Initial Exploration":
+    summary = load_summary(DATA_PATH, streaming, fingerprint(DATA_PATH), filters)
     st.markdown("## Initial Data Exploration")
     
     st.markdown("### Feature Observations")
@@ -603,29 +899,32 @@ elif section == "Initial Exploration":
     
     with tab1:
         st.markdown("### First 7 Rows")
-        st.dataframe(data.head(7), use_container_width=True)
+        st.dataframe(summary.head, use_container_width=True)
     
     with tab2:
         st.markdown("### Dataset Information")
         col1, col2 = st.columns(2)
         with col1:
-            st.metric("Total Rows", data.shape[0])
-            st.metric("Total Columns", data.shape[1])
+            st.metric("Total Rows", summary.n_rows)
+            st.metric("Total Columns", len(summary.columns))
         with col2:
-            st.metric("Total Missing Values", data.isnull().sum().sum())
-            st.metric("Memory Usage", f"{data.memory_usage(deep=True).sum() / 1024:.2f} KB")
+            st.metric("Total Missing Values", summary.missing.sum())
+            # Streaming sums the CSV chunks as parsed; the column store holds downcast columns
+            st.metric("In-memory size" if streaming else "In-memory size (downcast)", f"{summary.memory_bytes / 1024:.2f} KB")
         
         st.markdown("#### Missing Values by Feature")
         missing_df = pd.DataFrame({
-            'Feature': data.columns,
-            'Missing Count': data.isnull().sum().values,
-            'Percentage': (data.isnull().sum().values / len(data) * 100).round(2)
+            'Feature': summary.columns,
+            'Missing Count': summary.missing.values,
+            'Percentage': (summary.missing.values / summary.n_rows * 100).round(2)
         })
         st.dataframe(missing_df[missing_df['Missing Count'] > 0], use_container_width=True)
     
     with tab3:
         st.markdown("### Statistical Summary")
-        st.dataframe(data.describe(), use_container_width=True)
+        st.dataframe(summary.describe, use_container_width=True)
+        if not summary.exact:
+            st.caption("Quartiles are estimated from a streaming histogram.")
     
     st.markdown("---")
     
@@ -648,82 +947,89 @@ elif section == "Initial Exploration":
     
     st.markdown("### Distribution of Numerical Features")
     
-    numerical_features = data.select_dtypes(include=['float64', 'int64']).columns.tolist()
-    numerical_features.remove("Gender")
-    numerical_features.remove("ProductType")
-    numerical_features.remove("ChurnStatus")
+    numerical_features = summary.numerical_features
     
     n_features = len(numerical_features)
     n_cols = 2
     n_rows = math.ceil(n_features / n_cols)
     
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(7*n_cols, 5*n_rows))
-    fig.suptitle('Distribution of Numerical Features', fontsize=18, fontweight='bold', y=1.0)
-    axes = axes.flatten() if n_features > 1 else [axes]
-    for idx, feature in enumerate(numerical_features):
-        axes[idx].hist(data[feature], bins=30, color=COLORS['dusty_rose'], edgecolor=COLORS['burgundy'], alpha=0.75, linewidth=1.5)
-        axes[idx].set_title(f'{feature} Distribution', fontweight='bold', fontsize=14)
-        axes[idx].set_xlabel(feature, fontsize=12)
-        axes[idx].set_ylabel('Frequency', fontsize=12)
-        axes[idx].axvline(data[feature].mean(), color=COLORS['burgundy'], linestyle='--', 
-                          linewidth=2.5, label=f'Mean: {data[feature].mean():.2f}')
-        axes[idx].axvline(data[feature].median(), color=COLORS['chocolate'], linestyle='--', 
-                          linewidth=2.5, label=f'Median: {data[feature].median():.2f}')
-        axes[idx].legend(fontsize=10)
-        axes[idx].grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
-    for j in range(idx+1, len(axes)):
-        fig.delaxes(axes[j])
-    plt.tight_layout()
-    st.pyplot(fig)
+    def draw_numerical_distributions():
+        fig, axes = plt.subplots(n_rows, n_cols, figsize=(7*n_cols, 5*n_rows))
+        fig.suptitle('Distribution of Numerical Features', fontsize=18, fontweight='bold', y=1.0)
+        axes = axes.flatten() if n_features > 1 else [axes]
+        for idx, feature in enumerate(numerical_features):
+            counts, edges = summary.histograms[feature]
+            feature_mean = summary.describe.loc['mean', feature]
+            feature_median = summary.describe.loc['50%', feature]
+            plot_histogram(axes[idx], counts, edges)
+            axes[idx].set_title(f'{feature} Distribution', fontweight='bold', fontsize=14)
+            axes[idx].set_xlabel(feature, fontsize=12)
+            axes[idx].set_ylabel('Frequency', fontsize=12)
+            axes[idx].axvline(feature_mean, color=COLORS['burgundy'], linestyle='--', 
+                              linewidth=2.5, label=f'Mean: {feature_mean:.2f}')
+            axes[idx].axvline(feature_median, color=COLORS['chocolate'], linestyle='--', 
+                              linewidth=2.5, label=f'Median: {feature_median:.2f}')
+            axes[idx].legend(fontsize=10)
+            axes[idx].grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
+        for j in range(idx+1, len(axes)):
+            fig.delaxes(axes[j])
+        plt.tight_layout()
+        return fig
+    show_figure("numerical_distributions", draw_numerical_distributions,
+                lambda: histogram_grid(summary.histograms, summary.describe, numerical_features, 'Distribution of Numerical Features'))
     
     st.markdown("---")
     
     st.markdown("### Distribution of Categorical Features")
     
-    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-    fig.suptitle('Categorical Features Analysis', fontsize=18, fontweight='bold', y=0.995)
-    
-    gender_counts = data['Gender'].value_counts()
-    bars1 = axes[0, 0].bar(['Male', 'Female'], gender_counts.values, color=[COLORS['dusty_rose'], COLORS['taupe']], edgecolor=COLORS['burgundy'], linewidth=2)
-    axes[0, 0].set_title('Gender Distribution', fontweight='bold', fontsize=14)
-    axes[0, 0].set_ylabel('Count', fontsize=12)
-    axes[0, 0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
-    for bar in bars1:
-        height = bar.get_height()
-        axes[0, 0].text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
-    
-    product_counts = data['ProductType'].value_counts()
-    bars2 = axes[0, 1].bar(['Basic', 'Premium'], product_counts.values, color=[COLORS['chocolate'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
-    axes[0, 1].set_title('Product Type Distribution', fontweight='bold', fontsize=14)
-    axes[0, 1].set_ylabel('Count', fontsize=12)
-    axes[0, 1].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
-    for bar in bars2:
-        height = bar.get_height()
-        axes[0, 1].text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
-    
-    churn_counts = data['ChurnStatus'].value_counts()
-    bars3 = axes[1, 0].bar(['Stayed', 'Churned'], churn_counts.values, color=[COLORS['taupe'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
-    axes[1, 0].set_title('Churn Status Distribution', fontweight='bold', fontsize=14)
-    axes[1, 0].set_ylabel('Count', fontsize=12)
-    axes[1, 0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
-    for bar in bars3:
-        height = bar.get_height()
-        axes[1, 0].text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
-    
-    fig.delaxes(axes[1, 1])
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    def draw_categorical_distributions():
+        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        fig.suptitle('Categorical Features Analysis', fontsize=18, fontweight='bold', y=0.995)
+    
+        gender_counts = summary.value_counts['Gender'].reindex([0, 1], fill_value=0)
+        bars1 = axes[0, 0].bar(['Male', 'Female'], gender_counts.values, color=[COLORS['dusty_rose'], COLORS['taupe']], edgecolor=COLORS['burgundy'], linewidth=2)
+        axes[0, 0].set_title('Gender Distribution', fontweight='bold', fontsize=14)
+        axes[0, 0].set_ylabel('Count', fontsize=12)
+        axes[0, 0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
+        for bar in bars1:
+            height = bar.get_height()
+            axes[0, 0].text(bar.get_x() + bar.get_width()/2., height,
+                            f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
+    
+        product_counts = summary.value_counts['ProductType'].reindex([0, 1], fill_value=0)
+        bars2 = axes[0, 1].bar(['Basic', 'Premium'], product_counts.values, color=[COLORS['chocolate'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
+        axes[0, 1].set_title('Product Type Distribution', fontweight='bold', fontsize=14)
+        axes[0, 1].set_ylabel('Count', fontsize=12)
+        axes[0, 1].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
+        for bar in bars2:
+            height = bar.get_height()
+            axes[0, 1].text(bar.get_x() + bar.get_width()/2., height,
+                            f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
+    
+        churn_counts = summary.value_counts['ChurnStatus'].reindex([0, 1], fill_value=0)
+        bars3 = axes[1, 0].bar(['Stayed', 'Churned'], churn_counts.values, color=[COLORS['taupe'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
+        axes[1, 0].set_title('Churn Status Distribution', fontweight='bold', fontsize=14)
+        axes[1, 0].set_ylabel('Count', fontsize=12)
+        axes[1, 0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
+        for bar in bars3:
+            height = bar.get_height()
+            axes[1, 0].text(bar.get_x() + bar.get_width()/2., height,
+                            f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
+    
+        fig.delaxes(axes[1, 1])
+    
+        plt.tight_layout()
+        return fig
+    show_figure("categorical_distributions", draw_categorical_distributions,
+                lambda: category_grid(summary.value_counts, 'Categorical Features Analysis'))
 
 elif section == "Age Preprocessing":
     st.markdown("## Age Preprocessing")
     
     st.markdown("### Step 1: Outlier Detection")
     
-    outliers_count = len(data[(data["Age"] < 18) | (data["Age"] > 90)])
+    age = data["Age"]
+    outliers_count = int(((age < 18) | (age > 90)).sum())
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -739,7 +1045,7 @@ elif section == "Age Preprocessing":
     </div>
     """, unsafe_allow_html=True)
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
+    age_stats = column_stats(age[(age >= 18) | age.isna()].to_frame())["Age"]
     
     st.markdown("---")
     
@@ -748,10 +1054,9 @@ elif section == "Age Preprocessing":
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("#### Statistical Analysis")
-        age_stats = data_clean_age["Age"].describe()
-        st.dataframe(age_stats)
+        st.dataframe(age_stats.drop(["nulls", "skew"]))
         
-        skew_value = data_clean_age["Age"].skew()
+        skew_value = age_stats["skew"]
         st.metric("Skewness", f"{skew_value:.4f}")
     
     with col2:
@@ -764,34 +1069,36 @@ elif section == "Age Preprocessing":
         </div>
         """, unsafe_allow_html=True)
     
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
+    clean_stats = load_clean_stats(DATA_PATH, clean_version(), filters)
     
     st.markdown("---")
     
     st.markdown("### Results")
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Missing Values After", data_clean_age["Age"].isnull().sum())
+        st.metric("Missing Values After", int(clean_stats.loc["nulls", "Age"]))
     with col2:
-        new_skew = data_clean_age["Age"].skew()
+        new_skew = clean_stats.loc["skew", "Age"]
         st.metric("New Skewness", f"{new_skew:.4f}")
 
 elif section == "Income Preprocessing":
     st.markdown("## Income Preprocessing")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
+    data_sc, cleaning_params = load_clean_data(DATA_PATH, filters)
+    clean_stats = load_clean_stats(DATA_PATH, clean_version(), filters)
+    raw_income = data["Income"].loc[data_sc.index]
+    income = raw_income.fillna(cleaning_params["income_fill"])
+    income_stats = column_stats(pd.DataFrame({"raw": raw_income, "filled": income}))
    
     st.markdown("### Step 1: Missing Value Imputation")
     
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("#### Distribution Analysis")
-        skew_value = data_income["Income"].skew()
+        skew_value = income_stats.loc["skew", "raw"]
         st.metric("Skewness", f"{skew_value:.4f}")
-        st.metric("Median Income", f"${data_income['Income'].median():,.2f}")
-        st.metric("Mean Income", f"${data_income['Income'].mean():,.2f}")
+        st.metric("Median Income", f"${income_stats.loc['50%', 'raw']:,.2f}")
+        st.metric("Mean Income", f"${income_stats.loc['mean', 'raw']:,.2f}")
     
     with col2:
         st.markdown("#### Imputation Strategy")
@@ -802,17 +1109,15 @@ elif section == "Income Preprocessing":
         </div>
         """, unsafe_allow_html=True)
     
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    
     st.markdown("---")
     
     st.markdown("### Step 2: Outlier Detection & Treatment")
     
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_lower_outliers_value = Q1 - 1.5 * IQR
-    income_upper_outliers_value = Q3 + 1.5 * IQR
+    Q1 = cleaning_params["income_q1"]
+    Q3 = cleaning_params["income_q3"]
+    IQR = cleaning_params["income_iqr"]
+    lower_bound = cleaning_params["income_lower"]
+    upper_bound = cleaning_params["income_upper"]
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -822,77 +1127,80 @@ elif section == "Income Preprocessing":
     with col3:
         st.metric("IQR", f"${IQR:,.2f}")
     
-    outliers = data_income[
-        (data_income["Income"] > income_upper_outliers_value) |
-        (data_income["Income"] < income_lower_outliers_value)
-    ]["Income"]
+    outliers = income[(income < lower_bound) | (income > upper_bound)]
     
     st.warning(f"**{len(outliers)} outliers detected** using IQR method")
     
-    income = data_income['Income'].dropna()
-    Q1 = income.quantile(0.25)
-    Q3 = income.quantile(0.75)
-    IQR = Q3 - Q1
-    lower_bound = Q1 - 1.5 * IQR
-    upper_bound = Q3 + 1.5 * IQR
-    outliers = income[(income < lower_bound) | (income > upper_bound)]
+    # The box and the outlier labels and table are summarized here, so drawing never touches the rows:
+    # only the most frequent distinct outliers are marked and listed, the rest summed into one line
+    box_stats = boxplot_stats(income.to_numpy())
+    view = (Q1 - IQR, Q3 + IQR)
+    visible_outliers = outliers[(outliers >= view[0]) & (outliers <= view[1])]
+    labelled, labelled_counts, unlabelled, unlabelled_count = value_summary(visible_outliers, OUTLIER_LABELS)
+    box_stats[0]['fliers'] = labelled
+    table_values, table_counts, other_values, other_count = value_summary(outliers, OUTLIER_LABELS)
+    
+    def draw_income_boxplot():
+        plt.figure(figsize=(12, 7))
+        box = plt.gca().bxp(
+            box_stats,
+            vert=True,
+            patch_artist=True,
+            boxprops=dict(facecolor=COLORS['dusty_rose'], color=COLORS['burgundy'], linewidth=2),
+            medianprops=dict(color=COLORS['burgundy'], linewidth=3),
+            whiskerprops=dict(color=COLORS['chocolate'], linewidth=2),
+            capprops=dict(color=COLORS['chocolate'], linewidth=2),
+            flierprops=dict(marker='o', color=COLORS['burgundy'], alpha=0.7, markersize=6)
+        )
     
-    if len(outliers) > 0:
-        outlier_counts = outliers.value_counts().reset_index()
-        outlier_counts.columns = ['Outlier Value', 'Count']
-        outlier_counts = outlier_counts.sort_values('Outlier Value')
-    else:
-        outlier_counts = pd.DataFrame(columns=['Outlier Value', 'Count'])
-    
-    plt.figure(figsize=(12, 7))
-    box = plt.boxplot(
-        income,
-        vert=True,
-        patch_artist=True,
-        boxprops=dict(facecolor=COLORS['dusty_rose'], color=COLORS['burgundy'], linewidth=2),
-        medianprops=dict(color=COLORS['burgundy'], linewidth=3),
-        whiskerprops=dict(color=COLORS['chocolate'], linewidth=2),
-        capprops=dict(color=COLORS['chocolate'], linewidth=2),
-        flierprops=dict(marker='o', color=COLORS['burgundy'], alpha=0.7, markersize=6)
-    )
-    
-    plt.title('Income Box Plot Focused on IQR (with Outlier Summary Table)', fontweight='bold', fontsize=16)
-    plt.ylabel('Income', fontsize=13)
-    plt.grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
-    plt.ylim(Q1 - IQR, Q3 + IQR)
-    
-    plt.text(1.1, Q1, f'Q1: ${Q1:,.2f}', color=COLORS['chocolate'], fontsize=11, fontweight='bold')
-    plt.text(1.1, income.median(), f'Median: ${income.median():,.2f}', color=COLORS['burgundy'], fontsize=11, fontweight='bold')
-    plt.text(1.1, Q3, f'Q3: ${Q3:,.2f}', color=COLORS['chocolate'], fontsize=11, fontweight='bold')
-    
-    lower_whisker = lower_bound
-
-    upper_whisker = upper_bound
- 
-    plt.text(0.9, lower_whisker, f'Lower Whisker: ${lower_bound:,.2f}', color=COLORS['chocolate'], fontsize=10, ha='right', fontweight='bold')
-    plt.text(0.9, upper_whisker, f'Upper Whisker: ${upper_bound:,.2f}', color=COLORS['chocolate'], fontsize=10, ha='right', fontweight='bold')
+        plt.title('Income Box Plot Focused on IQR (with Outlier Summary Table)', fontweight='bold', fontsize=16)
+        plt.ylabel('Income', fontsize=13)
+        plt.grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
+        plt.ylim(*view)
     
-    visible_outliers = outliers[(outliers >= plt.ylim()[0]) & (outliers <= plt.ylim()[1])]
-    for val in visible_outliers:
-        plt.plot(1, val, 'ro', color=COLORS['burgundy'])
-        plt.text(1.05, val, f'${val:,.2f}', color=COLORS['burgundy'], fontsize=9)
+        plt.text(1.1, Q1, f'Q1: ${Q1:,.2f}', color=COLORS['chocolate'], fontsize=11, fontweight='bold')
+        plt.text(1.1, income_stats.loc['50%', 'filled'], f"Median: ${income_stats.loc['50%', 'filled']:,.2f}", color=COLORS['burgundy'], fontsize=11, fontweight='bold')
+        plt.text(1.1, Q3, f'Q3: ${Q3:,.2f}', color=COLORS['chocolate'], fontsize=11, fontweight='bold')
     
-    if not outlier_counts.empty:
-        table_data = outlier_counts.round(2).astype(str).values.tolist()
-        table_data.insert(0, ['Value', 'Count'])
+        lower_whisker = lower_bound
+
+        upper_whisker = upper_bound
+ 
+        plt.text(0.9, lower_whisker, f'Lower Whisker: ${lower_bound:,.2f}', color=COLORS['chocolate'], fontsize=10, ha='right', fontweight='bold')
+        plt.text(0.9, upper_whisker, f'Upper Whisker: ${upper_bound:,.2f}', color=COLORS['chocolate'], fontsize=10, ha='right', fontweight='bold')
+    
+        for val, count in zip(labelled, labelled_counts):
+            plt.text(1.05, val, f'${val:,.2f}' + (f' (x{count})' if count > 1 else ''), color=COLORS['burgundy'], fontsize=9)
+        if unlabelled:
+            plt.text(1.05, view[0], f'+{unlabelled} more values ({unlabelled_count} customers)',
+                     color=COLORS['burgundy'], fontsize=9, va='bottom')
+    
+        if len(table_values):
+            table_data = [[str(round(float(val), 2)), str(count)] for val, count in zip(table_values, table_counts)]
+            if other_values:
+                table_data.append([f'{other_values} other values', str(other_count)])
+            table_data.insert(0, ['Value', 'Count'])
         
-        plt.table(
-            cellText=table_data,
-            colWidths=[0.15, 0.1],
-            cellLoc='center',
-            loc='right',
-            colLabels=None,
-            bbox=[1.05, 0.15, 0.3, 0.7]
-        )
-    
-    plt.tight_layout(rect=[0, 0, 0.75, 1])
-    st.pyplot(plt)
-    data_tenure = data_income.copy()
+            plt.table(
+                cellText=table_data,
+                colWidths=[0.15, 0.1],
+                cellLoc='center',
+                loc='right',
+                colLabels=None,
+                bbox=[1.05, 0.15, 0.3, 0.7]
+            )
+    
+        plt.tight_layout(rect=[0, 0, 0.75, 1])
+        return plt.gcf()
+    
+    def income_boxplot_chart():
+        box = box_stats[0]
+        summary_frame = pd.DataFrame([{'group': 'Income', 'low': box['whislo'], 'q1': box['q1'], 'median': box['med'],
+                                       'q3': box['q3'], 'high': box['whishi']}])
+        points = pd.DataFrame({'group': 'Income', 'value': labelled, 'count': labelled_counts})
+        return vega_charts.boxes(summary_frame, [COLORS['dusty_rose']], 'Income Box Plot (outliers beyond the view are in the table)',
+                                 'Income', COLORS['burgundy'], points)
+    show_figure("income_boxplot", draw_income_boxplot, income_boxplot_chart)
     
     st.markdown(f"""
 <div class="warning-box">
@@ -905,31 +1213,25 @@ elif section == "Income Preprocessing":
 """, unsafe_allow_html=True)
 
     
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    
     st.markdown("---")
     
     st.markdown("### Results")
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Outliers After Capping", len(data_income[data_income['Income'] > income_upper_outliers_value]))
+        # The cap was written in the column's own dtype (float32 once downcast), which can round it
+        # above the float64 bound, so the check compares in that dtype too
+        capped_income = data_sc["Income"]
+        st.metric("Outliers After Capping", int((capped_income > np.asarray(upper_bound, dtype=capped_income.dtype)).sum()))
     with col2:
-        new_skew = data_income["Income"].skew()
+        new_skew = clean_stats.loc["skew", "Income"]
         st.metric("New Skewness", f"{new_skew:.4f}")
 
 elif section == "Tenure Preprocessing":
     st.markdown("## Tenure Preprocessing")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
+    data_sc, _ = load_clean_data(DATA_PATH, filters)
+    clean_stats = load_clean_stats(DATA_PATH, clean_version(), filters)
+    tenure_stats = column_stats(data[["Tenure"]].loc[data_sc.index])["Tenure"]
     
     
     st.markdown("### Missing Value Imputation")
@@ -937,10 +1239,10 @@ elif section == "Tenure Preprocessing":
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("#### Distribution Analysis")
-        skew_value = data_tenure["Tenure"].skew()
+        skew_value = tenure_stats["skew"]
         st.metric("Skewness", f"{skew_value:.4f}")
-        st.metric("Mean Tenure", f"{data_tenure['Tenure'].mean():.2f} years")
-        st.metric("Median Tenure", f"{data_tenure['Tenure'].median():.2f} years")
+        st.metric("Mean Tenure", f"{tenure_stats['mean']:.2f} years")
+        st.metric("Median Tenure", f"{tenure_stats['50%']:.2f} years")
     
     with col2:
         st.markdown("#### Imputation Strategy")
@@ -952,8 +1254,6 @@ elif section == "Tenure Preprocessing":
         </div>
         """, unsafe_allow_html=True)
     
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    
     st.markdown("---")
     
     st.markdown("### Outlier Analysis")
@@ -968,26 +1268,19 @@ elif section == "Tenure Preprocessing":
     st.markdown("### Results")
     col1, col2 = st.columns(2)
     with col1:
-        st.metric("Missing Values After", data_tenure["Tenure"].isnull().sum())
+        st.metric("Missing Values After", int(clean_stats.loc["nulls", "Tenure"]))
     with col2:
-        new_skew = data_tenure["Tenure"].skew()
+        new_skew = clean_stats.loc["skew", "Tenure"]
         st.metric("New Skewness", f"{new_skew:.4f}")
 
 elif section == "Support Calls Preprocessing":
     st.markdown("## Support Calls Preprocessing")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    data_sc = data_tenure.copy()
+    data_sc, _ = load_clean_data(DATA_PATH, filters)
+    raw_sc = data["SupportCalls"].loc[data_sc.index]
+    capped_sc = raw_sc.mask(raw_sc > SUPPORT_CALLS_MAX, SUPPORT_CALLS_CAP)
+    sc_stats = column_stats(pd.DataFrame({"raw": raw_sc, "capped": capped_sc}))
+    clean_stats = load_clean_stats(DATA_PATH, clean_version(), filters)
     
     
     st.markdown("### Step 1: Outlier Detection & Treatment")
@@ -995,11 +1288,11 @@ elif section == "Support Calls Preprocessing":
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("#### Initial Distribution")
-        skew_value = data_sc["SupportCalls"].skew()
+        skew_value = sc_stats.loc["skew", "raw"]
         st.metric("Skewness", f"{skew_value:.4f}")
-        st.metric("Mean", f"{data_sc['SupportCalls'].mean():.2f} calls")
-        st.metric("Median", f"{data_sc['SupportCalls'].median():.2f} calls")
-        st.metric("Max", f"{data_sc['SupportCalls'].max():.0f} calls")
+        st.metric("Mean", f"{sc_stats.loc['mean', 'raw']:.2f} calls")
+        st.metric("Median", f"{sc_stats.loc['50%', 'raw']:.2f} calls")
+        st.metric("Max", f"{sc_stats.loc['max', 'raw']:.0f} calls")
     
     with col2:
         st.markdown("#### Treatment Strategy")
@@ -1010,8 +1303,6 @@ elif section == "Support Calls Preprocessing":
         </div>
         """, unsafe_allow_html=True)
     
-    data_sc.loc[data_sc["SupportCalls"] > 25, "SupportCalls"] = 7
-    
     st.markdown("---")
     
     st.markdown("### Step 2: Missing Value Imputation")
@@ -1019,8 +1310,8 @@ elif section == "Support Calls Preprocessing":
     col1, col2 = st.columns(2)
     with col1:
         st.markdown("#### Post-Capping Statistics")
-        st.metric("Mean After Capping", f"{data_sc['SupportCalls'].mean():.2f} calls")
-        st.metric("Median After Capping", f"{data_sc['SupportCalls'].median():.2f} calls")
+        st.metric("Mean After Capping", f"{sc_stats.loc['mean', 'capped']:.2f} calls")
+        st.metric("Median After Capping", f"{sc_stats.loc['50%', 'capped']:.2f} calls")
     
     with col2:
         st.markdown("#### Imputation Strategy")
@@ -1031,38 +1322,23 @@ elif section == "Support Calls Preprocessing":
         </div>
         """, unsafe_allow_html=True)
     
-    data_sc["SupportCalls"].fillna(int(data_sc["SupportCalls"].median()), inplace=True)
-    
     st.markdown("---")
     
     st.markdown("### Results")
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Missing Values After", data_sc["SupportCalls"].isnull().sum())
+        st.metric("Missing Values After", int(clean_stats.loc["nulls", "SupportCalls"]))
     with col2:
-        new_skew = data_sc["SupportCalls"].skew()
+        new_skew = clean_stats.loc["skew", "SupportCalls"]
         st.metric("New Skewness", f"{new_skew:.4f}")
     with col3:
-        st.metric("Max Value After", f"{data_sc['SupportCalls'].max():.0f} calls")
+        st.metric("Max Value After", f"{clean_stats.loc['max', 'SupportCalls']:.0f} calls")
 
 elif section == "After Preprocessing":
     st.markdown("## Data After Preprocessing")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    data_sc = data_tenure.copy()
-    data_sc.loc[data_sc["SupportCalls"] > 25, "SupportCalls"] = 7
-    data_sc["SupportCalls"].fillna(int(data_sc["SupportCalls"].median()), inplace=True)
-    data_processed = data_sc.copy()
+    data_processed, _ = load_clean_data(DATA_PATH, filters)
+    clean_stats = load_clean_stats(DATA_PATH, clean_version(), filters)
     
     st.markdown("### Preprocessing Summary")
     
@@ -1070,7 +1346,7 @@ elif section == "After Preprocessing":
     with col1:
         st.metric("Total Records", len(data_processed), delta=f"{len(data_processed) - len(data)} from original")
     with col2:
-        st.metric("Missing Values", data_processed.isnull().sum().sum(), delta=f"-{data.isnull().sum().sum()}")
+        st.metric("Missing Values", data_processed.null_counts().sum(), delta=f"-{data.null_counts().sum()}")
     with col3:
         st.metric("Features Cleaned", "4")
     with col4:
@@ -1080,93 +1356,85 @@ elif section == "After Preprocessing":
     
     st.markdown("### Numerical Features Distribution (After Preprocessing)")
     
-    numerical_features = data_processed.select_dtypes(include=['float64', 'int64']).columns.tolist()
-    numerical_features.remove("Gender")
-    numerical_features.remove("ProductType")
-    numerical_features.remove("ChurnStatus")
+    numerical_features = ['Age', 'Income', 'Tenure', 'SupportCalls']
+    histograms = load_clean_histograms(DATA_PATH, clean_version(), filters)
     
     n_features = len(numerical_features)
     n_cols = 2
     n_rows = math.ceil(n_features / n_cols)
     
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(7*n_cols, 5*n_rows))
-    fig.suptitle('Distribution of Numerical Features (After Preprocessing)', fontsize=18, fontweight='bold', y=1.0)
-    axes = axes.flatten() if n_features > 1 else [axes]
-    for idx, feature in enumerate(numerical_features):
-        axes[idx].hist(data_processed[feature], bins=30, color=COLORS['dusty_rose'], edgecolor=COLORS['burgundy'], alpha=0.75, linewidth=1.5)
-        axes[idx].set_title(f'{feature} Distribution', fontweight='bold', fontsize=14)
-        axes[idx].set_xlabel(feature, fontsize=12)
-        axes[idx].set_ylabel('Frequency', fontsize=12)
-        axes[idx].axvline(data_processed[feature].mean(), color=COLORS['burgundy'], linestyle='--', 
-                          linewidth=2.5, label=f'Mean: {data_processed[feature].mean():.2f}')
-        axes[idx].axvline(data_processed[feature].median(), color=COLORS['chocolate'], linestyle='--', 
-                          linewidth=2.5, label=f'Median: {data_processed[feature].median():.2f}')
-        axes[idx].legend(fontsize=10)
-        axes[idx].grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
-    for j in range(idx+1, len(axes)):
-        fig.delaxes(axes[j])
-    plt.tight_layout()
-    st.pyplot(fig)
+    def draw_numerical_distributions():
+        fig, axes = plt.subplots(n_rows, n_cols, figsize=(7*n_cols, 5*n_rows))
+        fig.suptitle('Distribution of Numerical Features (After Preprocessing)', fontsize=18, fontweight='bold', y=1.0)
+        axes = axes.flatten() if n_features > 1 else [axes]
+        for idx, feature in enumerate(numerical_features):
+            plot_histogram(axes[idx], *histograms[feature])
+            axes[idx].set_title(f'{feature} Distribution', fontweight='bold', fontsize=14)
+            axes[idx].set_xlabel(feature, fontsize=12)
+            axes[idx].set_ylabel('Frequency', fontsize=12)
+            axes[idx].axvline(clean_stats.loc['mean', feature], color=COLORS['burgundy'], linestyle='--', 
+                              linewidth=2.5, label=f"Mean: {clean_stats.loc['mean', feature]:.2f}")
+            axes[idx].axvline(clean_stats.loc['50%', feature], color=COLORS['chocolate'], linestyle='--', 
+                              linewidth=2.5, label=f"Median: {clean_stats.loc['50%', feature]:.2f}")
+            axes[idx].legend(fontsize=10)
+            axes[idx].grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
+        for j in range(idx+1, len(axes)):
+            fig.delaxes(axes[j])
+        plt.tight_layout()
+        return fig
+    show_figure("numerical_distributions", draw_numerical_distributions,
+                lambda: histogram_grid(histograms, clean_stats, numerical_features, 'Distribution of Numerical Features (After Preprocessing)'))
     
     st.markdown("---")
     
     st.markdown("### Categorical Features Distribution (After Preprocessing)")
     
-    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
-    fig.suptitle('Categorical Features Analysis (After Preprocessing)', fontsize=18, fontweight='bold', y=0.995)
-    
-    gender_counts = data_processed['Gender'].value_counts()
-    bars1 = axes[0, 0].bar(['Male', 'Female'], gender_counts.values, color=[COLORS['dusty_rose'], COLORS['taupe']], edgecolor=COLORS['burgundy'], linewidth=2)
-    axes[0, 0].set_title('Gender Distribution', fontweight='bold', fontsize=14)
-    axes[0, 0].set_ylabel('Count', fontsize=12)
-    axes[0, 0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
-    for bar in bars1:
-        height = bar.get_height()
-        axes[0, 0].text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
-    
-    product_counts = data_processed['ProductType'].value_counts()
-    bars2 = axes[0, 1].bar(['Basic', 'Premium'], product_counts.values, color=[COLORS['chocolate'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
-    axes[0, 1].set_title('Product Type Distribution', fontweight='bold', fontsize=14)
-    axes[0, 1].set_ylabel('Count', fontsize=12)
-    axes[0, 1].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
-    for bar in bars2:
-        height = bar.get_height()
-        axes[0, 1].text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
-    
-    churn_counts = data_processed['ChurnStatus'].value_counts()
-    bars3 = axes[1, 0].bar(['Stayed', 'Churned'], churn_counts.values, color=[COLORS['taupe'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
-    axes[1, 0].set_title('Churn Status Distribution', fontweight='bold', fontsize=14)
-    axes[1, 0].set_ylabel('Count', fontsize=12)
-    axes[1, 0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
-    for bar in bars3:
-        height = bar.get_height()
-        axes[1, 0].text(bar.get_x() + bar.get_width()/2., height,
-                        f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
-    
-    fig.delaxes(axes[1, 1])
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    def draw_categorical_distributions():
+        fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+        fig.suptitle('Categorical Features Analysis (After Preprocessing)', fontsize=18, fontweight='bold', y=0.995)
+    
+        gender_counts = data_processed['Gender'].value_counts().reindex([0, 1], fill_value=0)
+        bars1 = axes[0, 0].bar(['Male', 'Female'], gender_counts.values, color=[COLORS['dusty_rose'], COLORS['taupe']], edgecolor=COLORS['burgundy'], linewidth=2)
+        axes[0, 0].set_title('Gender Distribution', fontweight='bold', fontsize=14)
+        axes[0, 0].set_ylabel('Count', fontsize=12)
+        axes[0, 0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
+        for bar in bars1:
+            height = bar.get_height()
+            axes[0, 0].text(bar.get_x() + bar.get_width()/2., height,
+                            f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
+    
+        product_counts = data_processed['ProductType'].value_counts().reindex([0, 1], fill_value=0)
+        bars2 = axes[0, 1].bar(['Basic', 'Premium'], product_counts.values, color=[COLORS['chocolate'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
+        axes[0, 1].set_title('Product Type Distribution', fontweight='bold', fontsize=14)
+        axes[0, 1].set_ylabel('Count', fontsize=12)
+        axes[0, 1].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
+        for bar in bars2:
+            height = bar.get_height()
+            axes[0, 1].text(bar.get_x() + bar.get_width()/2., height,
+                            f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
+    
+        churn_counts = data_processed['ChurnStatus'].value_counts().reindex([0, 1], fill_value=0)
+        bars3 = axes[1, 0].bar(['Stayed', 'Churned'], churn_counts.values, color=[COLORS['taupe'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
+        axes[1, 0].set_title('Churn Status Distribution', fontweight='bold', fontsize=14)
+        axes[1, 0].set_ylabel('Count', fontsize=12)
+        axes[1, 0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
+        for bar in bars3:
+            height = bar.get_height()
+            axes[1, 0].text(bar.get_x() + bar.get_width()/2., height,
+                            f'{int(height):,}', ha='center', va='bottom', fontweight='bold', fontsize=11)
+    
+        fig.delaxes(axes[1, 1])
+    
+        plt.tight_layout()
+        return fig
+    show_figure("categorical_distributions", draw_categorical_distributions,
+                lambda: category_grid({col: data_processed[col].value_counts() for col, *_ in CATEGORY_PANELS},
+                                      'Categorical Features Analysis (After Preprocessing)'))
 
 elif section == "Standardization":
     st.markdown("## Feature Standardization")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    data_sc = data_tenure.copy()
-    data_sc.loc[data_sc["SupportCalls"] > 25, "SupportCalls"] = 7
-    data_sc["SupportCalls"].fillna(int(data_sc["SupportCalls"].median()), inplace=True)
+    data_sc, _ = load_clean_data(DATA_PATH, filters)
     
     st.markdown("### Z-Score Standardization Formula")
     st.latex(r"z = \frac{x - \mu}{\sigma}")
@@ -1176,90 +1444,103 @@ elif section == "Standardization":
     
     st.markdown("### Applying Standardization")
     
-    data_standardized = data_sc.copy()
+    clean_stats = load_clean_stats(DATA_PATH, clean_version(), filters)
     
     features_to_standardize = ["Age", "Income", "Tenure", "SupportCalls"]
     
+    data_standardized = standardize(data_sc[features_to_standardize], features_to_standardize, clean_stats)
+    standardized_stats = column_stats(data_standardized, features_to_standardize)
+    
     for feature in features_to_standardize:
         with st.expander(f"{feature} Standardization Details"):
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown("**Before Standardization**")
-                st.metric("Mean", f"{data_sc[feature].mean():.2f}")
-                st.metric("Std Dev", f"{data_sc[feature].std():.2f}")
-            
-            data_standardized[feature] = (data_standardized[feature] - data_standardized[feature].mean()) / data_standardized[feature].std()
+                st.metric("Mean", f"{clean_stats.loc['mean', feature]:.2f}")
+                st.metric("Std Dev", f"{clean_stats.loc['std', feature]:.2f}")
             
             with col2:
                 st.markdown("**After Standardization**")
-                st.metric("Mean", f"{data_standardized[feature].mean():.6f}")
-                st.metric("Std Dev", f"{data_standardized[feature].std():.6f}")
+                st.metric("Mean", f"{standardized_stats.loc['mean', feature]:.6f}")
+                st.metric("Std Dev", f"{standardized_stats.loc['std', feature]:.6f}")
     
     st.markdown("---")
     
     st.markdown("### Standardized Distributions")
     
-    numerical_features = data_standardized.select_dtypes(include=['float64', 'int64']).columns.tolist()
-    numerical_features.remove("Gender")
-    numerical_features.remove("ProductType")
-    numerical_features.remove("ChurnStatus")
+    numerical_features = features_to_standardize
+    histograms = {}
+    for feature, (counts, edges) in load_clean_histograms(DATA_PATH, clean_version(), filters).items():
+        histograms[feature] = counts, (edges - clean_stats.loc['mean', feature]) / clean_stats.loc['std', feature]
     
     n_features = len(numerical_features)
     n_cols = 2
     n_rows = math.ceil(n_features / n_cols)
     
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(7*n_cols, 5*n_rows))
-    fig.suptitle('Distribution of Numerical Features (Standardized)', fontsize=18, fontweight='bold', y=1.0)
-    axes = axes.flatten() if n_features > 1 else [axes]
-    for idx, feature in enumerate(numerical_features):
-        axes[idx].hist(data_standardized[feature], bins=30, color=COLORS['dusty_rose'], edgecolor=COLORS['burgundy'], alpha=0.75, linewidth=1.5)
-        axes[idx].set_title(f'{feature} Distribution', fontweight='bold', fontsize=14)
-        axes[idx].set_xlabel(feature, fontsize=12)
-        axes[idx].set_ylabel('Frequency', fontsize=12)
-        axes[idx].axvline(data_standardized[feature].mean(), color=COLORS['burgundy'], linestyle='--', 
-                          linewidth=2.5, label=f'Mean: {data_standardized[feature].mean():.2f}')
-        axes[idx].axvline(data_standardized[feature].median(), color=COLORS['chocolate'], linestyle='--', 
-                          linewidth=2.5, label=f'Median: {data_standardized[feature].median():.2f}')
-        axes[idx].legend(fontsize=10)
-        axes[idx].grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
-    for j in range(idx+1, len(axes)):
-        fig.delaxes(axes[j])
-    plt.tight_layout()
-    st.pyplot(fig)
+    def draw_standardized_distributions():
+        fig, axes = plt.subplots(n_rows, n_cols, figsize=(7*n_cols, 5*n_rows))
+        fig.suptitle('Distribution of Numerical Features (Standardized)', fontsize=18, fontweight='bold', y=1.0)
+        axes = axes.flatten() if n_features > 1 else [axes]
+        for idx, feature in enumerate(numerical_features):
+            plot_histogram(axes[idx], *histograms[feature])
+            axes[idx].set_title(f'{feature} Distribution', fontweight='bold', fontsize=14)
+            axes[idx].set_xlabel(feature, fontsize=12)
+            axes[idx].set_ylabel('Frequency', fontsize=12)
+            axes[idx].axvline(standardized_stats.loc['mean', feature], color=COLORS['burgundy'], linestyle='--', 
+                              linewidth=2.5, label=f"Mean: {standardized_stats.loc['mean', feature]:.2f}")
+            axes[idx].axvline(standardized_stats.loc['50%', feature], color=COLORS['chocolate'], linestyle='--', 
+                              linewidth=2.5, label=f"Median: {standardized_stats.loc['50%', feature]:.2f}")
+            axes[idx].legend(fontsize=10)
+            axes[idx].grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
+        for j in range(idx+1, len(axes)):
+            fig.delaxes(axes[j])
+        plt.tight_layout()
+        return fig
+    show_figure("standardized_distributions", draw_standardized_distributions,
+                lambda: histogram_grid(histograms, standardized_stats, numerical_features, 'Distribution of Numerical Features (Standardized)'))
 
 elif section == "EDA - Scatter Plots":
     st.markdown("## Exploratory Data Analysis: Scatter Plots")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    data_sc = data_tenure.copy()
-    data_sc.loc[data_sc["SupportCalls"] > 25, "SupportCalls"] = 7
-    data_sc["SupportCalls"].fillna(int(data_sc["SupportCalls"].median()), inplace=True)
-    
-    numeric_cols = data_sc.select_dtypes(include=["float64", "int64"]).columns.drop(["ChurnStatus", "ProductType", "Gender"])
+    data_sc, _ = load_clean_data(DATA_PATH, filters)
+    
+    numeric_cols = ["Age", "Income", "Tenure", "SupportCalls"]
+    correlations = load_correlations(DATA_PATH, clean_version(), filters)
     
     st.markdown("### Feature vs Churn Status")
     
+    density_mode = len(data_sc) > SCATTER_DENSITY_THRESHOLD
+    if density_mode:
+        st.caption(f"{len(data_sc):,} customers exceed the {SCATTER_DENSITY_THRESHOLD:,}-row scatter limit, "
+                   f"so each feature is binned into {SCATTER_DENSITY_BINS} intervals per churn class.")
+    
     for col in numeric_cols:
         st.markdown(f"#### {col} vs Churn Status")
-        fig, ax = plt.subplots(figsize=(11, 6))
-        sns.scatterplot(data=data_sc, x=col, y="ChurnStatus", alpha=0.65, ax=ax, s=60, color=COLORS['dusty_rose'], edgecolor=COLORS['burgundy'], linewidth=0.5)
-        ax.set_title(f"{col} vs ChurnStatus (Scatter Plot)", fontsize=16, fontweight='bold')
-        ax.set_ylabel("Churn Status (0=Stayed, 1=Churned)", fontsize=12)
-        ax.set_xlabel(col, fontsize=12)
-        ax.grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
-        st.pyplot(fig)
+        def draw_scatter():
+            fig, ax = plt.subplots(figsize=(11, 6))
+            if density_mode:
+                from matplotlib.colors import LinearSegmentedColormap, LogNorm
+                counts, edges, churn_rate = churn_density(data_sc[col], data_sc["ChurnStatus"], bins=SCATTER_DENSITY_BINS)
+                density_cmap = LinearSegmentedColormap.from_list('density', [COLORS['cream'], COLORS['dusty_rose'], COLORS['burgundy']])
+                mesh = ax.pcolormesh(edges, CHURN_EDGES, np.ma.masked_equal(counts, 0), cmap=density_cmap, norm=LogNorm(vmin=1), edgecolors='face')
+                fig.colorbar(mesh, ax=ax, pad=0.08, label='Customers')
+                ax.set_yticks([0, 1])
+                filled_bins = ~np.isnan(churn_rate)
+                rate_ax = ax.twinx()
+                rate_ax.plot(((edges[:-1] + edges[1:]) / 2)[filled_bins], churn_rate[filled_bins], color=COLORS['chocolate'], marker='o', markersize=4, linewidth=2)
+                rate_ax.set_ylim(0, min(1.0, churn_rate[filled_bins].max() * 1.5) if filled_bins.any() else 1.0)
+                rate_ax.set_ylabel('Churn rate per bin', fontsize=12)
+                ax.set_title(f"{col} vs ChurnStatus (Density)", fontsize=16, fontweight='bold')
+            else:
+                sns.scatterplot(data=data_sc[[col, "ChurnStatus"]], x=col, y="ChurnStatus", alpha=0.65, ax=ax, s=60, color=COLORS['dusty_rose'], edgecolor=COLORS['burgundy'], linewidth=0.5)
+                ax.set_title(f"{col} vs ChurnStatus (Scatter Plot)", fontsize=16, fontweight='bold')
+            ax.set_ylabel("Churn Status (0=Stayed, 1=Churned)", fontsize=12)
+            ax.set_xlabel(col, fontsize=12)
+            ax.grid(True, alpha=0.25, linestyle=':', linewidth=0.8)
+            return fig
+        show_figure(f"scatter_{col}", draw_scatter)
         
-        correlation = data_sc[[col, "ChurnStatus"]].corr().iloc[0, 1]
+        correlation = correlations.r.loc[col, "ChurnStatus"]
         st.markdown(f'<div class="insight-box"><strong>Correlation</strong>: {correlation:.3f}</div>', unsafe_allow_html=True)
         
         st.markdown("---")
@@ -1267,109 +1548,113 @@ elif section == "EDA - Scatter Plots":
 elif section == "EDA - Churn Analysis":
     st.markdown("## Exploratory Data Analysis: Churn Rate by Category")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    data_sc = data_tenure.copy()
-    data_sc.loc[data_sc["SupportCalls"] > 25, "SupportCalls"] = 7
-    data_sc["SupportCalls"].fillna(int(data_sc["SupportCalls"].median()), inplace=True)
     
     st.markdown("### Churn Rate Comparison")
     
-    fig, axes = plt.subplots(1, 2, figsize=(15, 6))
-    
-    gender_churn = data_sc.groupby('Gender')['ChurnStatus'].mean() * 100
-    bars1 = axes[0].bar(['Male', 'Female'], gender_churn.values, color=[COLORS['dusty_rose'], COLORS['taupe']], edgecolor=COLORS['burgundy'], linewidth=2)
-    axes[0].set_title('Churn Rate by Gender', fontsize=16, fontweight='bold')
-    axes[0].set_ylabel('Churn Rate (%)', fontsize=13)
-    axes[0].set_ylim(0, 100)
-    axes[0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
-    for i, v in enumerate(gender_churn.values):
-        axes[0].text(i, v + 3, f'{v:.1f}%', ha='center', fontweight='bold', fontsize=13)
-    
-    product_churn = data_sc.groupby('ProductType')['ChurnStatus'].mean() * 100
-    bars2 = axes[1].bar(['Basic', 'Premium'], product_churn.values, color=[COLORS['chocolate'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
-    axes[1].set_title('Churn Rate by Product Type', fontsize=16, fontweight='bold')
-    axes[1].set_ylabel('Churn Rate (%)', fontsize=13)
-    axes[1].set_ylim(0, 100)
-    axes[1].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
-    for i, v in enumerate(product_churn.values):
-        axes[1].text(i, v + 3, f'{v:.1f}%', ha='center', fontweight='bold', fontsize=13)
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+    def draw_churn_rates():
+        fig, axes = plt.subplots(1, 2, figsize=(15, 6))
+    
+        gender_churn = churn_rates('Gender')
+        bars1 = axes[0].bar(['Male', 'Female'], gender_churn.values, color=[COLORS['dusty_rose'], COLORS['taupe']], edgecolor=COLORS['burgundy'], linewidth=2)
+        axes[0].set_title('Churn Rate by Gender', fontsize=16, fontweight='bold')
+        axes[0].set_ylabel('Churn Rate (%)', fontsize=13)
+        axes[0].set_ylim(0, 100)
+        axes[0].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
+        for i, v in enumerate(gender_churn.values):
+            axes[0].text(i, v + 3, f'{v:.1f}%', ha='center', fontweight='bold', fontsize=13)
+    
+        product_churn = churn_rates('ProductType')
+        bars2 = axes[1].bar(['Basic', 'Premium'], product_churn.values, color=[COLORS['chocolate'], COLORS['burgundy']], edgecolor=COLORS['burgundy'], linewidth=2)
+        axes[1].set_title('Churn Rate by Product Type', fontsize=16, fontweight='bold')
+        axes[1].set_ylabel('Churn Rate (%)', fontsize=13)
+        axes[1].set_ylim(0, 100)
+        axes[1].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
+        for i, v in enumerate(product_churn.values):
+            axes[1].text(i, v + 3, f'{v:.1f}%', ha='center', fontweight='bold', fontsize=13)
+    
+        plt.tight_layout()
+        return fig
+    
+    def churn_rates_chart():
+        panels = []
+        for (col, _, labels, colors), title in zip(CATEGORY_PANELS, ['Churn Rate by Gender', 'Churn Rate by Product Type']):
+            rates = churn_rates(col)
+            panels.append(vega_charts.bars(labels, rates.to_numpy(), [COLORS[c] for c in colors], title, 'Churn Rate (%)',
+                                           COLORS['burgundy'], fmt='.1f', domain=[0, 100]))
+        return vega_charts.grid(panels, 'Churn Rate Comparison')
+    show_figure("churn_rates", draw_churn_rates, churn_rates_chart)
 
 elif section == "EDA - Box Plots":
     st.markdown("## Exploratory Data Analysis: Box Plots")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    data_sc = data_tenure.copy()
-    data_sc.loc[data_sc["SupportCalls"] > 25, "SupportCalls"] = 7
-    data_sc["SupportCalls"].fillna(int(data_sc["SupportCalls"].median()), inplace=True)
+    data_sc, _ = load_clean_data(DATA_PATH, filters)
     
     numerical_features = ['Age', 'Income', 'Tenure', 'SupportCalls']
-    fig, axes = plt.subplots(2, 2, figsize=(15, 11))
-    axes = axes.ravel()
-    
-    for idx, col in enumerate(numerical_features):
-        box_parts = axes[idx].boxplot(
-            [data_sc[data_sc['ChurnStatus'] == 0][col].dropna(), 
-             data_sc[data_sc['ChurnStatus'] == 1][col].dropna()],
-            labels=['Stayed', 'Churned'],
-            patch_artist=True,
-            widths=0.6
-        )
+    churn_status = data_sc['ChurnStatus']
+    stayed = data_sc[numerical_features].loc[churn_status == 0]
+    churned = data_sc[numerical_features].loc[churn_status == 1]
+    def draw_churn_boxplots():
+        fig, axes = plt.subplots(2, 2, figsize=(15, 11))
+        axes = axes.ravel()
+    
+        for idx, col in enumerate(numerical_features):
+            box_parts = axes[idx].boxplot(
+                [stayed[col].dropna(), 
+                 churned[col].dropna()],
+                labels=['Stayed', 'Churned'],
+                patch_artist=True,
+                widths=0.6
+            )
         
-        for patch, color in zip(box_parts['boxes'], [COLORS['taupe'], COLORS['burgundy']]):
-            patch.set_facecolor(color)
-            patch.set_alpha(0.7)
-            patch.set_linewidth(2)
+            for patch, color in zip(box_parts['boxes'], [COLORS['taupe'], COLORS['burgundy']]):
+                patch.set_facecolor(color)
+                patch.set_alpha(0.7)
+                patch.set_linewidth(2)
         
-        for element in ['whiskers', 'fliers', 'means', 'medians', 'caps']:
-            plt.setp(box_parts[element], color=COLORS['chocolate'], linewidth=2)
+            for element in ['whiskers', 'fliers', 'means', 'medians', 'caps']:
+                plt.setp(box_parts[element], color=COLORS['chocolate'], linewidth=2)
         
-        axes[idx].set_title(f'{col} vs Churn Status', fontsize=15, fontweight='bold')
-        axes[idx].set_xlabel('Churn Status', fontsize=12)
-        axes[idx].set_ylabel(col, fontsize=12)
-        axes[idx].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
-    
-    plt.tight_layout()
-    st.pyplot(fig)
+            axes[idx].set_title(f'{col} vs Churn Status', fontsize=15, fontweight='bold')
+            axes[idx].set_xlabel('Churn Status', fontsize=12)
+            axes[idx].set_ylabel(col, fontsize=12)
+            axes[idx].grid(True, alpha=0.25, axis='y', linestyle=':', linewidth=0.8)
+    
+        plt.tight_layout()
+        return fig
+    
+    
+    # Same 1.5 x IQR whiskers as the static boxplot; the most frequent distinct outliers are sent as points
+    def churn_boxplots_chart():
+        panels = []
+        for col in numerical_features:
+            boxes, points = [], []
+            for label, values in [('Stayed', stayed[col]), ('Churned', churned[col])]:
+                box = boxplot_stats(values.dropna().to_numpy())[0]
+                boxes.append({'group': label, 'low': box['whislo'], 'q1': box['q1'], 'median': box['med'],
+                              'q3': box['q3'], 'high': box['whishi']})
+                fliers, flier_counts, _, _ = value_summary(box['fliers'], OUTLIER_LABELS)
+                points.append(pd.DataFrame({'group': label, 'value': fliers, 'count': flier_counts}))
+            panels.append(vega_charts.boxes(pd.DataFrame(boxes), [COLORS['taupe'], COLORS['burgundy']], f'{col} vs Churn Status',
+                                            col, COLORS['chocolate'], pd.concat(points, ignore_index=True)))
+        return vega_charts.grid(panels, 'Numerical Features by Churn Status')
+    show_figure("churn_boxplots", draw_churn_boxplots, churn_boxplots_chart)
     
     st.markdown("---")
     
     st.markdown("### Statistical Comparison")
     
+    stayed_stats = column_stats(stayed)
+    churned_stats = column_stats(churned)
+    
     comparison_data = []
     for feature in numerical_features:
-        stayed = data_sc[data_sc['ChurnStatus'] == 0][feature]
-        churned = data_sc[data_sc['ChurnStatus'] == 1][feature]
-        
         comparison_data.append({
             'Feature': feature,
-            'Stayed (Mean)': f"{stayed.mean():.2f}",
-            'Churned (Mean)': f"{churned.mean():.2f}",
-            'Difference': f"{abs(stayed.mean() - churned.mean()):.2f}",
-            'Stayed (Median)': f"{stayed.median():.2f}",
-            'Churned (Median)': f"{churned.median():.2f}"
+            'Stayed (Mean)': f"{stayed_stats.loc['mean', feature]:.2f}",
+            'Churned (Mean)': f"{churned_stats.loc['mean', feature]:.2f}",
+            'Difference': f"{abs(stayed_stats.loc['mean', feature] - churned_stats.loc['mean', feature]):.2f}",
+            'Stayed (Median)': f"{stayed_stats.loc['50%', feature]:.2f}",
+            'Churned (Median)': f"{churned_stats.loc['50%', feature]:.2f}"
         })
     
     comparison_df = pd.DataFrame(comparison_data)
@@ -1378,60 +1663,50 @@ elif section == "EDA - Box Plots":
 elif section == "Correlation":
     st.markdown("## Correlation Analysis")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    data_sc = data_tenure.copy()
-    data_sc.loc[data_sc["SupportCalls"] > 25, "SupportCalls"] = 7
-    data_sc["SupportCalls"].fillna(int(data_sc["SupportCalls"].median()), inplace=True)
-    
-    data_corr_matrix = data_sc.drop(["CustomerID"], axis=1)
-    data_corr_matrix = data_corr_matrix.corr(method='pearson')
+    data_sc, _ = load_clean_data(DATA_PATH, filters)
     
     st.markdown("### Full Correlation Heatmap")
     
-    numerical_cols = ['Age', 'Gender', 'Income', 'Tenure', 'ProductType', 'SupportCalls', 'ChurnStatus']
-    correlation_matrix = data_sc[numerical_cols].corr(method='pearson')
-    
-    fig, ax = plt.subplots(figsize=(13, 10))
-    
-    from matplotlib.colors import LinearSegmentedColormap
-    colors_list = [COLORS['burgundy'], COLORS['dusty_rose'], '#ffffff',COLORS['dusty_rose'],COLORS['burgundy']]
-    n_bins = 100
-    cmap = LinearSegmentedColormap.from_list('custom', colors_list, N=n_bins)
-    
-    color_matrix = correlation_matrix.copy()
-    color_matrix = color_matrix.clip(lower=-0.5, upper=0.5)
-    for i in range(color_matrix.shape[0]):
-        color_matrix.iat[i, i] = 0.5
-    
-    annot_matrix = correlation_matrix.round(3).astype(str)
-    
-    sns.heatmap(
-        color_matrix,
-        annot=annot_matrix,
-        fmt='',
-        cmap=cmap,
-        square=True,
-        linewidths=1.5,
-        cbar_kws={"shrink": 0.8},
-        ax=ax,
-        vmin=-0.5,
-        vmax=0.5,
-        annot_kws={"fontsize": 11, "fontweight": "bold"}
-    )
-    
-    ax.set_title('Feature Correlation Matrix (Pearson)', fontsize=18, fontweight='bold', pad=20)
-    plt.tight_layout()
-    st.pyplot(fig)
+    method = st.radio("Method", ["Pearson", "Spearman"], horizontal=True,
+                      help="Spearman correlates the ranks, so it also picks up monotonic relationships that are not linear.")
+    correlation_matrix = load_correlations(DATA_PATH, clean_version(), filters, method.lower()).r
+    
+    def draw_correlation_heatmap():
+        fig, ax = plt.subplots(figsize=(13, 10))
+    
+        from matplotlib.colors import LinearSegmentedColormap
+        colors_list = [COLORS['burgundy'], COLORS['dusty_rose'], '#ffffff',COLORS['dusty_rose'],COLORS['burgundy']]
+        n_bins = 100
+        cmap = LinearSegmentedColormap.from_list('custom', colors_list, N=n_bins)
+    
+        color_matrix = correlation_matrix.copy()
+        color_matrix = color_matrix.clip(lower=-0.5, upper=0.5)
+        for i in range(color_matrix.shape[0]):
+            color_matrix.iat[i, i] = 0.5
+    
+        annot_matrix = correlation_matrix.round(3).astype(str)
+    
+        sns.heatmap(
+            color_matrix,
+            annot=annot_matrix,
+            fmt='',
+            cmap=cmap,
+            square=True,
+            linewidths=1.5,
+            cbar_kws={"shrink": 0.8},
+            ax=ax,
+            vmin=-0.5,
+            vmax=0.5,
+            annot_kws={"fontsize": 11, "fontweight": "bold"}
+        )
+    
+        ax.set_title(f'Feature Correlation Matrix ({method})', fontsize=18, fontweight='bold', pad=20)
+        plt.tight_layout()
+        return fig
+    show_figure(f"correlation_heatmap_{method}", draw_correlation_heatmap,
+                lambda: vega_charts.heatmap(correlation_matrix, f'Feature Correlation Matrix ({method})',
+                                            [COLORS['burgundy'], COLORS['dusty_rose'], '#ffffff', COLORS['dusty_rose'], COLORS['burgundy']],
+                                            [COLORS['chocolate'], '#ffffff']))
     
     st.markdown("---")
     
@@ -1439,26 +1714,30 @@ elif section == "Correlation":
     
     churn_correlation = correlation_matrix['ChurnStatus'].sort_values(ascending=False).drop('ChurnStatus')
     
-    fig, ax = plt.subplots(figsize=(11, 7))
-    bar_colors = [COLORS['dusty_rose'] if x > 0 else COLORS['burgundy'] for x in churn_correlation.values]
-    bars = ax.barh(
-        churn_correlation.index,
-        churn_correlation.values,
-        color=bar_colors,
-        edgecolor=COLORS['burgundy'],
-        linewidth=2
-    )
-    ax.set_xlabel('Correlation Coefficient', fontsize=13, fontweight='bold')
-    ax.set_title('Feature Correlation with Churn Status', fontsize=16, fontweight='bold')
-    ax.axvline(x=0, color=COLORS['burgundy'], linestyle='-', linewidth=1.2)
-    
-    for i, (bar, value) in enumerate(zip(bars, churn_correlation.values)):
-        ax.text(value + 0.01 if value > 0 else value - 0.01, i, f'{value:.3f}',
-                va='center', ha='left' if value > 0 else 'right', fontweight='bold', color=COLORS['chocolate'], fontsize=11)
-    
-    ax.grid(True, alpha=0.25, axis='x', linestyle=':', linewidth=0.8)
-    plt.tight_layout()
-    st.pyplot(fig)
+    def draw_churn_correlation():
+        fig, ax = plt.subplots(figsize=(11, 7))
+        bar_colors = [COLORS['dusty_rose'] if x > 0 else COLORS['burgundy'] for x in churn_correlation.values]
+        bars = ax.barh(
+            churn_correlation.index,
+            churn_correlation.values,
+            color=bar_colors,
+            edgecolor=COLORS['burgundy'],
+            linewidth=2
+        )
+        ax.set_xlabel('Correlation Coefficient', fontsize=13, fontweight='bold')
+        ax.set_title('Feature Correlation with Churn Status', fontsize=16, fontweight='bold')
+        ax.axvline(x=0, color=COLORS['burgundy'], linestyle='-', linewidth=1.2)
+    
+        for i, (bar, value) in enumerate(zip(bars, churn_correlation.values)):
+            ax.text(value + 0.01 if value > 0 else value - 0.01, i, f'{value:.3f}',
+                    va='center', ha='left' if value > 0 else 'right', fontweight='bold', color=COLORS['chocolate'], fontsize=11)
+    
+        ax.grid(True, alpha=0.25, axis='x', linestyle=':', linewidth=0.8)
+        plt.tight_layout()
+        return fig
+    show_figure(f"churn_correlation_{method}", draw_churn_correlation,
+                lambda: vega_charts.diverging_bars(churn_correlation, 'Feature Correlation with Churn Status', 'Correlation Coefficient',
+                                                   COLORS['dusty_rose'], COLORS['burgundy'], COLORS['burgundy']))
     
     st.markdown("---")
     
@@ -1485,46 +1764,48 @@ elif section == "Correlation":
     st.markdown("### Pairplot - Feature Pair Interactions")
     
     top_features = churn_correlation.abs().nlargest(3).index.tolist() + ['ChurnStatus']
-    
-    pairplot_data = data_sc[top_features].copy()
-    pairplot_data['ChurnStatus'] = pairplot_data['ChurnStatus'].map({0: 'Stayed', 1: 'Churned'})
-    
-    from pandas.plotting import scatter_matrix
-    
-    axarr = scatter_matrix(
-        pairplot_data,
-        alpha=0.65,
-        figsize=(14, 12),
-        diagonal='hist',
-        c=data_sc['ChurnStatus'],
-        cmap='RdYlGn_r',
-        s=55,
-        edgecolors=COLORS['burgundy'],
-        linewidths=0.3
-    )
-    n = len(axarr)
-    for i in range(n):
-        ax = axarr[i, i]
-        for patch in ax.patches:
-            patch.set_facecolor(COLORS['dusty_rose'])
-            patch.set_edgecolor(COLORS['burgundy'])
-            patch.set_linewidth(1.5)
-            patch.set_alpha(0.75)
-    
-    for i in range(n):
-        for j in range(n):
-            axarr[i, j].grid(True, alpha=0.2, linestyle=':', linewidth=0.6)
-    
-    plt.suptitle('Pairplot of Top Correlated Features', fontsize=18, fontweight='bold', y=0.995)
-    st.pyplot(plt.gcf())
+    sample = stratified_sample(data_sc[top_features], PAIRPLOT_SAMPLE_SIZE, seed=PAIRPLOT_SEED)
+    st.caption(f"Drawn from a sample of {len(sample):,} of {len(data_sc):,} customers, stratified by "
+               f"ChurnStatus (seed {PAIRPLOT_SEED}).")
+    
+    def draw_pairplot():
+        pairplot_data = sample.copy()
+        pairplot_data['ChurnStatus'] = pairplot_data['ChurnStatus'].map({0: 'Stayed', 1: 'Churned'})
+    
+        from pandas.plotting import scatter_matrix
+    
+        axarr = scatter_matrix(
+            pairplot_data,
+            alpha=0.65,
+            figsize=(14, 12),
+            diagonal='hist',
+            c=sample['ChurnStatus'],
+            cmap='RdYlGn_r',
+            s=55,
+            edgecolors=COLORS['burgundy'],
+            linewidths=0.3
+        )
+        n = len(axarr)
+        for i in range(n):
+            ax = axarr[i, i]
+            for patch in ax.patches:
+                patch.set_facecolor(COLORS['dusty_rose'])
+                patch.set_edgecolor(COLORS['burgundy'])
+                patch.set_linewidth(1.5)
+                patch.set_alpha(0.75)
+    
+        for i in range(n):
+            for j in range(n):
+                axarr[i, j].grid(True, alpha=0.2, linestyle=':', linewidth=0.6)
+    
+        plt.suptitle('Pairplot of Top Correlated Features', fontsize=18, fontweight='bold', y=0.995)
+        return plt.gcf()
+    show_figure(f"pairplot_{method}", draw_pairplot)
     
     st.markdown("---")
     
     st.markdown("### How Feature Pairs Predict Churn Together")
     
-    churned_data = data_sc[data_sc['ChurnStatus'] == 1]
-    stayed_data = data_sc[data_sc['ChurnStatus'] == 0]
-    
     st.markdown(f"""
     <div class="insight-box">
     <strong>Key Insights from Feature Pair Interactions:</strong><br><br>
@@ -1537,79 +1818,75 @@ elif section == "Correlation":
 elif section == "Statistical Significance Analysis":
     st.markdown("## Statistical Significance Analysis")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    data_sc = data_tenure.copy()
-    data_sc.loc[data_sc["SupportCalls"] > 25, "SupportCalls"] = 7
-    data_sc["SupportCalls"].fillna(int(data_sc["SupportCalls"].median()), inplace=True)
-    
-    from scipy.stats import pearsonr
-    
-    significance_data = []
-    
-    # Using the top_features and ranked_features from the Correlation section for consistency
-    # Assuming these variables are available or recalculating them if necessary
-    numerical_cols_for_corr = ['Age', 'Gender', 'Income', 'Tenure', 'ProductType', 'SupportCalls', 'ChurnStatus']
-    correlation_matrix_for_sig = data_sc[numerical_cols_for_corr].corr(method='pearson')
-    churn_correlation_for_sig = correlation_matrix_for_sig['ChurnStatus'].sort_values(ascending=False).drop('ChurnStatus')
-    
-    abs_sorted_for_sig = churn_correlation_for_sig.abs().sort_values(ascending=False)
-    top_features_for_sig = abs_sorted_for_sig.index[:3].tolist()
-    
-    for feature in top_features_for_sig:
-        # Check if the feature exists in data_sc before calculating
-        if feature in data_sc.columns:
-            corr_coef, p_value = pearsonr(data_sc[feature], data_sc['ChurnStatus'])
-            significance_data.append({
-                'Feature': feature,
-                'Correlation': f"{corr_coef:.4f}",
-                'P-Value': f"{p_value:.6f}",
-                'Significant': 'Yes ✓' if p_value < 0.05 else 'No ✗',
-                'Interpretation': 'Highly Significant' if p_value < 0.001 else 'Significant' if p_value < 0.05 else 'Not Significant'
-            })
-    
-    significance_df = pd.DataFrame(significance_data)
+    col1, col2 = st.columns(2)
+    with col1:
+        n_resamples = st.select_slider("Resamples", RESAMPLE_COUNTS, value=2000,
+                                       help="Bootstrap resamples and label permutations drawn for every statistic.")
+    with col2:
+        time_budget = st.slider("Time budget (seconds)", 1, 60, 10,
+                                help="No new batch of resamples starts after this long; the results use the batches that finished.")
+    
+    # The closed-form p-values share the Correlation section's cached pass; the resampled ones come from the engine
+    asymptotic = load_correlations(DATA_PATH, clean_version(), filters).with_target("ChurnStatus")
+    significance = load_significance(DATA_PATH, clean_version(), filters, n_resamples, float(time_budget))
+    caption = (f"{significance.n_resamples:,} bootstrap resamples and permutations on {significance.workers} "
+               f"worker process{'es' if significance.workers > 1 else ''} in {significance.elapsed:.1f}s (seed {RESAMPLING_SEED}).")
+    if not significance.complete:
+        caption += f" The time budget ran out before all {significance.requested:,} were drawn."
+    st.caption(caption)
+    
+    def interpret(p_value):
+        return 'Highly Significant' if p_value < 0.001 else 'Significant' if p_value < 0.05 else 'Not Significant'
+    
+    st.markdown("### Feature Correlation with Churn")
+    
+    resampled = significance.correlations.loc[asymptotic.index]
+    significance_df = pd.DataFrame({
+        'Feature': asymptotic.index,
+        'Correlation': [f"{r:.4f}" for r in asymptotic['r']],
+        '95% CI (bootstrap)': [f"[{lo:.4f}, {hi:.4f}]" for lo, hi in zip(resampled['ci_low'], resampled['ci_high'])],
+        'P-Value (t-test)': [f"{p:.6f}" for p in asymptotic['p_value']],
+        'P-Value (permutation)': [f"{p:.6f}" for p in resampled['p_value']],
+        'Significant': ['Yes ✓' if p < 0.05 else 'No ✗' for p in resampled['p_value']],
+        'Interpretation': [interpret(p) for p in resampled['p_value']]
+    })
     st.dataframe(significance_df, use_container_width=True)
     
+    st.markdown("### Churn Rate Differences Between Groups")
+    
+    group_labels = {"Gender": GENDER_LABELS, "ProductType": PRODUCT_LABELS}
+    differences = significance.differences
+    difference_df = pd.DataFrame({
+        'Group': differences['group'],
+        'Comparison': [f"{group_labels[g].get(level, level)} vs {group_labels[g].get(ref, ref)}"
+                       for g, level, ref in zip(differences['group'], differences['level'], differences['reference'])],
+        'Churn Rate Difference': [f"{d * 100:+.2f} pp" for d in differences['difference']],
+        '95% CI (bootstrap)': [f"[{lo * 100:+.2f}, {hi * 100:+.2f}] pp" for lo, hi in zip(differences['ci_low'], differences['ci_high'])],
+        'P-Value (permutation)': [f"{p:.6f}" for p in differences['p_value']],
+        'Significant': ['Yes ✓' if p < 0.05 else 'No ✗' for p in differences['p_value']]
+    })
+    st.dataframe(difference_df, use_container_width=True)
+    
+    significant_features = resampled.index[resampled['p_value'] < 0.05].tolist()
+    significant_groups = differences['group'][differences['p_value'] < 0.05].tolist()
     st.markdown('<div class="success-box">', unsafe_allow_html=True)
-    st.markdown("""
+    st.markdown(f"""
     <strong>Statistical Interpretation:</strong>
     - P-values < 0.05 indicate statistically significant correlations
-    - All top features show significant relationships with churn status
-    - These correlations are unlikely to have occurred by chance
-    - The features identified are reliable predictors for modeling
+    - Significant features: {', '.join(significant_features) if significant_features else 'none'}
+    - Groups with a significant churn rate gap: {', '.join(significant_groups) if significant_groups else 'none'}
+    - Intervals are bootstrap percentiles and p-values come from shuffling the churn labels, so they can disagree near the 5% line
+    - With {significance.n_resamples:,} permutations no p-value can fall below {1 / (significance.n_resamples + 1):.6f}
     """)
     st.markdown('</div>', unsafe_allow_html=True)
 
 elif section == "Conclusion":
     st.markdown("## Conclusion & Key Insights")
     
-    data_clean_age = data[(data["Age"] >= 18) | data["Age"].isna()].copy()
-    data_clean_age["Age"].fillna(int(data_clean_age["Age"].mean()) + 1, inplace=True)
-    data_income = data_clean_age.copy()
-    data_income["Income"].fillna(data_income["Income"].median(), inplace=True)
-    Q1 = data_income["Income"].quantile(0.25)
-    Q3 = data_income["Income"].quantile(0.75)
-    IQR = Q3 - Q1
-    income_upper_outliers_value = Q3 + 1.5 * IQR
-    data_income.loc[data_income["Income"] > income_upper_outliers_value, "Income"] = income_upper_outliers_value
-    data_tenure = data_income.copy()
-    data_tenure["Tenure"].fillna(int(data_tenure["Tenure"].median()), inplace=True)
-    data_sc = data_tenure.copy()
-    data_sc.loc[data_sc["SupportCalls"] > 25, "SupportCalls"] = 7
-    data_sc["SupportCalls"].fillna(int(data_sc["SupportCalls"].median()), inplace=True)
-    
-    data_corr_matrix = data_sc.drop(["CustomerID"], axis=1).corr(method='pearson')
-    churn_corr = data_corr_matrix['ChurnStatus'].sort_values(ascending=False)
+    data_sc, _ = load_clean_data(DATA_PATH, filters)
+    clean_stats = load_clean_stats(DATA_PATH, clean_version(), filters)
+    
+    churn_corr = load_correlations(DATA_PATH, clean_version(), filters).r['ChurnStatus'].sort_values(ascending=False)
     
     st.markdown("### Analysis Summary")
     
@@ -1619,9 +1896,9 @@ elif section == "Conclusion":
     with col2:
         st.markdown(f'<div class="metric-card"><h3>{len(data_sc):,}</h3><p>Clean Records</p></div>', unsafe_allow_html=True)
     with col3:
-        st.markdown(f'<div class="metric-card"><h3>{(data_sc["ChurnStatus"].mean()*100):.1f}%</h3><p>Churn Rate</p></div>', unsafe_allow_html=True)
+        st.markdown(f'<div class="metric-card"><h3>{(clean_stats.loc["mean", "ChurnStatus"]*100):.1f}%</h3><p>Churn Rate</p></div>', unsafe_allow_html=True)
     with col4:
-        top_predictor = churn_corr.drop('ChurnStatus').abs().idxmax()
+        top_predictor = churn_corr.drop('ChurnStatus').abs().fillna(0).idxmax()
         st.markdown(f'<div class="metric-card"><h3>{top_predictor}</h3><p>Top Predictor</p></div>', unsafe_allow_html=True)
     
     top_correlation = churn_corr[top_predictor]
@@ -1648,15 +1925,13 @@ elif section == "Conclusion":
     
     st.markdown("### Comprehensive Key Findings")
     
-    churn_rate = data_sc["ChurnStatus"].mean() * 100
-    avg_support_churned = data_sc[data_sc["ChurnStatus"] == 1]["SupportCalls"].mean()
-    avg_support_stayed = data_sc[data_sc["ChurnStatus"] == 0]["SupportCalls"].mean()
-    avg_tenure_churned = data_sc[data_sc["ChurnStatus"] == 1]["Tenure"].mean()
-    avg_tenure_stayed = data_sc[data_sc["ChurnStatus"] == 0]["Tenure"].mean()
-    avg_age_churned = data_sc[data_sc["ChurnStatus"] == 1]["Age"].mean()
-    avg_age_stayed = data_sc[data_sc["ChurnStatus"] == 0]["Age"].mean()
-    avg_income_churned = data_sc[data_sc["ChurnStatus"] == 1]["Income"].mean()
-    avg_income_stayed = data_sc[data_sc["ChurnStatus"] == 0]["Income"].mean()
+    churn_rate = clean_stats.loc["mean", "ChurnStatus"] * 100
+    churn_cube, where = query_churn_cube(filters)
+    class_means = churn_cube.means("ChurnStatus", where).reindex([0, 1])
+    avg_support_churned, avg_support_stayed = class_means.loc[1, "SupportCalls"], class_means.loc[0, "SupportCalls"]
+    avg_tenure_churned, avg_tenure_stayed = class_means.loc[1, "Tenure"], class_means.loc[0, "Tenure"]
+    avg_age_churned, avg_age_stayed = class_means.loc[1, "Age"], class_means.loc[0, "Age"]
+    avg_income_churned, avg_income_stayed = class_means.loc[1, "Income"], class_means.loc[0, "Income"]
     
     st.markdown(f"""
     <div class="insight-box">
@@ -1664,7 +1939,7 @@ elif section == "Conclusion":
     <ul>
         <li>Overall churn rate: <strong>{churn_rate:.1f}%</strong></li>
         <li>This represents a {'high' if churn_rate > 30 else 'moderate' if churn_rate > 15 else 'low'} risk level requiring immediate attention</li>
-        <li>Total churned customers: <strong>{int(data_sc['ChurnStatus'].sum()):,}</strong> out of {len(data_sc):,} customers</li>
+        <li>Total churned customers: <strong>{int(churn_cube.rollup(where=where)['churned']):,}</strong> out of {len(data_sc):,} customers</li>
         <li>Customer retention rate: <strong>{(100 - churn_rate):.1f}%</strong></li>
     </ul>
     </div>
@@ -1698,8 +1973,8 @@ elif section == "Conclusion":
     </div>
     """, unsafe_allow_html=True)
     
-    gender_churn = data_sc.groupby('Gender')['ChurnStatus'].mean() * 100
-    product_churn = data_sc.groupby('ProductType')['ChurnStatus'].mean() * 100
+    gender_churn = churn_rates('Gender')
+    product_churn = churn_rates('ProductType')
     
     st.markdown(f"""
     <div class="insight-box">
@@ -1739,8 +2014,36 @@ elif section == "Conclusion":
     """, unsafe_allow_html=True)
     st.caption("Give us full :)")
     st.markdown("---")
-    
-   
+
+
+
+# Whatever ran after the section's last chart counts as preparation too
+phases.lap(section, "prep")
+phases.close()
+
+# Bytes this section loaded versus materializing every column of the datasets it opened
+if datasets:
+    loaded, total = projection_bytes(datasets)
+    st.sidebar.markdown("---")
+    st.sidebar.caption(f"Loaded for this section: {loaded / 1024:,.1f} KB of {total / 1024:,.1f} KB "
+                       f"({(total - loaded) / 1024:,.1f} KB saved by reading only the columns used)")
+
+# Phase timings and memory peaks of this run, exportable for offline profiling
+if diagnostics:
+    with st.sidebar.expander("Diagnostics", expanded=True):
+        # In start order, so every phase is listed above the phases nested in it
+        records = pd.DataFrame(phases.records).sort_values("start", kind="stable")
+        st.dataframe(pd.DataFrame({
+            "Phase": ["· " * depth + name for depth, name in zip(records["depth"], records["name"])],
+            "Kind": records["phase"],
+            "Time (ms)": (records["seconds"] * 1000).round(1),
+            "Peak (MB)": (records["peak_bytes"].astype(float) / 1024 ** 2).round(2),
+        }), hide_index=True, use_container_width=True)
+        export_name = section.lower().replace(" - ", "-").replace(" ", "-")
+        st.download_button("Export JSON", phases.to_json(), file_name=f"{export_name}.phases.json",
+                           mime="application/json", use_container_width=True)
+        st.download_button("Export Chrome trace", phases.to_chrome_trace(), file_name=f"{export_name}.trace.json",
+                           mime="application/json", use_container_width=True)
 
 st.sidebar.markdown("---")
 
@@ -0,0 +1,158 @@
+"""Benchmark suite timing the pipeline stages and every app section's charts on synthetic customer tables."""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+import pipeline
+from cleaning import CLEANED_COLUMNS, clean_column, fit_column
+from column_store import LazyFrame, open_store
+from correlation import Correlations
+from data_cache import fingerprint
+from synthetic import CustomerProfile, write_synthetic
+
+BENCHMARK_SIZES = [10_000, 1_000_000, 10_000_000]
+BENCHMARK_DIR = os.path.join(".cache", "benchmark")
+BENCHMARK_SEED = 0
+APP_TIMEOUT = 3600
+
+
+def synthetic_path(n_rows, source=pipeline.DATA_PATH, seed=BENCHMARK_SEED, directory=BENCHMARK_DIR, fmt="csv"):
+    """Synthetic table of ``n_rows`` customers profiled on ``source``, generated on first use and kept for later runs."""
+    stem = os.path.splitext(os.path.basename(source))[0]
+    path = os.path.join(directory, f"{stem}.synthetic.{n_rows}.{seed}.{fingerprint(source)[:12]}.{fmt}")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        tmp = f"{path}.tmp"
+        write_synthetic(CustomerProfile.from_file(source), n_rows, tmp, seed, fmt=fmt)
+        os.replace(tmp, path)
+    return path
+
+
+def time_pipeline(path, repeat):
+    """Median and min seconds of each pipeline stage, as the app runs them on ``path``."""
+    results = {}
+
+    def timed(name, fn):
+        times, value = [], None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            value = fn()
+            times.append(time.perf_counter() - start)
+        results[name] = times
+        return value
+
+    def build_store():
+        # A fresh directory each time, so the store is built rather than reopened
+        with tempfile.TemporaryDirectory() as cache_dir:
+            open_store(path, cache_dir=cache_dir)
+
+    timed("load_data.build_store", build_store)
+    store = open_store(path)
+    data = timed("load_data.frame", lambda: LazyFrame(store).frame())
+
+    data_sc = timed("clean.age_filter",
+                    lambda: data[(data["Age"] >= pipeline.AGE_MIN) | data["Age"].isna()].copy())
+    for col in CLEANED_COLUMNS:
+        def clean(col=col):
+            params = fit_column(col, data_sc[col], pipeline.IQR_MULTIPLIER, pipeline.SUPPORT_CALLS_MAX,
+                                pipeline.SUPPORT_CALLS_CAP, pipeline.QUANTILE_MODE, pipeline.QUANTILE_EPS)
+            return clean_column(col, data_sc[col], params, pipeline.SUPPORT_CALLS_MAX, pipeline.SUPPORT_CALLS_CAP)
+        data_sc[col] = timed(f"clean.{col}", clean)
+    timed("clean.preprocess", lambda: pipeline.preprocess(data))
+    timed("standardize", lambda: pipeline.standardize(data_sc))
+    for method in ["pearson", "spearman"]:
+        timed(f"correlation.{method}", lambda: Correlations.from_frame(data_sc, method=method))
+    return results
+
+
+def time_sections(path, sections=None):
+    """Each section's run time and the app's own phase records (loads, chart prep/draw/encode), cold then warm.
+
+    "cold" runs with every Streamlit cache cleared (the on-disk column stores are already built),
+    "warm" repeats the visit, so data and rendered charts come from the caches.
+    """
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    # app.py takes its data path from the pipeline module when each run starts
+    pipeline.DATA_PATH = path
+    app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py"),
+                            default_timeout=APP_TIMEOUT)
+    app.run()
+    # Large files switch the app to streaming ingestion by default; the benchmark times the full sections
+    app.sidebar.toggle[0].set_value(False).run()
+    results = []
+    for section in app.sidebar.radio[0].options:
+        if sections and section not in sections:
+            continue
+        for cache in ["cold", "warm"]:
+            if cache == "cold":
+                st.cache_data.clear()
+                st.cache_resource.clear()
+            start = time.perf_counter()
+            app.sidebar.radio[0].set_value(section).run()
+            elapsed = time.perf_counter() - start
+            error = str(app.exception[0].value) if app.exception else None
+            results.append({"section": section, "name": "section", "phase": "run", "cache": cache,
+                            "seconds": elapsed, "error": error})
+            for record in app.session_state["phases"]:
+                results.append({"section": section, "cache": cache, **record})
+    return results
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {"commit": commit, "python": platform.python_version(), "numpy": np.__version__,
+            "pandas": pd.__version__, "machine": platform.machine(), "cpus": os.cpu_count()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the churn pipeline and app sections on synthetic data.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=BENCHMARK_SIZES, help="rows per synthetic table")
+    parser.add_argument("--source", default=pipeline.DATA_PATH, help="customer file the synthetic profile is learned from")
+    parser.add_argument("--format", choices=["csv", "parquet"], default="csv")
+    parser.add_argument("--seed", type=int, default=BENCHMARK_SEED)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per pipeline stage")
+    parser.add_argument("--sections", nargs="*", help="app sections to time (default: all)")
+    parser.add_argument("--skip-app", action="store_true", help="time only the pipeline stages")
+    parser.add_argument("-o", "--output", default=os.path.join(BENCHMARK_DIR, "results.jsonl"),
+                        help="JSON Lines file the results are appended to")
+    args = parser.parse_args(argv)
+
+    run = {"run": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"), **environment()}
+    records = []
+    for n_rows in sorted(args.sizes):
+        start = time.perf_counter()
+        path = synthetic_path(n_rows, args.source, args.seed, fmt=args.format)
+        print(f"{n_rows:,} rows: {path} ({time.perf_counter() - start:.1f}s to prepare)")
+        for name, times in time_pipeline(path, args.repeat).items():
+            records.append({**run, "rows": n_rows, "section": None, "name": name, "phase": "run", "cache": None,
+                            "seconds": statistics.median(times), "min": min(times), "times": times})
+        if not args.skip_app:
+            records.extend({**run, "rows": n_rows, **record} for record in time_sections(path, args.sections))
+        for record in records:
+            if record["rows"] == n_rows:
+                label = " / ".join(str(record[k]) for k in ("section", "name", "phase", "cache") if record.get(k))
+                print(f"  {label:<80} {record['seconds']:9.3f}s" + (f"  ERROR {record['error'][:60]}" if record.get("error") else ""))
+
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    with open(args.output, "a") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    print(f"{len(records)} results appended to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Pre-aggregated chart inputs whose size depends on the bin count, not the row count."""
+import numpy as np
+
+from ingest import HISTOGRAM_BINS
+
+CHURN_EDGES = [-0.5, 0.5, 1.5]
+# Distinct outlier values labelled on a chart or listed in its table; the rest are summed into one line
+OUTLIER_LABELS = 12
+
+
+def churn_density(values, churn, bins=60):
+    """Customers per (churn class, value bin) and the churn rate of each value bin.
+
+    Returns ``(counts, edges, rate)`` where ``counts`` has shape (2, bins) with row 0 for
+    stayed and row 1 for churned customers; rows with a missing value are skipped.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    y = np.asarray(churn, dtype=np.float64)
+    keep = ~np.isnan(x)
+    counts, _, edges = np.histogram2d(y[keep], x[keep], bins=[CHURN_EDGES, bins])
+    totals = counts.sum(axis=0)
+    rate = np.divide(counts[1], totals, out=np.full(len(totals), np.nan), where=totals > 0)
+    return counts, edges, rate
+
+
+def histogram(values, bins=HISTOGRAM_BINS):
+    """``(counts, edges)`` of the non-missing values, binned as ``np.histogram`` and ``plt.hist`` bin them."""
+    x = np.asarray(values, dtype=np.float64)
+    return np.histogram(x[~np.isnan(x)], bins=bins)
+
+
+def value_summary(values, limit=OUTLIER_LABELS):
+    """The ``limit`` most frequent distinct values, in value order, and what the others add up to.
+
+    Returns ``(values, counts, other_values, other_count)``: the kept distinct values with their
+    row counts, then how many distinct values were left out and how many rows they cover.
+    """
+    distinct, counts = np.unique(np.asarray(values), return_counts=True)
+    if len(distinct) <= limit:
+        return distinct, counts, 0, 0
+    keep = np.zeros(len(distinct), dtype=bool)
+    keep[np.argsort(-counts, kind="stable")[:limit]] = True
+    return distinct[keep], counts[keep], int((~keep).sum()), int(counts[~keep].sum())
@@ -0,0 +1,124 @@
+"""Counts and moment sums of the customer data by Gender x ProductType x ChurnStatus x binned features."""
+import numpy as np
+import pandas as pd
+
+CUBE_DIMENSIONS = ["Gender", "ProductType", "ChurnStatus"]
+CUBE_MEASURES = ["Age", "Income", "Tenure", "SupportCalls"]
+CUBE_BINS = 10
+
+
+class ChurnCube:
+    """Pre-aggregated cells answering group-by counts, churn rates and means without the rows.
+
+    Each cell is one observed combination of the dimensions and of an equal-width bin per
+    measure (-1 for missing), holding ``count``, ``churned`` and each measure's non-missing
+    ``n`` and ``sum``. ``rollup`` adds cells up by any of those keys, restricted by
+    ``where`` filters on dimension values or on measure ranges at whole-bin resolution.
+    """
+
+    def __init__(self, keys, stats, edges):
+        self.keys = keys
+        self.stats = stats
+        self.edges = edges
+        self._values = stats.to_numpy()
+        # Dense codes per key, so a roll-up is one bincount per statistic over the cells
+        self._levels, self._codes = {}, {}
+        for name, key in keys.items():
+            self._levels[name], self._codes[name] = np.unique(key, return_inverse=True)
+
+    def __len__(self):
+        return len(self.stats)
+
+    @classmethod
+    def from_frame(cls, df, bins=CUBE_BINS, dimensions=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+        codes, uniques = {}, {}
+        for col in dimensions:
+            codes[col], uniques[col] = pd.factorize(df[col], use_na_sentinel=False)
+        values = {col: df[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in measures}
+        edges = {}
+        for col, v in values.items():
+            lo, hi = (np.nanmin(v), np.nanmax(v)) if (~np.isnan(v)).any() else (0.0, 1.0)
+            edges[col] = np.linspace(lo, hi, bins + 1)
+            # Bin b is stored as code b + 1 and missing values as code 0 (bin -1)
+            codes[f"{col}_bin"] = np.where(np.isnan(v), 0, np.searchsorted(edges[col][1:-1], v, side="right") + 1)
+            uniques[f"{col}_bin"] = np.arange(-1, bins)
+
+        names = list(codes)
+        shape = [len(uniques[name]) for name in names]
+        rows, cell_keys = pd.factorize(np.ravel_multi_index([codes[name] for name in names], shape))
+        size = len(cell_keys)
+        stats = {"count": np.bincount(rows, minlength=size).astype(np.float64),
+                 "churned": np.bincount(rows, weights=df["ChurnStatus"].to_numpy(dtype=np.float64), minlength=size)}
+        for col, v in values.items():
+            present = ~np.isnan(v)
+            filled = np.where(present, v, 0.0)
+            stats[f"{col}_n"] = np.bincount(rows, weights=present, minlength=size)
+            stats[f"{col}_sum"] = np.bincount(rows, weights=filled, minlength=size)
+        cell_codes = np.unravel_index(cell_keys, shape)
+        keys = {name: np.asarray(uniques[name])[cell_codes[i]] for i, name in enumerate(names)}
+        return cls(keys, pd.DataFrame(stats), edges)
+
+    def rollup(self, by=(), where=None):
+        """Summed cell statistics per combination of ``by`` keys (dimensions or ``<measure>_bin``).
+
+        ``where`` maps a dimension to a value or list of values, or a measure to a ``(lo, hi)``
+        range, which keeps the bins lying entirely inside it.
+        """
+        index, summed = self._rollup(by, where)
+        return _result(index, summed, self.stats.columns)
+
+    def churn_rate(self, by=(), where=None):
+        index, summed = self._rollup(by, where)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = summed[..., self._column("churned")] / summed[..., self._column("count")]
+        return float(rate) if index is None else pd.Series(rate, index=index, name="churn_rate")
+
+    def means(self, by=(), where=None, measures=CUBE_MEASURES):
+        index, summed = self._rollup(by, where)
+        n, s = self._moments(summed, measures)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return _result(index, s / n, measures)
+
+    def _rollup(self, by, where):
+        by = [by] if isinstance(by, str) else list(by)
+        mask = self._mask(where) if where else slice(None)
+        values = self._values[mask]
+        if not by:
+            return None, values.sum(axis=0)
+        shape = [len(self._levels[k]) for k in by]
+        group = np.ravel_multi_index([self._codes[k][mask] for k in by], shape)
+        size = int(np.prod(shape))
+        summed = np.column_stack([np.bincount(group, weights=values[:, i], minlength=size)
+                                  for i in range(values.shape[1])])
+        present = np.flatnonzero(np.bincount(group, minlength=size))
+        levels = np.unravel_index(present, shape)
+        if len(by) == 1:
+            index = pd.Index(self._levels[by[0]][levels[0]], name=by[0])
+        else:
+            index = pd.MultiIndex.from_arrays([self._levels[k][codes] for k, codes in zip(by, levels)], names=by)
+        return index, summed[present]
+
+    def _column(self, name):
+        return self.stats.columns.get_loc(name)
+
+    def _moments(self, summed, measures):
+        return [summed[..., [self._column(f"{m}_{stat}") for m in measures]] for stat in ("n", "sum")]
+
+    def _mask(self, where):
+        mask = np.ones(len(self), dtype=bool)
+        for col, condition in where.items():
+            if col in self.edges:
+                lo, hi = condition
+                edges = self.edges[col]
+                inside = np.flatnonzero((edges[:-1] >= lo) & (edges[1:] <= hi))
+                mask &= np.isin(self.keys[f"{col}_bin"], inside)
+            else:
+                mask &= np.isin(self.keys[col], np.atleast_1d(condition))
+        return mask
+
+
+def _result(index, values, columns):
+    # A Series for the grand total (no ``by`` keys), otherwise one row per group
+    if index is None:
+        return pd.Series(values, index=columns)
+    return pd.DataFrame(values, index=index, columns=columns)
@@ -0,0 +1,177 @@
+"""Imputation values and outlier bounds of the cleaning chain, fitted in one pass over frames or CSV chunks."""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from quantiles import DEFAULT_EPS, make_quantiles
+from shm import attach, share, spec, view
+
+CLEANED_COLUMNS = ["Age", "Income", "Tenure", "SupportCalls"]
+# Parameters fitted for each column; the first one is its imputation value
+COLUMN_PARAMS = {
+    "Age": ["age_fill"],
+    "Income": ["income_fill", "income_q1", "income_q3", "income_iqr", "income_lower", "income_upper"],
+    "Tenure": ["tenure_fill"],
+    "SupportCalls": ["sc_fill"],
+}
+
+
+def fit_cleaning_params(chunks, age_min=18, iqr_multiplier=1.5, sc_max=25, sc_cap=7,
+                        quantile_mode="exact", eps=DEFAULT_EPS):
+    """Parameters of the Age -> Income -> Tenure -> SupportCalls chain.
+
+    ``chunks`` is a frame or an iterable of frames (e.g. ``pd.read_csv(..., chunksize=...)``).
+    In "exact" mode the values match the pandas mean/median/quantile of the whole frame; in
+    "sketch" mode medians and quartiles come from KLL sketches with rank error ``eps``.
+    """
+    fit = CleaningFit(age_min, sc_max, sc_cap, quantile_mode, eps)
+    for chunk in [chunks] if isinstance(chunks, pd.DataFrame) else chunks:
+        fit.update(chunk)
+    return fit.params(iqr_multiplier)
+
+
+class CleaningFit:
+    """One-pass state behind ``fit_cleaning_params``: a quantile backend and a missing count per column.
+
+    Chunks are folded in with ``update`` and fits of different parts merged with ``merge``;
+    ``params`` leaves the state untouched, so it can be kept and extended with later rows.
+    """
+
+    def __init__(self, age_min=18, sc_max=25, sc_cap=7, quantile_mode="exact", eps=DEFAULT_EPS):
+        self.age_min = age_min
+        self.sc_max = sc_max
+        self.sc_cap = sc_cap
+        self.quantile_mode = quantile_mode
+        self.eps = eps
+        self.rows = 0
+        self.backends = {col: make_quantiles(quantile_mode, eps) for col in CLEANED_COLUMNS}
+        self.missing = dict.fromkeys(CLEANED_COLUMNS, 0)
+
+    def update(self, chunk):
+        self.rows += len(chunk)
+        chunk = chunk[(chunk["Age"] >= self.age_min) | chunk["Age"].isna()]
+        for col in CLEANED_COLUMNS:
+            _update(col, self.backends[col], chunk[col], self.sc_max, self.sc_cap)
+            self.missing[col] += int(chunk[col].isna().sum())
+
+    def merge(self, other):
+        self.rows += other.rows
+        for col in CLEANED_COLUMNS:
+            self.backends[col].merge(other.backends[col])
+            self.missing[col] += other.missing[col]
+
+    def params(self, iqr_multiplier=1.5):
+        params = {}
+        for col in CLEANED_COLUMNS:
+            # _finish adds the imputed rows to the backend, so it works on a merged copy
+            backend = make_quantiles(self.quantile_mode, self.eps)
+            backend.merge(self.backends[col])
+            params.update(_finish(col, backend, self.missing[col], iqr_multiplier))
+        return params
+
+
+def fit_column(col, values, iqr_multiplier=1.5, sc_max=25, sc_cap=7, quantile_mode="exact", eps=DEFAULT_EPS):
+    """Parameters of one column of an already Age-filtered frame."""
+    backend = make_quantiles(quantile_mode, eps)
+    _update(col, backend, values, sc_max, sc_cap)
+    return _finish(col, backend, int(values.isna().sum()), iqr_multiplier)
+
+
+def clean_column(col, values, params, sc_max=25, sc_cap=7):
+    """Apply the fitted imputation (and Income capping / SupportCalls masking) to one column."""
+    if col == "Age":
+        return values.fillna(params["age_fill"])
+    if col == "Income":
+        income = values.fillna(params["income_fill"])
+        return income.where(income <= params["income_upper"], params["income_upper"])
+    if col == "Tenure":
+        return values.fillna(params["tenure_fill"])
+    return values.mask(values > sc_max, sc_cap).fillna(params["sc_fill"])
+
+
+def clean_values(col, values, params, sc_max=25, sc_cap=7):
+    """``clean_column`` on an array, done in place when it is a floating point ndarray (the usual case, given the NaNs)."""
+    if not isinstance(values, np.ndarray) or values.dtype.kind != "f":
+        cleaned = clean_column(col, pd.Series(values, copy=False), params, sc_max, sc_cap)
+        return cleaned.to_numpy() if isinstance(cleaned.dtype, np.dtype) else cleaned.array
+    if col == "SupportCalls":
+        np.copyto(values, sc_cap, where=values > sc_max)
+    np.copyto(values, params[COLUMN_PARAMS[col][0]], where=np.isnan(values))
+    if col == "Income":
+        np.minimum(values, params["income_upper"], out=values)
+    return values
+
+
+def clean_parallel(data_sc, workers, iqr_multiplier=1.5, sc_max=25, sc_cap=7, quantile_mode="exact", eps=DEFAULT_EPS):
+    """Fit and clean every column in ``CLEANED_COLUMNS`` on its own worker process.
+
+    Columns travel through shared memory in both directions and each worker runs the same
+    ``fit_column``/``clean_column`` code as the sequential path, so the output is identical.
+    Returns ``(params, columns)`` with columns as arrays aligned to ``data_sc.index``.
+    """
+    inputs = {col: share(data_sc[col].to_numpy()) for col in CLEANED_COLUMNS}
+    options = (iqr_multiplier, sc_max, sc_cap, quantile_mode, eps)
+    params, columns, futures = {}, {}, {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {col: pool.submit(_clean_worker, col, spec(*inputs[col]), options) for col in CLEANED_COLUMNS}
+            for col in CLEANED_COLUMNS:
+                column_params, out = futures.pop(col).result()
+                params.update(column_params)
+                shm = attach(out)
+                try:
+                    columns[col] = view(shm, out).copy()
+                finally:
+                    shm.close()
+                    shm.unlink()
+    finally:
+        # After a failure, the columns other workers finished are still in their output segments
+        for future in futures.values():
+            if not future.cancelled() and future.exception() is None:
+                shm = attach(future.result()[1])
+                shm.close()
+                shm.unlink()
+        for shm, _ in inputs.values():
+            shm.close()
+            shm.unlink()
+    return params, columns
+
+
+def _update(col, backend, values, sc_max, sc_cap):
+    if col == "SupportCalls":
+        values = values.mask(values > sc_max, sc_cap)
+    backend.update(values.to_numpy(dtype=np.float64, na_value=np.nan))
+
+
+def _finish(col, backend, missing, iqr_multiplier):
+    if col == "Age":
+        return {"age_fill": int(backend.mean()) + 1}
+    if col == "Tenure":
+        return {"tenure_fill": int(backend.median())}
+    if col == "SupportCalls":
+        return {"sc_fill": int(backend.median())}
+    fill = backend.median()
+    # Quartiles are taken after imputation, so the filled rows count at the median
+    backend.insert(fill, missing)
+    q1, q3 = backend.quantiles([0.25, 0.75])
+    iqr = q3 - q1
+    return {"income_fill": fill, "income_q1": q1, "income_q3": q3, "income_iqr": iqr,
+            "income_lower": q1 - iqr_multiplier * iqr, "income_upper": q3 + iqr_multiplier * iqr}
+
+
+def _clean_worker(col, column_spec, options):
+    iqr_multiplier, sc_max, sc_cap, quantile_mode, eps = options
+    shm = attach(column_spec)
+    try:
+        values = pd.Series(view(shm, column_spec), copy=False)
+        params = fit_column(col, values, iqr_multiplier, sc_max, sc_cap, quantile_mode, eps)
+        cleaned = np.array(clean_column(col, values, params, sc_max, sc_cap))
+        # The input view must be gone before the segment can be closed
+        del values
+    finally:
+        shm.close()
+    out_shm, out = share(cleaned)
+    out_shm.close()
+    return params, spec(out_shm, out)
+
@@ -0,0 +1,485 @@
+"""On-disk columnar copy of a customer CSV: one np.memmap per column plus a small JSON header."""
+import glob
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CACHE_DIR, fingerprint
+
+STORE_VERSION = 2
+HEADER = "columns.json"
+INDEX_FILE = "index.bin"
+BUILD_CHUNK_SIZE = 250_000
+# Build directories left this long are taken to be from a crashed builder and removed
+STALE_BUILD_SECONDS = 24 * 3600
+# Per-object sizes pandas' memory_usage(deep=True) counts for decoded text cells
+EMPTY_STR_BYTES = sys.getsizeof("")
+NAN_BYTES = sys.getsizeof(np.nan)
+
+
+class ColumnStore:
+    """Memory-mapped columns of one dataset version.
+
+    Opening reads only the header; a column's pages are read from disk when it is first
+    accessed, so memory use is the working set of the columns a caller actually touches.
+    Numeric columns use the same dtypes ``data_cache.downcast`` would pick for the whole file.
+    """
+
+    def __init__(self, directory):
+        with open(os.path.join(directory, HEADER)) as f:
+            self.header = json.load(f)
+        self.directory = directory
+        self.n_rows = self.header["n_rows"]
+        self.meta = self.header.get("meta", {})
+        self.columns = [spec["name"] for spec in self.header["columns"]]
+        self._specs = {spec["name"]: spec for spec in self.header["columns"]}
+        self._decoded = {}
+        self._index = None
+
+    def __len__(self):
+        return self.n_rows
+
+    def values(self, col):
+        """Raw column array: a read-only memmap, or fixed-width bytes for string columns."""
+        return self._map(self._specs[col]["file"], self._specs[col]["dtype"])
+
+    def index(self):
+        if self._index is None:
+            if self.header.get("index"):
+                self._index = pd.Index(self._map(self.header["index"], "int64").view(np.ndarray), copy=False)
+            else:
+                self._index = pd.RangeIndex(self.n_rows)
+        return self._index
+
+    def is_string(self, col):
+        return self._specs[col]["kind"] == "string"
+
+    def column(self, col):
+        spec = self._specs[col]
+        if spec["kind"] != "string":
+            # A plain ndarray view of the mapping, so pandas results are not memmap subclasses
+            return pd.Series(self.values(col).view(np.ndarray), index=self.index(), name=col, copy=False)
+        if col not in self._decoded:
+            # Strings are decoded once per store and kept; numeric columns stay on disk
+            decoded = np.char.decode(self.values(col), "utf-8").astype(object)
+            if spec.get("nulls"):
+                decoded[self._map(spec["nulls"], "bool")] = np.nan
+            self._decoded[col] = decoded
+        return pd.Series(self._decoded[col], index=self.index(), name=col, dtype=object, copy=False)
+
+    def frame(self, columns=None):
+        columns = self.columns if columns is None else list(columns)
+        return pd.DataFrame({col: self.column(col) for col in columns}, index=self.index(), copy=False)
+
+    def chunks(self, chunksize=BUILD_CHUNK_SIZE, columns=None):
+        """Frames of ``chunksize`` consecutive rows, views of the mapped columns, for one streaming pass."""
+        columns = self.columns if columns is None else list(columns)
+        # An empty store still yields one (empty) frame, so its columns are seen
+        for start in range(0, max(self.n_rows, 1), chunksize):
+            rows = slice(start, start + chunksize)
+            yield pd.DataFrame({col: self.column(col).iloc[rows] for col in columns}, copy=False)
+
+    def take(self, positions, columns=None):
+        """The rows at ``positions`` as a frame, decoding the text of only those rows."""
+        columns = self.columns if columns is None else list(columns)
+        index = self.index()[positions]
+        data = {}
+        for col in columns:
+            spec = self._specs[col]
+            values = np.asarray(self.values(col)[positions])
+            if spec["kind"] == "string":
+                values = np.char.decode(values, "utf-8").astype(object)
+                if spec.get("nulls"):
+                    values[self._map(spec["nulls"], "bool")[positions]] = np.nan
+            data[col] = pd.Series(values, index=index, name=col, dtype=values.dtype)
+        return pd.DataFrame(data, index=index)
+
+    def nunique(self, col, rows=None):
+        """Distinct non-missing values in a column (or its ``rows``); text is compared as stored bytes, never decoded."""
+        spec = self._specs[col]
+        values = self.values(col)
+        if spec["kind"] == "string" and spec.get("nulls"):
+            present = ~self._map(spec["nulls"], "bool")
+            rows = np.flatnonzero(present) if rows is None else rows[present[rows]]
+        values = np.asarray(values if rows is None else values[rows])
+        if spec["kind"] == "string":
+            return len(np.unique(values))
+        return int(pd.Series(values).nunique())
+
+    def null_count(self, col, rows=None):
+        """Missing values in a column (or its ``rows``), read from the null mask for strings (never decoding them)."""
+        spec = self._specs[col]
+        if spec["kind"] == "string":
+            if not spec.get("nulls"):
+                return 0
+            if rows is None:
+                return spec["null_count"]
+            return int(self._map(spec["nulls"], "bool")[rows].sum())
+        if np.dtype(spec["dtype"]).kind != "f":
+            return 0
+        values = self.values(col)
+        return int(np.isnan(values if rows is None else values[rows]).sum())
+
+    def nbytes(self, columns=None):
+        """Bytes the columns occupy on disk (and in the page cache once read)."""
+        columns = self.columns if columns is None else columns
+        return sum(self.n_rows * np.dtype(self._specs[col]["dtype"]).itemsize for col in columns)
+
+    def memory_bytes(self, columns=None):
+        """What ``memory_usage(deep=True)`` reports for the columns once loaded, without loading them."""
+        columns = self.columns if columns is None else columns
+        total = 0
+        for col in columns:
+            spec = self._specs[col]
+            if spec["kind"] == "string":
+                nulls = spec.get("null_count", 0)
+                total += (self.n_rows * np.dtype(object).itemsize + spec.get("text_bytes", 0)
+                          + (self.n_rows - nulls) * EMPTY_STR_BYTES + nulls * NAN_BYTES)
+            else:
+                total += self.n_rows * np.dtype(spec["dtype"]).itemsize
+        return total
+
+    def _map(self, name, dtype):
+        if self.n_rows == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.directory, name), dtype=dtype, mode="r", shape=(self.n_rows,))
+
+
+class LazyFrame:
+    """Column-projecting handle on a ColumnStore that records the columns it hands out.
+
+    ``lazy["Age"]`` is a Series and ``lazy[["Age", "Income"]]`` a DataFrame of just those
+    columns; ``len``, ``columns`` and ``index`` come from the header without reading any column.
+    With ``rows`` (ascending positions, e.g. from a FilterIndex) only those rows are materialized.
+    """
+
+    def __init__(self, store, rows=None):
+        self.store = store
+        self.rows = rows
+        self.touched = []
+
+    def __len__(self):
+        return len(self.store) if self.rows is None else len(self.rows)
+
+    @property
+    def columns(self):
+        return pd.Index(self.store.columns)
+
+    @property
+    def numeric_columns(self):
+        return [col for col in self.store.columns if not self.store.is_string(col)]
+
+    @property
+    def index(self):
+        index = self.store.index()
+        return index if self.rows is None else index[self.rows]
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            self._touch([key])
+            column = self.store.column(key)
+            return column if self.rows is None else column.take(self.rows)
+        return self.frame(key)
+
+    def frame(self, columns=None):
+        columns = self.store.columns if columns is None else list(columns)
+        self._touch(columns)
+        frame = self.store.frame(columns)
+        return frame if self.rows is None else frame.take(self.rows)
+
+    def head(self, n=5):
+        positions = np.arange(min(n, len(self))) if self.rows is None else self.rows[:n]
+        return self.store.take(positions)
+
+    def nunique(self, col):
+        self._touch([col])
+        return self.store.nunique(col, self.rows)
+
+    def memory_bytes(self):
+        """What ``frame().memory_usage(deep=True)`` reports, from the header (text pro rata under ``rows``)."""
+        share = len(self) / len(self.store) if len(self.store) else 0.0
+        return int(self.store.memory_bytes() * share) + self.index.memory_usage()
+
+    def null_counts(self):
+        counts = {}
+        for col in self.store.columns:
+            if not self.store.is_string(col):
+                self._touch([col])
+            counts[col] = self.store.null_count(col, self.rows)
+        return pd.Series(counts)
+
+    def _touch(self, columns):
+        missing = [col for col in columns if col not in self.store.columns]
+        if missing:
+            raise KeyError(f"{missing} not in columns")
+        self.touched.extend(col for col in columns if col not in self.touched)
+
+
+def projection_bytes(frames):
+    """``(loaded, total)`` deep-memory bytes over LazyFrames, counting each store column once.
+
+    A column read through a row selection counts for the share of rows selected.
+    """
+    stores, shares = {}, {}
+    for lazy in frames:
+        stores[lazy.store.directory] = lazy.store
+        share = len(lazy) / len(lazy.store) if len(lazy.store) else 0.0
+        for col in lazy.touched:
+            key = (lazy.store.directory, col)
+            shares[key] = max(shares.get(key, 0.0), share)
+    loaded = sum(stores[d].memory_bytes([col]) * share for (d, col), share in shares.items())
+    return int(loaded), sum(store.memory_bytes() for store in stores.values())
+
+
+def open_store(path, cache_dir=CACHE_DIR, chunksize=BUILD_CHUNK_SIZE, name="columns", build=None, key=""):
+    """ColumnStore for ``path``, built on first use and rebuilt whenever the file (or ``key``) changes.
+
+    The store holds the file's own columns, or with ``build() -> (frame, meta)`` a frame derived
+    from it, such as the cleaned data with its fitted parameters as ``meta``. ``build`` may give
+    ``chunks`` (see ``write_chunks``) in place of the frame, so the derived data is never whole in memory.
+    """
+    directory = os.path.join(os.path.dirname(os.path.abspath(path)), cache_dir)
+    stem = f"{os.path.splitext(os.path.basename(path))[0]}.{name}"
+    target = os.path.join(directory, f"{stem}.{fingerprint(path, key=f'{name}{STORE_VERSION}|{key}')}")
+    if not os.path.exists(os.path.join(target, HEADER)):
+        os.makedirs(directory, exist_ok=True)
+        # Each builder writes to its own directory, so concurrent builds of a version never collide
+        tmp = tempfile.mkdtemp(prefix=f"{os.path.basename(target)}.", suffix=".tmp", dir=directory)
+        try:
+            if build is None:
+                build_store(path, tmp, chunksize)
+            else:
+                df, meta = build()
+                if callable(df):
+                    write_chunks(df, tmp, meta, source=path)
+                else:
+                    write_store(df, tmp, meta, source=path)
+            try:
+                os.replace(tmp, target)
+            except OSError:
+                # Another process published the same version first; its store is just as good
+                if not os.path.exists(os.path.join(target, HEADER)):
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        _remove_stale(directory, stem, target)
+    return ColumnStore(target)
+
+
+def _remove_stale(directory, stem, target):
+    # Older published versions go; another builder's directory only once it is clearly abandoned
+    for stale in glob.glob(os.path.join(directory, f"{stem}.*")):
+        version = os.path.basename(stale)[len(stem) + 1:]
+        if stale == target:
+            continue
+        if version.endswith(".tmp"):
+            try:
+                if time.time() - os.path.getmtime(stale) < STALE_BUILD_SECONDS:
+                    continue
+            except OSError:
+                continue
+        elif "." in version:
+            continue
+        shutil.rmtree(stale, ignore_errors=True)
+
+
+def build_store(path, directory, chunksize=BUILD_CHUNK_SIZE):
+    """Write the column files and header for a CSV or Parquet file in chunked passes (schema, then data)."""
+    schema = FrameSchema()
+    for chunk in read_chunks(path, chunksize):
+        schema.update(chunk)
+    if schema.rescan:
+        for chunk in read_chunks(path, chunksize, schema.rescan):
+            schema.widen(chunk)
+
+    specs = schema.specs()
+    _write_columns(directory, specs, read_chunks(path, chunksize))
+    _write_header(directory, path, schema.n_rows, specs)
+
+
+def write_chunks(chunks, directory, meta=None, source=None):
+    """Write a frame produced chunk by chunk, index included, as a store.
+
+    ``chunks()`` returns a fresh iterable of the frame's chunks and is called once per pass
+    (schema, then data), so only one chunk is held at a time.
+    """
+    schema = FrameSchema()
+    for chunk in chunks():
+        schema.update(chunk)
+    if schema.rescan:
+        for chunk in chunks():
+            schema.widen(chunk)
+
+    specs = schema.specs()
+    _write_columns(directory, specs, chunks(), INDEX_FILE)
+    _write_header(directory, source, schema.n_rows, specs, meta, INDEX_FILE)
+
+
+def write_store(df, directory, meta=None, source=None):
+    """Write an in-memory frame, index included, as a store."""
+    specs = []
+    for i, col in enumerate(df.columns):
+        dtype = df[col].dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+            specs.append({"name": col, "file": f"{i}.bin", "kind": "numeric", "dtype": dtype.name})
+        else:
+            column_schema = _ColumnSchema()
+            column_schema.update(df[col])
+            specs.append(column_schema.spec(col, i))
+    index = None if df.index.equals(pd.RangeIndex(len(df))) else INDEX_FILE
+    _write_columns(directory, specs, [df], index)
+    _write_header(directory, source, len(df), specs, meta, index)
+
+
+def read_chunks(path, chunksize=BUILD_CHUNK_SIZE, columns=None):
+    """A CSV or Parquet file as frames of up to ``chunksize`` rows, with each chunk's own inferred dtypes."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunksize, usecols=columns)
+
+
+def _write_columns(directory, specs, chunks, index=None):
+    # Appends every chunk to the column files (and its row labels to ``index``); text columns also
+    # total their encoded bytes and nulls
+    os.makedirs(directory, exist_ok=True)
+    files = {}
+    try:
+        if index:
+            files[index] = open(os.path.join(directory, index), "wb")
+        for spec in specs:
+            files[spec["file"]] = open(os.path.join(directory, spec["file"]), "wb")
+            if spec["kind"] == "string":
+                spec.update(text_bytes=0, null_count=0)
+            if spec.get("nulls"):
+                files[spec["nulls"]] = open(os.path.join(directory, spec["nulls"]), "wb")
+        for chunk in chunks:
+            if index:
+                if chunk.index.dtype.kind not in "iu":
+                    raise ValueError(f"Only integer indexes can be stored, got {chunk.index.dtype}")
+                np.asarray(chunk.index, dtype=np.int64).tofile(files[index])
+            for spec in specs:
+                values = chunk[spec["name"]]
+                if spec["kind"] == "string":
+                    nulls = values.isna().to_numpy()
+                    text = values.fillna("").astype(str).to_numpy(dtype=str)
+                    encoded = np.char.encode(text, "utf-8").astype(spec["dtype"])
+                    encoded.tofile(files[spec["file"]])
+                    spec["text_bytes"] += int(np.char.str_len(encoded).sum())
+                    spec["null_count"] += int(nulls.sum())
+                    if spec.get("nulls"):
+                        nulls.tofile(files[spec["nulls"]])
+                else:
+                    values.to_numpy().astype(spec["dtype"]).tofile(files[spec["file"]])
+    finally:
+        for f in files.values():
+            f.close()
+
+
+def _write_header(directory, source, n_rows, specs, meta=None, index=None):
+    header = {"version": STORE_VERSION, "source": source and os.path.abspath(source), "n_rows": n_rows,
+              "index": index, "columns": specs, "meta": meta or {}}
+    with open(os.path.join(directory, HEADER), "w") as f:
+        # NumPy scalars in meta (e.g. fitted parameters) are stored as plain numbers
+        json.dump(header, f, indent=2, default=lambda value: value.item())
+
+
+class FrameSchema:
+    """Whole-file dtypes of a frame seen chunk by chunk, picked by the same rules as ``data_cache.downcast``.
+
+    ``dtypes()`` casts each chunk of a file to the types the whole file would have been read as.
+    """
+
+    def __init__(self):
+        self.n_rows = 0
+        self.columns = {}
+
+    def update(self, chunk):
+        self.n_rows += len(chunk)
+        for col in chunk.columns:
+            self.columns.setdefault(col, _ColumnSchema()).update(chunk[col])
+
+    @property
+    def rescan(self):
+        # Columns that only turned out to hold text after some numeric chunks need their full width
+        return [col for col, column_schema in self.columns.items() if column_schema.rescan]
+
+    def widen(self, chunk):
+        """Second look at the ``rescan`` columns of a chunk."""
+        for col in self.rescan:
+            self.columns[col].update(chunk[col])
+
+    def specs(self):
+        return [column_schema.spec(col, i) for i, (col, column_schema) in enumerate(self.columns.items())]
+
+    def dtypes(self):
+        return {spec["name"]: object if spec["kind"] == "string" else spec["dtype"] for spec in self.specs()}
+
+    def scan(self, chunks):
+        """Pass ``chunks`` through, updating the schema with each one on the way."""
+        for chunk in chunks:
+            self.update(chunk)
+            yield chunk
+
+
+class _ColumnSchema:
+    # Whole-file view of one column, merged chunk by chunk, that decides its stored dtype
+    def __init__(self):
+        self.numeric = True
+        self.floating = False
+        self.has_nan = False
+        self.integral = True
+        self.float32_exact = True
+        self.min = np.inf
+        self.max = -np.inf
+        self.width = 1
+        self.rows = 0
+        self.rescan = False
+
+    def update(self, values):
+        if not pd.api.types.is_numeric_dtype(values.dtype) or pd.api.types.is_bool_dtype(values.dtype):
+            self.rescan |= self.numeric and self.rows > 0
+            self.numeric = False
+        self.rows += len(values)
+        if not self.numeric:
+            self.has_nan |= bool(values.isna().any())
+            lengths = values.dropna().astype(str).str.encode("utf-8").str.len()
+            self.width = max(self.width, int(lengths.max()) if len(lengths) else 1)
+            return
+        self.floating |= values.dtype.kind == "f"
+        self.has_nan |= bool(values.isna().any())
+        non_null = values.dropna().to_numpy(dtype=np.float64)
+        if len(non_null):
+            self.integral &= bool((non_null == np.floor(non_null)).all())
+            self.float32_exact &= bool((non_null.astype(np.float32).astype(np.float64) == non_null).all())
+            self.min = min(self.min, non_null.min())
+            self.max = max(self.max, non_null.max())
+
+    def spec(self, name, position):
+        spec = {"name": name, "file": f"{position}.bin"}
+        if not self.numeric:
+            spec.update(kind="string", dtype=f"S{self.width}")
+            if self.has_nan:
+                spec["nulls"] = f"{position}.nulls"
+            return spec
+        # Same rules as data_cache.downcast applied to the whole file
+        dtype = "float64" if self.floating or self.has_nan else "int64"
+        has_values = self.min <= self.max
+        if has_values and self.integral and not self.has_nan:
+            for candidate in (np.int8, np.int16, np.int32):
+                info = np.iinfo(candidate)
+                if info.min <= self.min and self.max <= info.max:
+                    dtype = np.dtype(candidate).name
+                    break
+        elif has_values and dtype == "float64" and self.float32_exact:
+            dtype = "float32"
+        spec.update(kind="numeric", dtype=dtype)
+        return spec
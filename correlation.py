@@ -0,0 +1,53 @@
+"""Pearson and Spearman correlation matrices with closed-form p-values, from one streaming co-moment pass."""
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from ingest import CHUNK_SIZE, _CoMoments
+
+CORRELATION_COLUMNS = ["Age", "Gender", "Income", "Tenure", "ProductType", "SupportCalls", "ChurnStatus"]
+CORRELATION_METHODS = ["pearson", "spearman"]
+
+
+class Correlations:
+    """Pairwise-complete correlations of a set of columns, with their counts and two-sided p-values.
+
+    Every coefficient comes from the same co-moment matrix, accumulated chunk by chunk, so a
+    p-value needs no further pass over the rows: ``t = r * sqrt((n - 2) / (1 - r^2))`` against a
+    t distribution with ``n - 2`` degrees of freedom, as ``scipy.stats.pearsonr`` and
+    ``spearmanr`` compute it. Spearman is Pearson on average ranks taken per column.
+    """
+
+    def __init__(self, r, n, method="pearson"):
+        self.r = r
+        self.n = n
+        self.method = method
+        self.pvalues = pd.DataFrame(_pvalues(r.to_numpy(), n.to_numpy()), index=r.index, columns=r.columns)
+
+    @classmethod
+    def from_frame(cls, data, columns=CORRELATION_COLUMNS, method="pearson", chunksize=CHUNK_SIZE):
+        """Correlate ``columns`` of anything that returns a Series for ``data[col]`` (a frame, LazyFrame, ...)."""
+        if method not in CORRELATION_METHODS:
+            raise ValueError(f"Unknown correlation method {method!r}; expected one of {CORRELATION_METHODS}")
+        values = [data[col].to_numpy() for col in columns]
+        if method == "spearman":
+            values = [pd.Series(v, copy=False).rank().to_numpy() for v in values]
+        comoments = _CoMoments(len(columns))
+        for start in range(0, len(data), chunksize):
+            comoments.update(np.column_stack([v[start:start + chunksize] for v in values]).astype(np.float64))
+        return cls(pd.DataFrame(comoments.corr(), index=columns, columns=columns),
+                   pd.DataFrame(comoments.n.astype(np.int64), index=columns, columns=columns), method)
+
+    def with_target(self, target="ChurnStatus"):
+        """Correlation, count and p-value of every other column against ``target``, strongest first."""
+        result = pd.DataFrame({"r": self.r[target], "n": self.n[target], "p_value": self.pvalues[target]}).drop(target)
+        return result.reindex(result["r"].abs().sort_values(ascending=False).index)
+
+
+def _pvalues(r, n):
+    dof = n - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.abs(r) * np.sqrt(dof / ((1.0 - r) * (1.0 + r)))
+    p = 2 * stats.t.sf(t, np.maximum(dof, 1))
+    # A perfect correlation has an infinite t and p = 0; fewer than three pairs leave nothing to test
+    return np.where(dof > 0, p, np.nan)
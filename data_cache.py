@@ -0,0 +1,43 @@
+"""Cache directory, source-file fingerprints and dtype downcasting shared by the on-disk stores."""
+import hashlib
+import os
+
+import numpy as np
+
+CACHE_DIR = ".cache"
+
+
+def fingerprint(path, key="", content_hash=False):
+    """Digest of the source file identity (size + mtime, or full content) and the builder key."""
+    digest = hashlib.sha1(f"{os.path.abspath(path)}|{key}".encode())
+    if content_hash:
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    else:
+        stat = os.stat(path)
+        digest.update(f"{stat.st_size}|{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()[:16]
+
+
+def downcast(df):
+    """Smallest lossless dtype per numeric column: int8/int16/int32 when integral, float32 when exact."""
+    out = df.copy()
+    for col in out.select_dtypes(include="number").columns:
+        values = out[col]
+        non_null = values.dropna()
+        if non_null.empty:
+            continue
+        integral = bool((non_null == np.floor(non_null)).all())
+        if integral and not values.isna().any():
+            for dtype in (np.int8, np.int16, np.int32):
+                info = np.iinfo(dtype)
+                if info.min <= non_null.min() and non_null.max() <= info.max:
+                    out[col] = values.astype(dtype)
+                    break
+        elif values.dtype == np.float64:
+            as_float32 = values.astype(np.float32)
+            if bool((as_float32.astype(np.float64) == values).where(values.notna(), True).all()):
+                out[col] = as_float32
+    return out
+
@@ -0,0 +1,61 @@
+"""LRU cache of rendered chart images so unchanged figures skip matplotlib entirely."""
+import io
+import threading
+from collections import OrderedDict
+
+import matplotlib.pyplot as plt
+
+SAVEFIG_OPTIONS = {"bbox_inches": "tight", "dpi": 200}
+
+
+class FigureCache:
+    """Rendered PNG/SVG bytes keyed by e.g. (section, chart, dataset fingerprint, theme).
+
+    Least recently used images are evicted once the stored bytes exceed ``max_bytes``.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._images)
+
+    def get(self, key):
+        with self._lock:
+            image = self._images.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._images.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._images:
+                self.size -= len(self._images.pop(key))
+            if len(image) > self.max_bytes:
+                return
+            self._images[key] = image
+            self.size += len(image)
+            while self.size > self.max_bytes:
+                _, evicted = self._images.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self.size = 0
+
+
+def encode(fig, fmt="png"):
+    """Save ``fig`` to image bytes and close it."""
+    buf = io.BytesIO()
+    fig.savefig(buf, format=fmt, **SAVEFIG_OPTIONS)
+    plt.close(fig)
+    return buf.getvalue()
@@ -0,0 +1,356 @@
+"""Chunked CSV ingestion that summarizes a customer file in one bounded-memory pass."""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from column_stats import column_stats
+from column_store import LazyFrame
+
+CHUNK_SIZE = 250_000
+FINE_BINS = 4096
+HISTOGRAM_BINS = 30
+CATEGORICAL_COLUMNS = ["Gender", "ProductType", "ChurnStatus"]
+GROUP_COLUMNS = ["Gender", "ProductType"]
+DESCRIBE_INDEX = ["count", "mean", "std", "min", "25%", "50%", "75%", "max"]
+
+
+class DatasetSummary:
+    """Statistics the Overview, Initial Exploration and churn-rate views read instead of the raw frame."""
+
+    def __init__(self, n_rows, columns, missing, describe, skew, correlation, memory_bytes, head,
+                 unique_customers, value_counts, histograms, churn_by, exact):
+        self.n_rows = n_rows
+        self.columns = columns
+        self.missing = missing
+        self.describe = describe
+        self.skew = skew
+        self.correlation = correlation
+        self.memory_bytes = memory_bytes
+        self.head = head
+        self.unique_customers = unique_customers
+        self.value_counts = value_counts
+        self.histograms = histograms
+        self.churn_by = churn_by
+        self.exact = exact
+
+    @property
+    def churn_rate(self):
+        return self.describe.loc["mean", "ChurnStatus"]
+
+    @property
+    def churned(self):
+        return int(round(self.churn_rate * self.n_rows))
+
+    @property
+    def numerical_features(self):
+        return [c for c in self.describe.columns if c not in CATEGORICAL_COLUMNS]
+
+
+def _clean_rows(df, age_min):
+    return (df["Age"] >= age_min) | df["Age"].isna()
+
+
+def _churn_by(df, age_min):
+    keep = _clean_rows(df, age_min)
+    churn = df["ChurnStatus"][keep]
+    return {col: churn.groupby(df[col][keep]).agg(["sum", "count"]) for col in GROUP_COLUMNS}
+
+
+def summarize_frame(df, age_min=18, bins=HISTOGRAM_BINS):
+    """Exact summary of a frame or a column_store.LazyFrame, reading one column at a time.
+
+    At most two numeric columns are held as float64 at once. For a LazyFrame the missing
+    counts, memory size and distinct customers come from the store's null masks, header and
+    stored bytes, so its text columns are never decoded.
+    """
+    if isinstance(df, LazyFrame):
+        numeric = df.numeric_columns
+        missing, memory_bytes = df.null_counts(), df.memory_bytes()
+        unique_customers = df.nunique("CustomerID")
+    else:
+        numeric = df.select_dtypes(include="number").columns.tolist()
+        missing, memory_bytes = df.isnull().sum(), int(df.memory_usage(deep=True).sum())
+        unique_customers = int(df["CustomerID"].nunique())
+    stats = pd.concat([column_stats(df, [col]) for col in numeric], axis=1)
+    describe = stats.drop(["nulls", "skew"])
+    histograms = {}
+    for col in numeric:
+        values = df[col].dropna().to_numpy(dtype=np.float64)
+        histograms[col] = np.histogram(values, bins=bins)
+    return DatasetSummary(
+        n_rows=len(df),
+        columns=df.columns.tolist(),
+        missing=missing,
+        describe=describe,
+        skew=stats.loc["skew"],
+        correlation=_pairwise_corr(df, numeric),
+        memory_bytes=memory_bytes,
+        head=df.head(7),
+        unique_customers=unique_customers,
+        value_counts={col: df[col].value_counts() for col in CATEGORICAL_COLUMNS},
+        histograms=histograms,
+        churn_by=_churn_by(df, age_min),
+        exact=True,
+    )
+
+
+def _pairwise_corr(df, columns):
+    # Pairwise-complete Pearson correlations, as DataFrame.corr, holding two columns at a time
+    corr = pd.DataFrame(np.nan, index=columns, columns=columns)
+    for i, a in enumerate(columns):
+        x = df[a]
+        for b in columns[i:]:
+            corr.loc[a, b] = corr.loc[b, a] = x.corr(df[b])
+    return corr
+
+
+class _ChunkAccumulator:
+    def __init__(self, age_min):
+        self.age_min = age_min
+        self.n_rows = 0
+        self.columns = None
+        self.numeric = None
+        self.head = None
+        self.missing = None
+        self.memory_bytes = 0
+        self.moments = {}
+        self.histograms = {}
+        self.value_counts = {}
+        self.churn_by = {}
+        self.customers = _HyperLogLog()
+        self.comoments = None
+
+    def update(self, chunk):
+        if self.columns is None:
+            self.columns = chunk.columns.tolist()
+            self.numeric = chunk.select_dtypes(include="number").columns.tolist()
+            self.head = chunk.head(7)
+            self.missing = pd.Series(0, index=self.columns, dtype=np.int64)
+            self.moments = {col: _RunningMoments() for col in self.numeric}
+            self.histograms = {col: _AdaptiveHistogram() for col in self.numeric}
+            self.comoments = _CoMoments(len(self.numeric))
+
+        self.n_rows += len(chunk)
+        self.missing += chunk.isnull().sum()
+        self.memory_bytes += int(chunk.memory_usage(deep=True, index=False).sum())
+        self.customers.update(chunk["CustomerID"].dropna().to_numpy())
+
+        block = np.column_stack([pd.to_numeric(chunk[col], errors="coerce").to_numpy(dtype=np.float64)
+                                 for col in self.numeric])
+        self.comoments.update(block)
+        for i, col in enumerate(self.numeric):
+            values = block[:, i][~np.isnan(block[:, i])]
+            self.moments[col].update(values)
+            self.histograms[col].update(values)
+
+        for col in CATEGORICAL_COLUMNS:
+            counts = chunk[col].value_counts()
+            self.value_counts[col] = counts if col not in self.value_counts else self.value_counts[col].add(counts, fill_value=0)
+
+        for col, agg in _churn_by(chunk, self.age_min).items():
+            self.churn_by[col] = agg if col not in self.churn_by else self.churn_by[col].add(agg, fill_value=0)
+
+    def finalize(self, bins):
+        describe = pd.DataFrame(index=DESCRIBE_INDEX, columns=self.numeric, dtype=np.float64)
+        histograms = {}
+        for col in self.numeric:
+            m, h = self.moments[col], self.histograms[col]
+            describe[col] = [m.n, m.mean, m.std, m.min, *h.quantiles([0.25, 0.5, 0.75], m.min, m.max), m.max]
+            histograms[col] = h.rebin(bins, m.min, m.max)
+        return DatasetSummary(
+            n_rows=self.n_rows,
+            columns=self.columns,
+            missing=self.missing,
+            describe=describe,
+            skew=pd.Series([self.moments[col].skew for col in self.numeric], index=self.numeric, dtype=np.float64),
+            correlation=pd.DataFrame(self.comoments.corr(), index=self.numeric, columns=self.numeric),
+            memory_bytes=self.memory_bytes,
+            head=self.head,
+            unique_customers=self.customers.estimate(),
+            value_counts={col: vc.astype(np.int64).sort_values(ascending=False) for col, vc in self.value_counts.items()},
+            histograms=histograms,
+            churn_by={col: agg.astype(np.int64) for col, agg in self.churn_by.items()},
+            exact=False,
+        )
+
+
+class _RunningMoments:
+    # Chan et al. / Pebay pairwise merge of count/mean/M2/M3 so chunk order does not cost precision
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.m3 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        if len(values) == 0:
+            return
+        batch = _RunningMoments()
+        batch.n = len(values)
+        batch.mean = values.mean()
+        centered = values - batch.mean
+        batch.m2 = (centered ** 2).sum()
+        batch.m3 = (centered ** 3).sum()
+        batch.min, batch.max = values.min(), values.max()
+        self.merge(batch)
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        n_a, n_b = self.n, other.n
+        n = n_a + n_b
+        delta = other.mean - self.mean
+        self.m3 += (other.m3 + delta ** 3 * n_a * n_b * (n_a - n_b) / n ** 2
+                    + 3 * delta * (n_a * other.m2 - n_b * self.m2) / n)
+        self.m2 += other.m2 + delta ** 2 * n_a * n_b / n
+        self.mean += delta * n_b / n
+        self.n = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / (self.n - 1)) if self.n > 1 else np.nan
+
+    @property
+    def skew(self):
+        # Adjusted Fisher-Pearson, as pandas and column_stats report it
+        if self.n < 3:
+            return np.nan
+        if self.m2 == 0:
+            return 0.0
+        return self.n * np.sqrt(self.n - 1) / (self.n - 2) * self.m3 / self.m2 ** 1.5
+
+
+class _CoMoments:
+    # Pairwise-complete co-moments of k columns, merged chunk by chunk like _RunningMoments.
+    # Entry [i, j] of n/mean/m2 describes column i over the rows where both i and j are present.
+    def __init__(self, k):
+        self.n = np.zeros((k, k))
+        self.mean = np.zeros((k, k))
+        self.m2 = np.zeros((k, k))
+        self.c = np.zeros((k, k))
+        self.shift = None
+
+    def update(self, block):
+        present = ~np.isnan(block)
+        if self.shift is None:
+            # Shifting by a first-chunk reference keeps the raw sums small; co-moments are unaffected
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", RuntimeWarning)
+                self.shift = np.nan_to_num(np.nanmean(block, axis=0))
+        w = present.astype(np.float64)
+        z = np.where(present, block - self.shift, 0.0)
+        n_b = w.T @ w
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean_b = np.where(n_b > 0, (z.T @ w) / n_b, 0.0)
+        m2_b = (z * z).T @ w - n_b * mean_b ** 2
+        c_b = z.T @ z - n_b * mean_b * mean_b.T
+
+        n = self.n + n_b
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(n > 0, self.n * n_b / n, 0.0)
+            delta = mean_b - self.mean
+            self.mean = np.where(n > 0, self.mean + delta * n_b / n, 0.0)
+        self.c += c_b + delta * delta.T * weight
+        self.m2 += m2_b + delta ** 2 * weight
+        self.n = n
+
+    def corr(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            r = self.c / np.sqrt(self.m2 * self.m2.T)
+        return np.where(self.n > 1, np.clip(r, -1.0, 1.0), np.nan)
+
+
+class _AdaptiveHistogram:
+    # Fixed bin count over a range that doubles (merging bin pairs) whenever a value falls outside it;
+    # per-bin sums keep each bin's mean so discrete columns are located exactly
+    def __init__(self, bins=FINE_BINS):
+        self.bins = bins
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.sums = np.zeros(bins, dtype=np.float64)
+        self.lo = None
+        self.width = None
+
+    @property
+    def hi(self):
+        return self.lo + self.width * self.bins
+
+    def update(self, values):
+        if len(values) == 0:
+            return
+        vmin, vmax = values.min(), values.max()
+        if self.lo is None:
+            self.lo = vmin
+            self.width = (vmax - vmin) / self.bins if vmax > vmin else max(abs(vmin), 1.0) / self.bins
+        while vmin < self.lo:
+            self._double(grow_left=True)
+        while vmax >= self.hi:
+            self._double(grow_left=False)
+        idx = np.clip(((values - self.lo) / self.width).astype(np.int64), 0, self.bins - 1)
+        self.counts += np.bincount(idx, minlength=self.bins)
+        self.sums += np.bincount(idx, weights=values, minlength=self.bins)
+
+    def _double(self, grow_left):
+        half = slice(self.bins // 2, None) if grow_left else slice(None, self.bins // 2)
+        for name in ("counts", "sums"):
+            merged = getattr(self, name).reshape(-1, 2).sum(axis=1)
+            doubled = np.zeros_like(merged, shape=self.bins)
+            doubled[half] = merged
+            setattr(self, name, doubled)
+        if grow_left:
+            self.lo -= self.width * self.bins
+        self.width *= 2
+
+    def _bin_means(self):
+        centers = self.lo + (np.arange(self.bins) + 0.5) * self.width
+        return np.divide(self.sums, self.counts, out=centers, where=self.counts > 0)
+
+    def quantiles(self, qs, vmin, vmax):
+        total = self.counts.sum()
+        if total == 0:
+            return [np.nan] * len(qs)
+        cum = np.cumsum(self.counts)
+        means = self._bin_means()
+        idx = np.searchsorted(cum, np.asarray(qs) * (total - 1), side="right")
+        return [float(np.clip(means[i], vmin, vmax)) for i in idx]
+
+    def rebin(self, bins, vmin, vmax):
+        if self.lo is None:
+            return np.histogram([], bins=bins)
+        means = np.clip(self._bin_means(), vmin, vmax)
+        return np.histogram(means, bins=bins, range=(vmin, vmax), weights=self.counts)
+
+
+class _HyperLogLog:
+    # Distinct-count sketch: 2**p one-byte registers, ~1.04/sqrt(2**p) relative error
+    def __init__(self, p=14):
+        self.p = p
+        self.registers = np.zeros(1 << p, dtype=np.uint8)
+
+    def update(self, values):
+        if len(values) == 0:
+            return
+        h = pd.util.hash_array(np.asarray(values, dtype=object))
+        idx = (h >> np.uint64(64 - self.p)).astype(np.intp)
+        rest = (h << np.uint64(self.p)) | np.uint64(1 << (self.p - 1))
+        rho = (65 - _bit_length(rest)).astype(np.uint8)
+        np.maximum.at(self.registers, idx, rho)
+
+    def estimate(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and zeros:
+            raw = m * np.log(m / zeros)
+        return int(round(raw))
+
+
+def _bit_length(x):
+    hi = (x >> np.uint64(32)).astype(np.float64)
+    lo = (x & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    return np.where(hi > 0, 32 + np.frexp(hi)[1], np.frexp(lo)[1])
@@ -0,0 +1,129 @@
+"""Per-record and micro-batch cleaning + standardization for online scoring, without building DataFrames.
+
+    python online.py --params preprocessor.json    # benchmark against the DataFrame path
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning import CLEANED_COLUMNS
+from pipeline import DATA_PATH, Preprocessor
+
+FEATURES = CLEANED_COLUMNS
+BATCH_SIZE = 64
+
+
+class OnlineTransformer:
+    """A fitted Preprocessor's rules as plain float arithmetic.
+
+    ``transform_record`` handles one customer dict and ``transform_batch`` an (n, 4) array of
+    Age/Income/Tenure/SupportCalls rows; both give the same float64 values as
+    ``Preprocessor.transform`` on the same input.
+    """
+
+    def __init__(self, preprocessor):
+        cleaners = {cleaner.column: cleaner for cleaner in preprocessor.cleaners}
+        standardizer = preprocessor.standardizer
+        if list(cleaners) != FEATURES or standardizer.features != FEATURES:
+            raise ValueError(f"Online scoring expects cleaners and standardizer over {FEATURES}")
+        params = preprocessor.params
+        self.age_min = preprocessor.age_min
+        self.sc_max = cleaners["SupportCalls"].sc_max
+        self.sc_cap = cleaners["SupportCalls"].sc_cap
+        self.income_upper = float(params["income_upper"])
+        self.fills = np.array([params["age_fill"], params["income_fill"], params["tenure_fill"], params["sc_fill"]],
+                              dtype=np.float64)
+        self.mean = np.array([standardizer.mean[f] for f in FEATURES])
+        self.std = np.array([standardizer.std[f] for f in FEATURES])
+        # Python floats: scalar arithmetic on them is several times cheaper than on NumPy scalars
+        self._fills = [float(v) for v in self.fills]
+        self._scale = [(float(m), float(s)) for m, s in zip(self.mean, self.std)]
+
+    @classmethod
+    def load(cls, path):
+        return cls(Preprocessor.load(path))
+
+    def transform_record(self, record, standardized=True):
+        """Cleaned (and standardized) copy of one customer dict, or None if its Age is below the minimum."""
+        age = record.get("Age")
+        if age is not None and age < self.age_min:
+            return None
+        income, tenure, support_calls = record.get("Income"), record.get("Tenure"), record.get("SupportCalls")
+        if support_calls is not None and support_calls > self.sc_max:
+            support_calls = self.sc_cap
+        values = [age, income, tenure, support_calls]
+        for i, value in enumerate(values):
+            # None or NaN (the only value not equal to itself) takes the fitted fill
+            values[i] = self._fills[i] if value is None or value != value else float(value)
+        if values[1] > self.income_upper:
+            values[1] = self.income_upper
+        out = dict(record)
+        for i, feature in enumerate(FEATURES):
+            if standardized:
+                mean, std = self._scale[i]
+                out[feature] = (values[i] - mean) / std
+            else:
+                out[feature] = values[i]
+        return out
+
+    def transform_batch(self, X, standardized=True):
+        """Rows of an (n, 4) array in FEATURES order -> (mask of rows kept, transformed kept rows)."""
+        X = np.asarray(X, dtype=np.float64)
+        keep = ~(X[:, 0] < self.age_min)
+        out = X[keep]
+        support_calls = out[:, 3]
+        np.copyto(support_calls, self.sc_cap, where=support_calls > self.sc_max)
+        np.copyto(out, self.fills, where=np.isnan(out))
+        np.minimum(out[:, 1], self.income_upper, out=out[:, 1])
+        if standardized:
+            out -= self.mean
+            out /= self.std
+        return keep, out
+
+
+def _per_call(fn, items, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            fn(item)
+    return (time.perf_counter() - start) / (repeat * len(items))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark online transforms against the DataFrame path.")
+    parser.add_argument("--data", default=DATA_PATH, help="customer CSV used for fitting and as sample records")
+    parser.add_argument("--params", help="fitted preprocessor JSON (fitted on --data when omitted)")
+    parser.add_argument("--records", type=int, default=500, help="records timed per path")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    data = pd.read_csv(args.data)
+    preprocessor = Preprocessor.load(args.params) if args.params else Preprocessor().fit(data)
+    online = OnlineTransformer(preprocessor)
+
+    sample = data.head(args.records)
+    records = sample.to_dict("records")
+    batches = [sample[FEATURES].to_numpy()[i:i + BATCH_SIZE] for i in range(0, len(sample), BATCH_SIZE)]
+    frames = [sample.iloc[i:i + BATCH_SIZE] for i in range(0, len(sample), BATCH_SIZE)]
+
+    expected = preprocessor.transform(sample, standardized=True)
+    online_rows = [r for r in map(online.transform_record, records) if r is not None]
+    keep, batch_rows = online.transform_batch(sample[FEATURES].to_numpy())
+    assert np.array_equal(pd.DataFrame(online_rows)[FEATURES].to_numpy(), expected[FEATURES].to_numpy())
+    assert np.array_equal(batch_rows, expected[FEATURES].to_numpy())
+
+    results = [
+        ("record, DataFrame path", _per_call(lambda r: preprocessor.transform(pd.DataFrame([r]), True), records[:50], 1)),
+        ("record, online", _per_call(online.transform_record, records, args.repeat)),
+        (f"batch of {BATCH_SIZE}, DataFrame path", _per_call(lambda f: preprocessor.transform(f, True), frames, 1)),
+        (f"batch of {BATCH_SIZE}, online", _per_call(online.transform_batch, batches, args.repeat)),
+    ]
+    print(f"outputs identical to Preprocessor.transform on {len(records)} records")
+    for name, seconds in results:
+        print(f"{name:<28} {seconds * 1e6:10.1f} us/call")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""Headless cleaning and z-score standardization of the customer data, importable or run as a CLI.
+
+    python pipeline.py customer_data.csv -o cleaned.parquet --standardized standardized.parquet
+    python pipeline.py customer_data.csv --save-params preprocessor.json
+    python pipeline.py new_batch.csv --params preprocessor.json -o scored.parquet
+    python pipeline.py huge.csv --quantile-mode sketch -o cleaned.parquet   # streamed in chunks
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning import (CLEANED_COLUMNS, COLUMN_PARAMS, clean_column, clean_parallel, clean_values, fit_cleaning_params,
+                      fit_column)
+from column_stats import column_stats
+from column_store import FrameSchema, read_chunks
+from data_cache import downcast
+from ingest import CHUNK_SIZE, _RunningMoments
+from quantiles import QUANTILE_MODES
+
+DATA_PATH = "customer_data.csv"
+AGE_MIN = 18
+IQR_MULTIPLIER = 1.5
+SUPPORT_CALLS_MAX = 25
+SUPPORT_CALLS_CAP = 7
+# "exact" matches pandas; "sketch" bounds memory with KLL sketches of rank error QUANTILE_EPS
+QUANTILE_MODE = "exact"
+QUANTILE_EPS = 0.005
+# The fused path is the default: the process pool runs at most one worker per cleaned column and
+# copies every column through shared memory both ways, which made it ~3x slower on a single CPU
+CLEANING_WORKERS = 1
+PARALLEL_CLEANING_MIN_ROWS = 1_000_000
+STANDARDIZED_COLUMNS = CLEANED_COLUMNS
+ARTIFACT_VERSION = 1
+
+
+def read_frame(path):
+    """Raw customer frame from a CSV or Parquet file, downcast to the smallest lossless dtypes."""
+    if path.endswith(".parquet"):
+        return downcast(pd.read_parquet(path))
+    return downcast(pd.read_csv(path))
+
+
+def write_frame(df, path):
+    if path.endswith(".parquet"):
+        df.to_parquet(path)
+    else:
+        df.to_csv(path, index=False)
+
+
+class FrameWriter:
+    """Writes a frame that arrives in chunks to one file, as ``write_frame`` would have written it whole.
+
+    Every chunk must have the same dtypes (e.g. cast with ``FrameSchema.dtypes()``).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._parquet = None
+        self._schema = None
+        self._rows = 0
+
+    def write(self, df):
+        if self.path.endswith(".parquet"):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            # The index is always written, so chunks that happen to keep a RangeIndex match the rest
+            table = pa.Table.from_pandas(df, schema=self._schema, preserve_index=True)
+            if self._parquet is None:
+                self._schema = table.schema
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            df.to_csv(self.path, mode="a" if self._rows else "w", header=not self._rows, index=False)
+        self._rows += len(df)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+
+
+def preprocess(data, age_min=AGE_MIN, iqr_multiplier=IQR_MULTIPLIER,
+               sc_max=SUPPORT_CALLS_MAX, sc_cap=SUPPORT_CALLS_CAP,
+               quantile_mode=QUANTILE_MODE, quantile_eps=QUANTILE_EPS, workers=CLEANING_WORKERS):
+    """Age -> Income -> Tenure -> SupportCalls cleaning chain; returns ``(data_sc, params)``.
+
+    The fused path fits and cleans the filtered column copies in place. With ``workers > 1`` and at
+    least ``PARALLEL_CLEANING_MIN_ROWS`` rows, each column is instead fitted and cleaned on its own
+    worker process.
+    """
+    if workers > 1 and len(data) >= PARALLEL_CLEANING_MIN_ROWS:
+        data_sc = data[(data["Age"] >= age_min) | data["Age"].isna()].copy()
+        params, columns = clean_parallel(data_sc, workers, iqr_multiplier, sc_max, sc_cap,
+                                         quantile_mode, quantile_eps)
+        for col in CLEANED_COLUMNS:
+            data_sc[col] = pd.Series(columns[col], index=data_sc.index)
+        return data_sc, params
+
+    fit_options = (iqr_multiplier, sc_max, sc_cap, quantile_mode, quantile_eps)
+    return clean_fused(data, age_min=age_min, sc_max=sc_max, sc_cap=sc_cap, fit_options=fit_options)
+
+
+def clean_fused(data, params=None, age_min=AGE_MIN, sc_max=SUPPORT_CALLS_MAX, sc_cap=SUPPORT_CALLS_CAP,
+                standardizer=None, fit_options=None):
+    """Row filter, imputation, capping and optional z-scoring written straight into one output frame.
+
+    Every column is copied once while filtering and the cleaned ones are then modified in place, so
+    the extra memory is one filtered copy of the table rather than a copy per step. Without
+    ``params`` each column is fitted (``fit_column(col, values, *fit_options)``) just before it is
+    cleaned. Returns ``(data_sc, params)``, standardized when a fitted ``standardizer`` is given.
+    """
+    keep = ~(_values(data["Age"]) < age_min)
+    index = data.index[keep]
+    fitted = {}
+    columns = {}
+    for col in data.columns:
+        values = _values(data[col])[keep]
+        if col in CLEANED_COLUMNS:
+            if params is None:
+                fitted.update(fit_column(col, pd.Series(values, index=index, copy=False), *(fit_options or ())))
+            values = clean_values(col, values, params or fitted, sc_max, sc_cap)
+            if standardizer is not None and col in standardizer.features:
+                values = standardizer.transform_values(col, values)
+        # An explicit dtype stops pandas from scanning object columns to infer one
+        columns[col] = pd.Series(values, index=index, dtype=values.dtype, copy=False)
+    return pd.DataFrame(columns, copy=False), params or fitted
+
+
+def clean_chunks(chunks, params, age_min=AGE_MIN, sc_max=SUPPORT_CALLS_MAX, sc_cap=SUPPORT_CALLS_CAP,
+                 standardizer=None):
+    """``clean_fused`` with fitted ``params`` applied to each frame of ``chunks``, one cleaned chunk at a time."""
+    for chunk in chunks:
+        yield clean_fused(chunk, params, age_min, sc_max, sc_cap, standardizer)[0]
+
+
+def fit_streaming(chunks, age_min=AGE_MIN, iqr_multiplier=IQR_MULTIPLIER, sc_max=SUPPORT_CALLS_MAX,
+                  sc_cap=SUPPORT_CALLS_CAP, quantile_mode=QUANTILE_MODE, quantile_eps=QUANTILE_EPS):
+    """Preprocessor fitted on a file read as ``chunks()`` (called once per pass), never holding it whole.
+
+    The first pass fits the cleaning parameters and the file's dtypes, the second the standardizer
+    from running moments of the cleaned chunks. Returns ``(preprocessor, schema, rows_kept)``;
+    ``schema.dtypes()`` casts later chunks to the dtypes ``read_frame`` would have given.
+    """
+    schema = FrameSchema()
+    params = fit_cleaning_params(schema.scan(chunks()), age_min, iqr_multiplier, sc_max, sc_cap,
+                                 quantile_mode, quantile_eps)
+    dtypes = schema.dtypes()
+    moments = {f: _RunningMoments() for f in STANDARDIZED_COLUMNS}
+    for data_sc in clean_chunks((chunk.astype(dtypes) for chunk in chunks()), params, age_min, sc_max, sc_cap):
+        for f, m in moments.items():
+            m.update(data_sc[f].to_numpy(dtype=np.float64))
+    standardizer = Standardizer(STANDARDIZED_COLUMNS, {f: float(m.mean) for f, m in moments.items()},
+                                {f: float(m.std) for f, m in moments.items()})
+    preprocessor = Preprocessor(age_min, _cleaners(params, iqr_multiplier, sc_max, sc_cap), standardizer)
+    return preprocessor, schema, moments[STANDARDIZED_COLUMNS[0]].n
+
+
+def _values(column):
+    # NumPy-backed columns as their ndarray (a view), extension columns as their ExtensionArray
+    return column.to_numpy() if isinstance(column.dtype, np.dtype) else column.array
+
+
+def standardize(data_sc, features=STANDARDIZED_COLUMNS, stats=None):
+    """Z-scores of ``features`` using the sample mean and std (``stats`` from column_stats, if already known)."""
+    return Standardizer(features).fit(data_sc, stats).transform(data_sc)
+
+
+class ColumnCleaner:
+    """Imputation of one column (plus the Income cap or SupportCalls remap), fitted on Age-filtered rows."""
+
+    def __init__(self, column, iqr_multiplier=IQR_MULTIPLIER, sc_max=SUPPORT_CALLS_MAX,
+                 sc_cap=SUPPORT_CALLS_CAP, params=None):
+        self.column = column
+        self.iqr_multiplier = iqr_multiplier
+        self.sc_max = sc_max
+        self.sc_cap = sc_cap
+        self.params = params
+
+    def fit(self, data_sc, quantile_mode=QUANTILE_MODE, quantile_eps=QUANTILE_EPS):
+        self.params = fit_column(self.column, data_sc[self.column], self.iqr_multiplier,
+                                 self.sc_max, self.sc_cap, quantile_mode, quantile_eps)
+        return self
+
+    def transform(self, data_sc):
+        return clean_column(self.column, data_sc[self.column], self.params, self.sc_max, self.sc_cap)
+
+    def to_dict(self):
+        return {"column": self.column, "iqr_multiplier": self.iqr_multiplier, "sc_max": self.sc_max,
+                "sc_cap": self.sc_cap, "params": {k: _plain(v) for k, v in self.params.items()}}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+class Standardizer:
+    """Z-score scaling with the mean and sample std of the data it was fitted on."""
+
+    def __init__(self, features=STANDARDIZED_COLUMNS, mean=None, std=None):
+        self.features = list(features)
+        self.mean = mean
+        self.std = std
+
+    def fit(self, data_sc, stats=None):
+        self.mean, self.std = {}, {}
+        for f in self.features:
+            # One column at a time keeps the float64 working copy to a single column
+            column = stats[f] if stats is not None else column_stats(data_sc, [f])[f]
+            self.mean[f] = float(column["mean"])
+            self.std[f] = float(column["std"])
+        return self
+
+    def transform(self, data_sc):
+        data_standardized = data_sc.copy()
+        for feature in self.features:
+            data_standardized[feature] = (data_sc[feature] - self.mean[feature]) / self.std[feature]
+        return data_standardized
+
+    def transform_values(self, feature, values):
+        """Z-scores of one column's array, computed in place when it is a floating point ndarray."""
+        if not isinstance(values, np.ndarray) or values.dtype.kind != "f":
+            return (values - self.mean[feature]) / self.std[feature]
+        np.subtract(values, self.mean[feature], out=values)
+        np.divide(values, self.std[feature], out=values)
+        return values
+
+    def to_dict(self):
+        return {"features": self.features, "mean": self.mean, "std": self.std}
+
+    @classmethod
+    def from_dict(cls, d):
+        return cls(**d)
+
+
+class Preprocessor:
+    """Age filter, column cleaners and standardizer fitted once on reference data.
+
+    The fitted state is a few dozen numbers saved as JSON, so scoring a new batch with
+    ``transform`` never reads the reference data again and cannot drift from it.
+    """
+
+    def __init__(self, age_min=AGE_MIN, cleaners=None, standardizer=None):
+        self.age_min = age_min
+        self.cleaners = cleaners
+        self.standardizer = standardizer
+
+    def fit(self, data, **options):
+        self.fit_transform(data, **options)
+        return self
+
+    def fit_transform(self, data, iqr_multiplier=IQR_MULTIPLIER, sc_max=SUPPORT_CALLS_MAX,
+                      sc_cap=SUPPORT_CALLS_CAP, quantile_mode=QUANTILE_MODE, quantile_eps=QUANTILE_EPS,
+                      workers=CLEANING_WORKERS):
+        """Fit on ``data`` and return its cleaned frame (computed once, possibly in parallel)."""
+        data_sc, params = preprocess(data, self.age_min, iqr_multiplier, sc_max, sc_cap,
+                                     quantile_mode, quantile_eps, workers)
+        self.cleaners = _cleaners(params, iqr_multiplier, sc_max, sc_cap)
+        self.standardizer = Standardizer().fit(data_sc)
+        return data_sc
+
+    def transform(self, data, standardized=False):
+        support_calls = next(cleaner for cleaner in self.cleaners if cleaner.column == "SupportCalls")
+        data_sc, _ = clean_fused(data, self.params, self.age_min, support_calls.sc_max, support_calls.sc_cap,
+                                 self.standardizer if standardized else None)
+        return data_sc
+
+    @property
+    def params(self):
+        return {k: v for cleaner in self.cleaners for k, v in cleaner.params.items()}
+
+    def to_dict(self):
+        return {"version": ARTIFACT_VERSION, "age_min": self.age_min,
+                "cleaners": [cleaner.to_dict() for cleaner in self.cleaners],
+                "standardizer": self.standardizer.to_dict()}
+
+    @classmethod
+    def from_dict(cls, d):
+        if d.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported preprocessor artifact version: {d.get('version')}")
+        return cls(d["age_min"], [ColumnCleaner.from_dict(c) for c in d["cleaners"]],
+                   Standardizer.from_dict(d["standardizer"]))
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def _cleaners(params, iqr_multiplier, sc_max, sc_cap):
+    return [ColumnCleaner(col, iqr_multiplier, sc_max, sc_cap, {k: params[k] for k in COLUMN_PARAMS[col]})
+            for col in CLEANED_COLUMNS]
+
+
+def _plain(value):
+    # JSON keeps float64 exactly via repr; numpy scalars need unwrapping first
+    return value.item() if hasattr(value, "item") else value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Clean and standardize a customer churn file.")
+    parser.add_argument("input", help="raw customer data (.csv or .parquet)")
+    parser.add_argument("-o", "--output", help="where to write the cleaned frame (.csv or .parquet)")
+    parser.add_argument("--standardized", help="where to write the z-score standardized frame")
+    parser.add_argument("--quantile-mode", choices=QUANTILE_MODES, default=QUANTILE_MODE)
+    parser.add_argument("--quantile-eps", type=float, default=QUANTILE_EPS)
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE,
+                        help="rows per chunk when sketch mode streams the input")
+    parser.add_argument("--workers", type=int, default=CLEANING_WORKERS,
+                        help="clean each column on its own process (up to 4) on large inputs")
+    parser.add_argument("--params", help="fitted preprocessor JSON; transform with it instead of fitting")
+    parser.add_argument("--save-params", help="where to write the fitted preprocessor JSON")
+    args = parser.parse_args(argv)
+
+    timings = []
+
+    def timed(stage, fn, *fn_args, **fn_kwargs):
+        start = time.perf_counter()
+        result = fn(*fn_args, **fn_kwargs)
+        timings.append((stage, time.perf_counter() - start))
+        return result
+
+    if args.quantile_mode == "sketch" and not args.params:
+        # Sketch mode streams the input: two chunked passes fit the preprocessor and a third cleans
+        # and writes, so memory stays at a chunk plus the sketches
+        def chunks():
+            return read_chunks(args.input, args.chunksize)
+        preprocessor, schema, n_kept = timed("fit (streamed)", fit_streaming, chunks, quantile_mode=args.quantile_mode,
+                                             quantile_eps=args.quantile_eps)
+        n_rows = schema.n_rows
+        if args.save_params:
+            timed("save params", preprocessor.save, args.save_params)
+        if args.output or args.standardized:
+            timed("clean + write", write_streaming, preprocessor, (chunk.astype(schema.dtypes()) for chunk in chunks()),
+                  args.output, args.standardized)
+    else:
+        data = timed("read", read_frame, args.input)
+        if args.params:
+            preprocessor = timed("load params", Preprocessor.load, args.params)
+            data_sc = timed("clean", preprocessor.transform, data)
+        else:
+            preprocessor = Preprocessor()
+            data_sc = timed("fit + clean", preprocessor.fit_transform, data, quantile_mode=args.quantile_mode,
+                            quantile_eps=args.quantile_eps, workers=args.workers)
+        n_rows, n_kept = len(data), len(data_sc)
+        if args.save_params:
+            timed("save params", preprocessor.save, args.save_params)
+        if args.output:
+            timed("write cleaned", write_frame, data_sc, args.output)
+        if args.standardized:
+            data_standardized = timed("standardize", preprocessor.standardizer.transform, data_sc)
+            timed("write standardized", write_frame, data_standardized, args.standardized)
+
+    print(f"{n_rows:,} rows read, {n_kept:,} kept after the Age >= {preprocessor.age_min} filter")
+    for name, value in preprocessor.params.items():
+        print(f"  {name:<14} {value}")
+    for stage, seconds in timings:
+        print(f"{stage:<20} {seconds:8.3f}s")
+    print(f"{'total':<20} {sum(s for _, s in timings):8.3f}s")
+
+
+def write_streaming(preprocessor, chunks, output=None, standardized=None):
+    """Clean each raw chunk with a fitted preprocessor and append it to ``output`` and/or ``standardized``."""
+    writers = [(FrameWriter(path), is_standardized)
+               for path, is_standardized in [(output, False), (standardized, True)] if path]
+    try:
+        for chunk in chunks:
+            data_sc = preprocessor.transform(chunk)
+            for writer, is_standardized in writers:
+                writer.write(preprocessor.standardizer.transform(data_sc) if is_standardized else data_sc)
+    finally:
+        for writer, _ in writers:
+            writer.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Wall-clock durations and tracemalloc peaks of named phases, recorded as plain dicts so they serialize as they are."""
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+
+class PhaseRecorder:
+    """Durations of ``(name, phase)`` pairs in the order they finished.
+
+    ``span`` (or ``open``/``close``) times a block and spans may nest. ``lap`` records the time
+    since the last ``mark``, ``lap``, ``open`` or ``close``, which attributes the code between two
+    timed blocks (e.g. a chart's data preparation between the previous chart and its own render)
+    without wrapping it. With ``memory`` on and tracemalloc tracing, each record also holds
+    ``peak_bytes``, the most memory traced during the phase above what was traced when it started.
+    """
+
+    def __init__(self, memory=False):
+        self.records = []
+        self.memory = memory and tracemalloc.is_tracing()
+        self._origin = self._last = time.perf_counter()
+        self._open = []
+        self._lap = self._start_memory()
+
+    def mark(self):
+        self._checkpoint()
+        self._last = time.perf_counter()
+        self._lap = self._start_memory()
+
+    def lap(self, name, phase):
+        self._checkpoint()
+        now = time.perf_counter()
+        self._add(name, phase, self._last, now, self._lap, len(self._open))
+        self._last = now
+        self._lap = self._start_memory()
+
+    def open(self, name, phase):
+        self._checkpoint()
+        self._last = time.perf_counter()
+        self._open.append((name, phase, self._last, self._start_memory()))
+        self._lap = self._start_memory()
+
+    def close(self):
+        self._checkpoint()
+        name, phase, start, memory = self._open.pop()
+        self._last = time.perf_counter()
+        self._add(name, phase, start, self._last, memory, len(self._open))
+        self._lap = self._start_memory()
+
+    @contextmanager
+    def span(self, name, phase):
+        self.open(name, phase)
+        try:
+            yield
+        finally:
+            self.close()
+
+    def to_json(self):
+        return json.dumps({"records": self.records}, indent=2)
+
+    def to_chrome_trace(self):
+        """The records as Trace Event Format JSON, for chrome://tracing or Perfetto."""
+        events = [{"name": r["name"], "cat": r["phase"], "ph": "X", "ts": r["start"] * 1e6, "dur": r["seconds"] * 1e6,
+                   "pid": 1, "tid": 1, "args": {"peak_bytes": r["peak_bytes"]}} for r in self.records]
+        return json.dumps({"traceEvents": events, "displayTimeUnit": "ms"})
+
+    def _start_memory(self):
+        # [traced bytes at the start, peak seen since], the peak folded in at every checkpoint
+        if not self.memory:
+            return None
+        current, _ = tracemalloc.get_traced_memory()
+        return [current, current]
+
+    def _checkpoint(self):
+        # tracemalloc keeps a single peak, so it is folded into every phase still running and reset
+        if not self.memory:
+            return
+        _, peak = tracemalloc.get_traced_memory()
+        for memory in [self._lap] + [entry[3] for entry in self._open]:
+            memory[1] = max(memory[1], peak)
+        tracemalloc.reset_peak()
+
+    def _add(self, name, phase, start, end, memory, depth):
+        self.records.append({"name": name, "phase": phase, "start": start - self._origin, "seconds": end - start,
+                             "peak_bytes": memory[1] - memory[0] if memory else None, "depth": depth})
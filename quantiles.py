@@ -0,0 +1,148 @@
+"""Quantile backends: exact (pandas on the collected values) or a bounded-memory KLL sketch."""
+import numpy as np
+import pandas as pd
+
+QUANTILE_MODES = ("exact", "sketch")
+DEFAULT_EPS = 0.005
+# Normalized rank error of a KLL sketch with parameter k is about KLL_ERROR_CONSTANT / k (99% confidence)
+KLL_ERROR_CONSTANT = 1.7
+
+
+def make_quantiles(mode="exact", eps=DEFAULT_EPS, seed=0):
+    """Empty backend with update(values), insert(value, count), merge(other), mean(), median() and quantiles(qs)."""
+    if mode == "exact":
+        return ExactQuantiles()
+    if mode == "sketch":
+        return KLLSketch(eps, seed)
+    raise ValueError(f"Unknown quantile mode: {mode}")
+
+
+class ExactQuantiles:
+    """Keeps every non-missing value and defers to pandas, so results match Series.quantile/median."""
+
+    def __init__(self):
+        self.n = 0
+        self._parts = []
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        self._parts.append(values)
+        self.n += len(values)
+
+    def insert(self, value, count):
+        self.update(np.full(count, value, dtype=np.float64))
+
+    def merge(self, other):
+        self._parts.extend(other._parts)
+        self.n += other.n
+
+    def _series(self):
+        return pd.Series(np.concatenate(self._parts) if self._parts else np.empty(0))
+
+    def mean(self):
+        return self._series().mean()
+
+    def median(self):
+        return self._series().median()
+
+    def quantiles(self, qs):
+        return self._series().quantile(list(qs)).to_numpy()
+
+
+class KLLSketch:
+    """KLL quantile sketch (Karnin, Lang & Liberty 2016) with rank error ``eps`` w.h.p.
+
+    Level h holds items of weight 2**h; a level over capacity is sorted and every other item,
+    from a random offset, is promoted to the next level. Memory is O(k) for k ~ 1/eps, and
+    sketches of different chunks merge by concatenating levels.
+    """
+
+    def __init__(self, eps=DEFAULT_EPS, seed=0):
+        self.eps = eps
+        self.k = max(int(np.ceil(KLL_ERROR_CONSTANT / eps)), 8)
+        self.n = 0
+        self.total = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def __len__(self):
+        return sum(len(items) for items in self.levels)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self._track(values.min(), values.max(), len(values), values.sum())
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+
+    def insert(self, value, count):
+        # `count` copies of one value: a single item at each level whose bit is set in count
+        if count <= 0 or np.isnan(value):
+            return
+        self._track(value, value, count, value * count)
+        h = 0
+        while count:
+            if count & 1:
+                self._level(h)
+                self.levels[h] = np.append(self.levels[h], value)
+            count >>= 1
+            h += 1
+        self._compress()
+
+    def merge(self, other):
+        if other.n == 0:
+            return
+        self._track(other.min, other.max, other.n, other.total)
+        for h, items in enumerate(other.levels):
+            self._level(h)
+            self.levels[h] = np.concatenate([self.levels[h], items])
+        self._compress()
+
+    def mean(self):
+        return self.total / self.n if self.n else np.nan
+
+    def median(self):
+        return float(self.quantiles([0.5])[0])
+
+    def quantiles(self, qs):
+        qs = np.asarray(qs, dtype=np.float64)
+        if self.n == 0:
+            return np.full(len(qs), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(level), 2.0 ** h) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, cum = items[order], np.cumsum(weights[order])
+        idx = np.minimum(np.searchsorted(cum, qs * self.n, side="right"), len(items) - 1)
+        out = items[idx]
+        out[qs <= 0] = self.min
+        out[qs >= 1] = self.max
+        return out
+
+    def _track(self, vmin, vmax, n, total):
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+        self.n += n
+        self.total += total
+
+    def _level(self, h):
+        while len(self.levels) <= h:
+            self.levels.append(np.empty(0))
+
+    def _capacity(self, h):
+        return max(int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - 1 - h))), 2)
+
+    def _compress(self):
+        # Compact the lowest over-capacity level until the sketch fits its total capacity
+        while len(self) > sum(self._capacity(h) for h in range(len(self.levels))):
+            h = next(h for h, items in enumerate(self.levels) if len(items) > self._capacity(h))
+            items = np.sort(self.levels[h])
+            keep = len(items) % 2
+            self._level(h + 1)
+            promoted = items[keep + self._rng.integers(2)::2]
+            self.levels[h] = items[:keep]
+            self.levels[h + 1] = np.concatenate([self.levels[h + 1], promoted])
@@ -0,0 +1,186 @@
+"""Bootstrap confidence intervals and permutation p-values for churn correlations and group churn-rate gaps."""
+import os
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+from shm import attach, share, spec, view
+
+RESAMPLING_FEATURES = ["Age", "Gender", "Income", "Tenure", "ProductType", "SupportCalls"]
+RESAMPLING_GROUPS = ["Gender", "ProductType"]
+RESAMPLING_WORKERS = os.cpu_count() or 1
+# Resamples per batch; fewer on large data, so a batch's (resamples x rows) weight matrix stays near BATCH_CELLS
+BATCH_RESAMPLES = 250
+BATCH_CELLS = 4_000_000
+CONFIDENCE = 0.95
+
+
+class SignificanceResult:
+    """Observed statistics with percentile bootstrap intervals and permutation p-values.
+
+    ``correlations`` has one row per feature (``r``, ``ci_low``, ``ci_high``, ``p_value``) and
+    ``differences`` one row per group level against the group's first level, its churn rate
+    minus the reference rate. ``n_resamples`` counts the resamples that finished inside the
+    time budget, which can be fewer than ``requested``.
+    """
+
+    def __init__(self, correlations, differences, n_resamples, requested, elapsed, workers):
+        self.correlations = correlations
+        self.differences = differences
+        self.n_resamples = n_resamples
+        self.requested = requested
+        self.elapsed = elapsed
+        self.workers = workers
+
+    @property
+    def complete(self):
+        return self.n_resamples >= self.requested
+
+
+def resample(data, target="ChurnStatus", features=RESAMPLING_FEATURES, groups=RESAMPLING_GROUPS,
+             n_resamples=2000, time_budget=10.0, workers=RESAMPLING_WORKERS, seed=0, confidence=CONFIDENCE):
+    """Bootstrap and permutation distributions of every feature-target correlation and group rate gap.
+
+    Each batch draws its bootstrap resamples as a (resamples x rows) matrix of row multiplicities
+    and its permutations as a matrix of shuffled targets, so every statistic of the batch comes
+    from a few matrix products. Batches run on ``workers`` processes reading the data from shared
+    memory, and no new batch starts once ``time_budget`` seconds have passed. Batch ``i`` always
+    uses the ``i``-th child of ``seed``, so a run that finishes every batch gives the same result
+    on any number of workers.
+    """
+    start = time.perf_counter()
+    x = np.column_stack([data[col].to_numpy(dtype=np.float64, na_value=np.nan) for col in features])
+    y = data[target].to_numpy(dtype=np.float64, na_value=np.nan)
+    codes = {col: data[col].to_numpy() for col in groups}
+    complete = ~np.isnan(x).any(axis=1) & ~np.isnan(y)
+    x, y = x[complete], y[complete]
+
+    # One indicator column per group level; each non-reference level is compared with the first
+    indicators, pairs, labels = [], [], []
+    for col in groups:
+        levels = np.unique(codes[col][complete])
+        reference = len(indicators)
+        indicators.extend(codes[col][complete] == level for level in levels)
+        for i, level in enumerate(levels[1:], start=1):
+            pairs.append((reference + i, reference))
+            labels.append((col, level.item(), levels[0].item()))
+    # Centering the features keeps the weighted sums small without changing any correlation
+    block = np.column_stack([x - x.mean(axis=0), y, *indicators]).astype(np.float64)
+    k, pairs = len(features), np.array(pairs, dtype=np.int64).reshape(-1, 2)
+
+    observed_r, observed_diff = _weighted_statistics(block, np.ones((1, len(block))), k, pairs)
+    n = len(block)
+    size = max(1, min(BATCH_RESAMPLES, BATCH_CELLS // max(n, 1)))
+    sizes = [size] * (n_resamples // size) + ([n_resamples % size] if n_resamples % size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    deadline = start + time_budget
+    if workers > 1 and len(sizes) > 1:
+        batches = _run_parallel(block, k, pairs, seeds, sizes, workers, deadline)
+    else:
+        batches = {}
+        for i, (batch_seed, batch_size) in enumerate(zip(seeds, sizes)):
+            if batches and time.perf_counter() > deadline:
+                break
+            batches[i] = _resample_batch(block, k, pairs, batch_seed, batch_size)
+
+    done = [batches[i] for i in sorted(batches)]
+    boot_r, boot_diff, perm_r, perm_diff = (np.concatenate([batch[j] for batch in done]) for j in range(4))
+    tail = (1 - confidence) / 2
+    correlations = _table(observed_r[0], boot_r, perm_r, tail, "r")
+    correlations.index = pd.Index(features, name="Feature")
+    differences = _table(observed_diff[0], boot_diff, perm_diff, tail, "difference")
+    differences.insert(0, "reference", [label[2] for label in labels])
+    differences.insert(0, "level", [label[1] for label in labels])
+    differences.insert(0, "group", [label[0] for label in labels])
+    return SignificanceResult(correlations, differences, len(boot_r), n_resamples,
+                              time.perf_counter() - start, workers)
+
+
+def _run_parallel(block, k, pairs, seeds, sizes, workers, deadline):
+    shm, _ = share(block)
+    block_spec = spec(shm, block)
+    batches = {}
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending, queued = {}, list(enumerate(zip(seeds, sizes)))
+            while queued or pending:
+                # Keep one batch per worker in flight, so an expired budget leaves little to wait for
+                while queued and len(pending) < workers and (not batches or time.perf_counter() <= deadline):
+                    i, (batch_seed, batch_size) = queued.pop(0)
+                    pending[pool.submit(_resample_worker, block_spec, k, pairs, batch_seed, batch_size)] = i
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    batches[pending.pop(future)] = future.result()
+                if time.perf_counter() > deadline:
+                    queued.clear()
+    finally:
+        shm.close()
+        shm.unlink()
+    return batches
+
+
+def _resample_worker(block_spec, k, pairs, seed, size):
+    shm = attach(block_spec)
+    try:
+        block = view(shm, block_spec)
+        result = _resample_batch(block, k, pairs, seed, size)
+        # The view must be gone before the segment can be closed
+        del block
+    finally:
+        shm.close()
+    return result
+
+
+def _resample_batch(block, k, pairs, seed, size):
+    rng = np.random.default_rng(seed)
+    n = len(block)
+    # Row multiplicities of each bootstrap resample, counted for all of them with one bincount
+    draws = rng.integers(0, n, size=(size, n)) + n * np.arange(size)[:, None]
+    weights = np.bincount(draws.ravel(), minlength=size * n).reshape(size, n).astype(np.float64)
+    del draws
+    boot_r, boot_diff = _weighted_statistics(block, weights, k, pairs)
+    del weights
+    shuffled = rng.permuted(np.broadcast_to(block[:, k], (size, n)), axis=1)
+    perm_r, perm_diff = _permuted_statistics(block, shuffled, k, pairs)
+    return boot_r, boot_diff, perm_r, perm_diff
+
+
+def _weighted_statistics(block, weights, k, pairs):
+    x, y, g = block[:, :k], block[:, k], block[:, k + 1:]
+    total = weights.sum(axis=1)[:, None]
+    sx, sy = weights @ x, (weights @ y)[:, None]
+    sxx, syy, sxy = weights @ (x * x), (weights @ (y * y))[:, None], weights @ (x * y[:, None])
+    return _statistics(total, sx, sy, sxx, syy, sxy, weights @ g, weights @ (g * y[:, None]), pairs)
+
+
+def _permuted_statistics(block, shuffled, k, pairs):
+    # Shuffling the target leaves every marginal sum unchanged; only the cross products move
+    x, y, g = block[:, :k], block[:, k], block[:, k + 1:]
+    total = np.full((1, 1), float(len(block)))
+    sx, sy = x.sum(axis=0)[None, :], np.full((1, 1), y.sum())
+    sxx, syy = (x * x).sum(axis=0)[None, :], np.full((1, 1), (y * y).sum())
+    return _statistics(total, sx, sy, sxx, syy, shuffled @ x, g.sum(axis=0)[None, :], shuffled @ g, pairs)
+
+
+def _statistics(total, sx, sy, sxx, syy, sxy, counts, churned, pairs):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = sxy - sx * sy / total
+        r = cov / np.sqrt((sxx - sx * sx / total) * (syy - sy * sy / total))
+        rates = churned / counts
+    return np.clip(r, -1.0, 1.0), rates[:, pairs[:, 0]] - rates[:, pairs[:, 1]]
+
+
+def _table(observed, boot, perm, tail, name):
+    with warnings.catch_warnings(), np.errstate(invalid="ignore"):
+        # A statistic that is undefined in every resample (e.g. a constant feature) gets a NaN interval
+        warnings.simplefilter("ignore", RuntimeWarning)
+        low, high = np.nanquantile(boot, [tail, 1 - tail], axis=0)
+        # Two-sided permutation p-value, counting the observed statistic as one of the permutations
+        extreme = (np.abs(perm) >= np.abs(observed) - 1e-12).sum(axis=0)
+    p_value = np.where(np.isnan(observed), np.nan, (extreme + 1) / (len(perm) + 1))
+    return pd.DataFrame({name: observed, "ci_low": low, "ci_high": high, "p_value": p_value})
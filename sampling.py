@@ -0,0 +1,81 @@
+"""Stratified reservoir sampling computed in one streaming pass over frames or CSV chunks."""
+import numpy as np
+import pandas as pd
+
+_MASK64 = np.uint64(0xFFFFFFFFFFFFFFFF)
+
+
+class StratifiedReservoir:
+    """Keeps, per stratum, the ``size`` rows with the smallest pseudo-random keys.
+
+    Keys are a hash of the row's position in the stream and the seed, so the sample is
+    reproducible and does not depend on how the input is chunked. Because every stratum
+    retains up to ``size`` candidates, the final allocation can be proportional to the
+    stratum totals, which are only known once the stream ends.
+    """
+
+    def __init__(self, size, strata_col="ChurnStatus", seed=0):
+        self.size = size
+        self.strata_col = strata_col
+        self.seed = seed
+        self.rows_seen = 0
+        self.totals = {}
+        self._reservoirs = {}
+
+    def update(self, chunk):
+        keys = _row_keys(self.rows_seen, len(chunk), self.seed)
+        self.rows_seen += len(chunk)
+        for stratum, positions in chunk.groupby(self.strata_col, sort=False).indices.items():
+            self.totals[stratum] = self.totals.get(stratum, 0) + len(positions)
+            if len(positions) > self.size:
+                positions = positions[np.argpartition(keys[positions], self.size - 1)[:self.size]]
+            candidates = chunk.iloc[positions].assign(_key=keys[positions])
+            if stratum in self._reservoirs:
+                candidates = pd.concat([self._reservoirs[stratum], candidates])
+            self._reservoirs[stratum] = candidates.nsmallest(self.size, "_key")
+
+    def sample(self, allocation="proportional"):
+        quotas = self._quotas(allocation)
+        parts = [self._reservoirs[s].nsmallest(q, "_key") for s, q in quotas.items() if q > 0]
+        if not parts:
+            return pd.DataFrame()
+        return pd.concat(parts).drop(columns="_key").sort_index()
+
+    def _quotas(self, allocation):
+        strata = sorted(self.totals)
+        total = sum(self.totals.values())
+        if total <= self.size:
+            return dict(self.totals)
+        if allocation == "equal":
+            # Smallest strata first so quota they cannot fill passes to the larger ones
+            quotas, remaining = {}, self.size
+            for left, s in zip(range(len(strata), 0, -1), sorted(strata, key=self.totals.get)):
+                quotas[s] = min(self.totals[s], remaining // left)
+                remaining -= quotas[s]
+            return quotas
+        if allocation != "proportional":
+            raise ValueError(f"Unknown allocation: {allocation}")
+        share = np.array([self.totals[s] for s in strata]) * self.size / total
+        quotas = np.floor(share).astype(np.int64)
+        # Largest remainder keeps the sample at exactly `size` rows
+        for i in np.argsort(quotas - share)[:self.size - quotas.sum()]:
+            quotas[i] += 1
+        return {s: int(min(q, self.totals[s])) for s, q in zip(strata, quotas)}
+
+
+def stratified_sample(chunks, size, strata_col="ChurnStatus", seed=0, allocation="proportional"):
+    """Sample ``size`` rows from a frame or an iterable of chunks, stratified by ``strata_col``."""
+    reservoir = StratifiedReservoir(size, strata_col, seed)
+    for chunk in [chunks] if isinstance(chunks, pd.DataFrame) else chunks:
+        reservoir.update(chunk)
+    return reservoir.sample(allocation)
+
+
+def _row_keys(start, n, seed):
+    # splitmix64 of (position, seed): cheap, vectorized and well mixed
+    with np.errstate(over="ignore"):
+        z = np.arange(start, start + n, dtype=np.uint64) + np.uint64(seed) * np.uint64(0x9E3779B97F4A7C15)
+        z = (z + np.uint64(0x9E3779B97F4A7C15)) & _MASK64
+        z = ((z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)) & _MASK64
+        z = ((z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)) & _MASK64
+        return z ^ (z >> np.uint64(31))
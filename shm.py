@@ -0,0 +1,26 @@
+"""Numpy arrays passed to worker processes through shared memory segments, described by small picklable specs."""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+
+def share(array):
+    """A new shared memory segment holding a copy of ``array``; the caller closes and unlinks it."""
+    segment = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    np.ndarray(array.shape, dtype=array.dtype, buffer=segment.buf)[:] = array
+    return segment, array
+
+
+def spec(segment, array):
+    """``(name, dtype, shape)``, enough for another process to ``attach`` and ``view`` the array."""
+    return segment.name, array.dtype.str, array.shape
+
+
+def attach(spec):
+    return shared_memory.SharedMemory(name=spec[0])
+
+
+def view(segment, spec):
+    """The array in ``segment``, without copying; it must be dropped before the segment is closed."""
+    _, dtype, shape = spec
+    return np.ndarray(shape, dtype=np.dtype(dtype), buffer=segment.buf)
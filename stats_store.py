@@ -0,0 +1,198 @@
+"""Persisted CSV statistics that are extended with appended rows instead of recomputed from scratch."""
+import hashlib
+import io
+import os
+import pickle
+from abc import ABC, abstractmethod
+
+import pandas as pd
+
+from cleaning import CleaningFit
+from data_cache import CACHE_DIR
+from ingest import CHUNK_SIZE, HISTOGRAM_BINS, _ChunkAccumulator
+from quantiles import DEFAULT_EPS
+
+STORE_VERSION = 3
+HASH_BLOCK_BYTES = 1 << 20
+
+
+class AppendStore(ABC):
+    """Chunk-mergeable state of a CSV file together with the byte offset it covers.
+
+    The state (from ``empty()``) only needs ``update(chunk)``, so ``refresh()`` parses just
+    the bytes past that offset. The covered prefix is checked against a SHA-1 of all its bytes,
+    so anything but a pure append triggers a rebuild; the check reads the prefix but never
+    parses it.
+    """
+
+    name = None
+
+    def __init__(self, path, cache_dir=CACHE_DIR):
+        self.path = path
+        directory = os.path.join(os.path.dirname(os.path.abspath(path)), cache_dir)
+        self.target = os.path.join(directory, f"{os.path.splitext(os.path.basename(path))[0]}.{self.name}.pkl")
+        self.acc = None
+        self.columns = None
+        self.offset = 0
+        self.digest = None
+        self.rows_read = 0
+
+    @abstractmethod
+    def empty(self):
+        """A new state covering no rows."""
+
+    def key(self):
+        """The settings the persisted state depends on; a store saved with others is rebuilt."""
+        return ()
+
+    def refresh(self, chunksize=CHUNK_SIZE):
+        """Bring the statistics up to date with the file; returns the number of rows parsed."""
+        self._load()
+        with open(self.path, "rb") as f:
+            size = os.fstat(f.fileno()).st_size
+            prefix = None if self.acc is None else self._verified_prefix(f, size)
+            if prefix is None:
+                self.acc, self.offset, prefix = self.empty(), 0, hashlib.sha1()
+            self.rows_read = 0
+            if size > self.offset:
+                f.seek(self.offset)
+                window = _Window(f, size - self.offset)
+                if self.offset:
+                    reader = pd.read_csv(window, header=None, names=self.columns, chunksize=chunksize)
+                else:
+                    reader = pd.read_csv(window, chunksize=chunksize)
+                for chunk in reader:
+                    self.columns = chunk.columns.tolist()
+                    self.acc.update(chunk)
+                    self.rows_read += len(chunk)
+                self.digest = _hash(f, self.offset, size, prefix).hexdigest()
+                self.offset = size
+                self._save()
+        return self.rows_read
+
+    def _verified_prefix(self, f, size):
+        # Running hash of the covered bytes when the file only grew past them, else None
+        if size < self.offset:
+            return None
+        if self.offset and size > self.offset:
+            # A final row without a newline would be continued by the appended bytes
+            f.seek(self.offset - 1)
+            if f.read(1) != b"\n":
+                return None
+        prefix = _hash(f, 0, self.offset, hashlib.sha1())
+        return prefix if prefix.hexdigest() == self.digest else None
+
+    def _load(self):
+        try:
+            with open(self.target, "rb") as f:
+                state = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return
+        if state.get("version") == STORE_VERSION and state.get("key") == self.key():
+            self.acc, self.columns = state["acc"], state["columns"]
+            self.offset, self.digest = state["offset"], state["digest"]
+
+    def _save(self):
+        state = {"version": STORE_VERSION, "key": self.key(), "acc": self.acc, "columns": self.columns,
+                 "offset": self.offset, "digest": self.digest}
+        try:
+            os.makedirs(os.path.dirname(self.target), exist_ok=True)
+            tmp = f"{self.target}.tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.target)
+        except OSError:
+            pass
+
+
+class StatsStore(AppendStore):
+    """Mergeable summary statistics of a CSV file.
+
+    Moments (mean/std/skew), pairwise co-moments, quantile histograms, value counts, churn
+    group counters and the distinct-customer sketch all merge chunk by chunk.
+    """
+
+    name = "stats"
+
+    def __init__(self, path, age_min=18, cache_dir=CACHE_DIR):
+        super().__init__(path, cache_dir)
+        self.age_min = age_min
+
+    def empty(self):
+        return _ChunkAccumulator(self.age_min)
+
+    def key(self):
+        return (self.age_min,)
+
+    def summary(self, bins=HISTOGRAM_BINS):
+        return self.acc.finalize(bins)
+
+
+class CleaningStore(AppendStore):
+    """The cleaning fit of a CSV file (``cleaning.CleaningFit``): per-column quantile backends and missing counts.
+
+    Appended rows are folded into the backends, so the imputation values and Income bounds are
+    re-derived without reading the earlier rows again. In "sketch" mode the state is a few KLL
+    sketches; in "exact" mode it keeps every value of the cleaned columns.
+    """
+
+    name = "cleaning"
+
+    def __init__(self, path, age_min=18, sc_max=25, sc_cap=7, quantile_mode="exact", eps=DEFAULT_EPS,
+                 cache_dir=CACHE_DIR):
+        super().__init__(path, cache_dir)
+        self.options = (age_min, sc_max, sc_cap, quantile_mode, eps)
+
+    def empty(self):
+        return CleaningFit(*self.options)
+
+    def key(self):
+        return self.options
+
+    def params(self, iqr_multiplier=1.5):
+        return self.acc.params(iqr_multiplier)
+
+
+def summarize_incremental(path, age_min=18, chunksize=CHUNK_SIZE, bins=HISTOGRAM_BINS):
+    """Approximate summary of a CSV of any size, read in chunks; only rows appended since the previous call are read."""
+    store = StatsStore(path, age_min)
+    store.refresh(chunksize)
+    return store.summary(bins)
+
+
+def fit_incremental(path, age_min=18, iqr_multiplier=1.5, sc_max=25, sc_cap=7, quantile_mode="exact",
+                    eps=DEFAULT_EPS, chunksize=CHUNK_SIZE):
+    """``fit_cleaning_params`` of a CSV, read in chunks; only rows appended since the previous call are read."""
+    store = CleaningStore(path, age_min, sc_max, sc_cap, quantile_mode, eps)
+    store.refresh(chunksize)
+    return store.params(iqr_multiplier)
+
+
+def _hash(f, start, stop, digest):
+    # Extends ``digest`` with bytes [start, stop) of the file
+    f.seek(start)
+    remaining = stop - start
+    while remaining > 0:
+        block = f.read(min(HASH_BLOCK_BYTES, remaining))
+        if not block:
+            break
+        digest.update(block)
+        remaining -= len(block)
+    return digest
+
+
+class _Window(io.RawIOBase):
+    # Read-only view of the next `remaining` bytes, so rows written during the read are left for next time
+    def __init__(self, f, remaining):
+        self.f = f
+        self.remaining = remaining
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        n = min(len(buffer), self.remaining)
+        data = self.f.read(n)
+        buffer[:len(data)] = data
+        self.remaining -= len(data)
+        return len(data)
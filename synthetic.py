@@ -0,0 +1,254 @@
+"""Synthetic customer tables of any size, drawn from a profile learned from the real customer file."""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from pipeline import AGE_MIN, DATA_PATH, IQR_MULTIPLIER, SUPPORT_CALLS_MAX, read_frame
+
+PROFILE_VERSION = 1
+GENERATE_CHUNK_SIZE = 2_000_000
+ID_PREFIX = "CUST"
+ID_DIGITS = 4
+INCOME_QUANTILES = 257
+CHURN_INCOME_BINS = 10
+
+
+class CustomerProfile:
+    """Marginal distributions, missing rates and anomaly profile of a customer table.
+
+    Each column is sampled independently from its learned marginal:
+    - Gender, ProductType, Tenure and the Age and SupportCalls bodies from their value frequencies;
+    - Income's body by inverse CDF over its quantiles;
+    - a share of each feature from its anomalous tail: Income above the IQR fence,
+      SupportCalls above ``SUPPORT_CALLS_MAX`` and Age below ``AGE_MIN``.
+    ChurnStatus is drawn from its rate per Tenure value and Income decile (missing being a level of
+    its own), the relationship the app's analysis is about. Every rate is a plain attribute, so a
+    profile can be edited, saved and loaded as JSON.
+    """
+
+    def __init__(self, missing, frequencies, income_quantiles, income_outlier_rate, income_outliers,
+                 anomaly_rate, anomalies, underage_rate, underage, churn_income_edges, churn_rates):
+        self.missing = missing
+        self.frequencies = frequencies
+        self.income_quantiles = income_quantiles
+        self.income_outlier_rate = income_outlier_rate
+        self.income_outliers = income_outliers
+        self.anomaly_rate = anomaly_rate
+        self.anomalies = anomalies
+        self.underage_rate = underage_rate
+        self.underage = underage
+        self.churn_income_edges = churn_income_edges
+        self.churn_rates = churn_rates
+
+    @classmethod
+    def from_frame(cls, df):
+        missing = {col: float(df[col].isna().mean()) for col in df.columns if col != "CustomerID"}
+        age, income, support_calls = (df[col].dropna() for col in ["Age", "Income", "SupportCalls"])
+        q1, q3 = income.quantile([0.25, 0.75])
+        fence = q3 + IQR_MULTIPLIER * (q3 - q1)
+        frequencies = {col: _frequencies(df[col].dropna()) for col in ["Gender", "ProductType", "Tenure"]}
+        frequencies["Age"] = _frequencies(age[age >= AGE_MIN])
+        frequencies["SupportCalls"] = _frequencies(support_calls[support_calls <= SUPPORT_CALLS_MAX])
+
+        # Churn rate per (Tenure value, Income decile) cell; empty cells take the overall rate
+        tenure_values = np.asarray(frequencies["Tenure"][0])
+        edges = np.quantile(income, np.linspace(0, 1, CHURN_INCOME_BINS + 1)[1:-1])
+        tenure_codes, income_codes = _churn_codes(df["Tenure"].to_numpy(dtype=np.float64, na_value=np.nan),
+                                                  df["Income"].to_numpy(dtype=np.float64, na_value=np.nan),
+                                                  tenure_values, edges)
+        shape = (len(tenure_values) + 1, CHURN_INCOME_BINS + 1)
+        cells = np.ravel_multi_index((tenure_codes, income_codes), shape)
+        churned = np.bincount(cells, weights=df["ChurnStatus"].to_numpy(dtype=np.float64), minlength=np.prod(shape))
+        counts = np.bincount(cells, minlength=np.prod(shape))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rates = np.where(counts > 0, churned / counts, df["ChurnStatus"].mean()).reshape(shape)
+
+        return cls(
+            missing=missing,
+            frequencies=frequencies,
+            income_quantiles=income[income <= fence].quantile(np.linspace(0, 1, INCOME_QUANTILES)).tolist(),
+            income_outlier_rate=float((income > fence).mean()),
+            income_outliers=_frequencies(income[income > fence]),
+            anomaly_rate=float((support_calls > SUPPORT_CALLS_MAX).mean()),
+            anomalies=_frequencies(support_calls[support_calls > SUPPORT_CALLS_MAX]),
+            underage_rate=float((age < AGE_MIN).mean()),
+            underage=_frequencies(age[age < AGE_MIN]),
+            churn_income_edges=edges.tolist(),
+            churn_rates=rates.tolist(),
+        )
+
+    @classmethod
+    def from_file(cls, path=DATA_PATH):
+        return cls.from_frame(read_frame(path))
+
+    def sample(self, n_rows, rng, start=0, id_digits=ID_DIGITS):
+        """``n_rows`` customers as a dict of arrays, CustomerIDs numbered from ``start`` as fixed-width bytes."""
+        columns = {"CustomerID": _customer_ids(start, n_rows, id_digits)}
+        columns["Age"] = _draw(self.frequencies["Age"], n_rows, rng)
+        _replace(columns["Age"], self.underage_rate, self.underage, rng)
+        columns["Gender"] = _draw(self.frequencies["Gender"], n_rows, rng)
+        quantiles = np.asarray(self.income_quantiles)
+        columns["Income"] = np.round(np.interp(rng.random(n_rows) * (len(quantiles) - 1), np.arange(len(quantiles)), quantiles))
+        _replace(columns["Income"], self.income_outlier_rate, self.income_outliers, rng)
+        columns["Tenure"] = _draw(self.frequencies["Tenure"], n_rows, rng)
+        columns["ProductType"] = _draw(self.frequencies["ProductType"], n_rows, rng)
+        columns["SupportCalls"] = _draw(self.frequencies["SupportCalls"], n_rows, rng)
+        _replace(columns["SupportCalls"], self.anomaly_rate, self.anomalies, rng)
+
+        for col, rate in self.missing.items():
+            if rate > 0 and col in columns:
+                columns[col] = columns[col].astype(np.float64)
+                columns[col][rng.random(n_rows) < rate] = np.nan
+        tenure_codes, income_codes = _churn_codes(columns["Tenure"], columns["Income"],
+                                                  np.asarray(self.frequencies["Tenure"][0]), np.asarray(self.churn_income_edges))
+        churn_rate = np.asarray(self.churn_rates)[tenure_codes, income_codes]
+        columns["ChurnStatus"] = (rng.random(n_rows) < churn_rate).astype(np.int64)
+        return columns
+
+    def to_dict(self):
+        return {"version": PROFILE_VERSION, **vars(self)}
+
+    @classmethod
+    def from_dict(cls, d):
+        if d.get("version") != PROFILE_VERSION:
+            raise ValueError(f"Unsupported customer profile version: {d.get('version')}")
+        return cls(**{k: v for k, v in d.items() if k != "version"})
+
+    def save(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def generate(profile, n_rows, seed=0, chunksize=GENERATE_CHUNK_SIZE):
+    """Frames of ``chunksize`` synthetic customers adding up to ``n_rows``.
+
+    Chunk ``i`` is drawn from the ``i``-th child of ``seed``, so the same seed and chunk size
+    always give the same table, whichever chunks are consumed.
+    """
+    for columns in _chunks(profile, n_rows, seed, chunksize):
+        columns["CustomerID"] = columns["CustomerID"].astype(str).astype(object)
+        yield pd.DataFrame(columns)
+
+
+def write_synthetic(profile, n_rows, path, seed=0, chunksize=GENERATE_CHUNK_SIZE, fmt=None):
+    """Write ``n_rows`` synthetic customers to a CSV or Parquet file one chunk at a time."""
+    import pyarrow as pa
+
+    fmt = fmt or ("parquet" if path.endswith(".parquet") else "csv")
+    writer = None
+    with open(path, "wb") as sink:
+        try:
+            for columns in _chunks(profile, n_rows, seed, chunksize):
+                # The fixed-width IDs already are an Arrow string buffer; only the offsets are new
+                ids = columns.pop("CustomerID")
+                offsets = np.arange(0, (len(ids) + 1) * ids.dtype.itemsize, ids.dtype.itemsize, dtype=np.int32)
+                arrays = {"CustomerID": pa.StringArray.from_buffers(len(ids), pa.py_buffer(offsets), pa.py_buffer(ids))}
+                # NaN marks a missing value and is written as an empty field (CSV) or a null (Parquet)
+                arrays.update({col: pa.array(values, from_pandas=True) for col, values in columns.items()})
+                table = pa.table(arrays)
+                if writer is None:
+                    writer = _writer(fmt, sink, table.schema)
+                writer.write_table(table)
+        finally:
+            if writer is not None:
+                writer.close()
+
+
+def _chunks(profile, n_rows, seed, chunksize):
+    starts = range(0, n_rows, chunksize)
+    digits = max(ID_DIGITS, len(str(max(n_rows - 1, 0))))
+    for start, chunk_seed in zip(starts, np.random.SeedSequence(seed).spawn(len(starts))):
+        yield profile.sample(min(chunksize, n_rows - start), np.random.default_rng(chunk_seed), start, digits)
+
+
+def _writer(fmt, sink, schema):
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetWriter(sink, schema)
+    import pyarrow.csv as pacsv
+    # Arrow quotes header names, so the header is written the way the source file has it
+    sink.write((",".join(schema.names) + "\n").encode())
+    return pacsv.CSVWriter(sink, schema, write_options=pacsv.WriteOptions(include_header=False, quoting_style="none"))
+
+
+def _frequencies(values):
+    counts = values.value_counts().sort_index()
+    return [counts.index.tolist(), (counts / counts.sum()).tolist()]
+
+
+def _draw(frequencies, n_rows, rng):
+    values, probabilities = (np.asarray(v) for v in frequencies)
+    # Inverse CDF over the cumulative frequencies; the last bound is forced to 1 against rounding
+    cumulative = np.cumsum(probabilities)
+    cumulative[-1] = 1.0
+    return values[np.searchsorted(cumulative, rng.random(n_rows), side="right").clip(max=len(values) - 1)]
+
+
+def _replace(values, rate, frequencies, rng):
+    # Swap a ``rate`` share of the drawn values for values from an anomalous tail
+    if rate > 0 and len(frequencies[0]):
+        mask = rng.random(len(values)) < rate
+        values[mask] = _draw(frequencies, int(mask.sum()), rng)
+
+
+def _churn_codes(tenure, income, tenure_values, income_edges):
+    tenure_codes = np.searchsorted(tenure_values, tenure).clip(max=len(tenure_values) - 1)
+    # Values outside the learned Tenure levels and missing values share the last row of the table
+    tenure_codes = np.where(np.isnan(tenure) | (tenure_values[tenure_codes] != tenure), len(tenure_values), tenure_codes)
+    income_codes = np.where(np.isnan(income), len(income_edges) + 1, np.searchsorted(income_edges, income, side="right"))
+    return tenure_codes, income_codes
+
+
+def _customer_ids(start, n_rows, digits):
+    # Fixed-width ASCII built digit by digit, so no Python string is created per row
+    numbers = np.arange(start, start + n_rows, dtype=np.int64)
+    chars = np.empty((n_rows, len(ID_PREFIX) + digits), dtype=np.uint8)
+    chars[:, :len(ID_PREFIX)] = np.frombuffer(ID_PREFIX.encode(), dtype=np.uint8)
+    for i in range(digits):
+        chars[:, len(ID_PREFIX) + digits - 1 - i] = ord("0") + numbers // 10 ** i % 10
+    return chars.view(f"S{chars.shape[1]}").ravel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic customer churn file of any size.")
+    parser.add_argument("rows", type=int, help="number of customers to generate")
+    parser.add_argument("-o", "--output", required=True, help="where to write the table (.csv or .parquet)")
+    parser.add_argument("--source", default=DATA_PATH, help="customer file the profile is learned from")
+    parser.add_argument("--profile", help="profile JSON to generate from instead of learning one")
+    parser.add_argument("--save-profile", help="where to write the profile JSON")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--chunksize", type=int, default=GENERATE_CHUNK_SIZE)
+    parser.add_argument("--missing-rate", type=float, help="missing share of every column that has missing values")
+    parser.add_argument("--income-outlier-rate", type=float, help="share of incomes drawn from the outlier tail")
+    parser.add_argument("--anomaly-rate", type=float, help=f"share of SupportCalls above {SUPPORT_CALLS_MAX}")
+    parser.add_argument("--underage-rate", type=float, help=f"share of ages below {AGE_MIN}")
+    args = parser.parse_args(argv)
+
+    profile = CustomerProfile.load(args.profile) if args.profile else CustomerProfile.from_file(args.source)
+    if args.missing_rate is not None:
+        profile.missing = {col: args.missing_rate if rate > 0 else 0.0 for col, rate in profile.missing.items()}
+    for option, attribute in [("income_outlier_rate", "income_outlier_rate"), ("anomaly_rate", "anomaly_rate"),
+                              ("underage_rate", "underage_rate")]:
+        if getattr(args, option) is not None:
+            setattr(profile, attribute, getattr(args, option))
+    if args.save_profile:
+        profile.save(args.save_profile)
+
+    start = time.perf_counter()
+    write_synthetic(profile, args.rows, args.output, args.seed, args.chunksize)
+    elapsed = time.perf_counter() - start
+    print(f"{args.rows:,} customers written to {args.output} in {elapsed:.1f}s "
+          f"({args.rows / max(elapsed, 1e-9) / 1e6:.2f}M rows/s, {os.path.getsize(args.output) / 1024 ** 2:,.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Vega-Lite charts (via Altair) built only from pre-aggregated data, drawn and zoomed in the browser."""
+import altair as alt
+import numpy as np
+import pandas as pd
+
+PANEL_WIDTH = 340
+PANEL_HEIGHT = 240
+# The static heatmap's colormap: white at zero, burgundy at |r| >= 0.5
+HEATMAP_DOMAIN = [-0.5, -0.25, 0.0, 0.25, 0.5]
+
+
+def histogram(counts, edges, title, x_title, fill, stroke, markers=()):
+    """Bars over bin ``edges`` with vertical rules at each ``(label, value, color)`` marker; zooms along x."""
+    bins = pd.DataFrame({"start": edges[:-1], "end": edges[1:], "count": counts})
+    bars = alt.Chart(bins).mark_bar(color=fill, stroke=stroke, strokeWidth=1.5, opacity=0.75).encode(
+        x=alt.X("start:Q", title=x_title, bin="binned"),
+        x2="end:Q",
+        y=alt.Y("count:Q", title="Frequency"),
+        tooltip=[alt.Tooltip("start:Q", title="From", format=",.4~g"), alt.Tooltip("end:Q", title="To", format=",.4~g"),
+                 alt.Tooltip("count:Q", title="Customers", format=",")],
+    )
+    chart = bars
+    if markers:
+        rules = pd.DataFrame(markers, columns=["label", "value", "color"])
+        chart += alt.Chart(rules).mark_rule(strokeDash=[6, 4], size=2.5).encode(
+            x="value:Q",
+            color=alt.Color("label:N", scale=alt.Scale(domain=list(rules["label"]), range=list(rules["color"])),
+                            legend=alt.Legend(title=None, orient="top-right")),
+            tooltip=[alt.Tooltip("label:N", title="Marker")],
+        )
+    return chart.properties(title=title, width=PANEL_WIDTH, height=PANEL_HEIGHT).interactive(bind_y=False)
+
+
+def bars(labels, values, colors, title, y_title, stroke, fmt=",", domain=None):
+    """One labelled bar per category, the value printed above it."""
+    data = pd.DataFrame({"label": labels, "value": values})
+    base = alt.Chart(data).encode(
+        x=alt.X("label:N", sort=list(labels), title=None, axis=alt.Axis(labelAngle=0)),
+        y=alt.Y("value:Q", title=y_title, scale=alt.Scale(domain=domain) if domain else alt.Undefined),
+        tooltip=[alt.Tooltip("label:N", title="Group"), alt.Tooltip("value:Q", title=y_title, format=fmt)],
+    )
+    chart = base.mark_bar(stroke=stroke, strokeWidth=2).encode(
+        color=alt.Color("label:N", scale=alt.Scale(domain=list(labels), range=list(colors)), legend=None),
+    ) + base.mark_text(dy=-8, fontWeight="bold").encode(text=alt.Text("value:Q", format=fmt))
+    return chart.properties(title=title, width=PANEL_WIDTH, height=PANEL_HEIGHT)
+
+
+def diverging_bars(values, title, x_title, positive, negative, stroke):
+    """Horizontal bars of a Series around zero, in its order, labelled outside each bar's end."""
+    data = pd.DataFrame({"label": values.index, "value": values.to_numpy(), "sign": np.where(values > 0, "+", "-")})
+    base = alt.Chart(data).encode(
+        y=alt.Y("label:N", sort=list(values.index), title=None),
+        x=alt.X("value:Q", title=x_title),
+        tooltip=[alt.Tooltip("label:N", title="Feature"), alt.Tooltip("value:Q", title=x_title, format=".4f")],
+    )
+    chart = base.mark_bar(stroke=stroke, strokeWidth=2).encode(
+        color=alt.Color("sign:N", scale=alt.Scale(domain=["+", "-"], range=[positive, negative]), legend=None),
+    )
+    for sign, align, dx in [("+", "left", 4), ("-", "right", -4)]:
+        chart += base.transform_filter(f"datum.sign == '{sign}'").mark_text(
+            align=align, dx=dx, fontWeight="bold", color=stroke).encode(text=alt.Text("value:Q", format=".3f"))
+    rule = alt.Chart(pd.DataFrame({"zero": [0.0]})).mark_rule(color=stroke).encode(x="zero:Q")
+    return (chart + rule).properties(title=title, width=2 * PANEL_WIDTH, height=PANEL_HEIGHT)
+
+
+def boxes(summary, colors, title, y_title, stroke, points=None):
+    """Box plots drawn from per-group summaries, not rows.
+
+    ``summary`` has one row per group with ``group``, ``q1``, ``median``, ``q3`` and the whisker
+    ends ``low`` and ``high``; ``points`` optionally adds individual values (``group``, ``value``,
+    ``count``) such as the outliers beyond the whiskers.
+    """
+    groups = list(summary["group"])
+    fields = [("low", "Lower whisker"), ("q1", "Q1"), ("median", "Median"), ("q3", "Q3"), ("high", "Upper whisker")]
+    base = alt.Chart(summary).encode(
+        x=alt.X("group:N", sort=groups, title=None, axis=alt.Axis(labelAngle=0)),
+        tooltip=[alt.Tooltip("group:N", title="Group")] + [alt.Tooltip(f"{f}:Q", title=t, format=",.2f") for f, t in fields],
+    )
+    chart = (
+        base.mark_rule(color=stroke, size=2).encode(y=alt.Y("low:Q", title=y_title), y2="high:Q")
+        + base.mark_bar(size=48, stroke=stroke, strokeWidth=2, opacity=0.7).encode(
+            y="q1:Q", y2="q3:Q",
+            color=alt.Color("group:N", scale=alt.Scale(domain=groups, range=list(colors)), legend=None))
+        + base.mark_tick(size=48, thickness=3, color=stroke).encode(y="median:Q")
+    )
+    if points is not None and len(points):
+        chart += alt.Chart(points).mark_point(color=stroke, filled=True, size=40).encode(
+            x=alt.X("group:N", sort=groups),
+            y="value:Q",
+            tooltip=[alt.Tooltip("value:Q", title="Value", format=",.2f"), alt.Tooltip("count:Q", title="Customers")],
+        )
+    return chart.properties(title=title, width=PANEL_WIDTH, height=PANEL_HEIGHT).interactive(bind_x=False)
+
+
+def heatmap(matrix, title, colors, text_colors):
+    """Annotated correlation heatmap of a square frame, shaded like the static one (clipped at |r| = 0.5)."""
+    names = list(matrix.index)
+    cells = matrix.rename_axis(index="row", columns="column").stack().rename("r").reset_index()
+    cells["shade"] = np.where(cells["row"] == cells["column"], 0.5, cells["r"].clip(-0.5, 0.5))
+    base = alt.Chart(cells).encode(
+        x=alt.X("column:N", sort=names, title=None),
+        y=alt.Y("row:N", sort=names, title=None),
+        tooltip=[alt.Tooltip("row:N", title="Row"), alt.Tooltip("column:N", title="Column"),
+                 alt.Tooltip("r:Q", format=".4f")],
+    )
+    chart = base.mark_rect(stroke="white", strokeWidth=1.5).encode(
+        color=alt.Color("shade:Q", scale=alt.Scale(domain=HEATMAP_DOMAIN, range=list(colors)),
+                        legend=alt.Legend(title="r", gradientLength=PANEL_HEIGHT)),
+    ) + base.mark_text(fontWeight="bold").encode(
+        text=alt.Text("r:Q", format=".3f"),
+        color=alt.condition("abs(datum.shade) >= 0.35", alt.value(text_colors[1]), alt.value(text_colors[0])),
+    )
+    return chart.properties(title=title, width=2 * PANEL_WIDTH, height=2 * PANEL_WIDTH)
+
+
+def grid(charts, title, columns=2):
+    """Panels laid out ``columns`` per row; each keeps its own scales and legend."""
+    return alt.concat(*charts, columns=columns).resolve_scale(color="independent").properties(title=title)
+
+
+def themed(chart, text_color):
+    """Transparent background and ``text_color`` labels, so the chart follows the app's light/dark theme."""
+    return (chart.configure(background="transparent")
+            .configure_view(stroke=None)
+            .configure_axis(labelColor=text_color, titleColor=text_color, gridDash=[2, 2], gridOpacity=0.25)
+            .configure_title(color=text_color, fontSize=15, anchor="middle")
+            .configure_legend(labelColor=text_color, titleColor=text_color))